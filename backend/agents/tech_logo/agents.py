@@ -6,20 +6,86 @@ import json
 import base64
 from datetime import datetime
 import os
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
 from agents.tech_logo.state import LogoDesignState
 from llms.openai import OpenAIProvider
+from llms.clients import provider_clients
 from llms.logo import ReplicateProvider
+from agents.tech_logo import events
+from agents.tech_logo.context import ConversationContext, default_token_budget
+from agents.tech_logo.intent import CONFIRM, chat_fast_path, detect_intent, fast_path_threshold, local_reply
+from agents.tech_logo.routing import ModelRouter, create_model_router
+from agents.tech_logo.ranking import download_and_score, vision_assessment, pick_best, PASS_SCORE
+from agents.tech_logo.assets import AssetStore, create_asset_store
+from agents.tech_logo.packaging import PackageBuilder, create_package_builder
+from agents.tech_logo.ledger import GenerationLedger, create_generation_ledger, generation_key, image_cache_lookups
+from agents.tech_logo.structured import ConceptStreamParser, TokenCallback, design_response_format, repair_json
+from llms.scheduler import hedge, hedge_delay
 import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Request parameters for every logo image; part of the generation cache key
+IMAGE_PARAMS = {"width": 1024, "height": 1024, "style": "minimal tech logo"}
+
+# Session (or brief thread) whose pipeline is running; set by the orchestrator
+_prefetch_owner: ContextVar[Optional[str]] = ContextVar("prefetch_owner", default=None)
+
+
+@contextmanager
+def prefetch_owner(owner: str):
+    """File images prefetched inside this block under `owner`, so they can be cancelled with its pipeline"""
+    token = _prefetch_owner.set(owner)
+    try:
+        yield
+    finally:
+        _prefetch_owner.reset(token)
+
+# Phrases that open or close a recap of the brief. A bare "summary" is not one:
+# "could you give me a short summary of your product?" is an ordinary question.
+RECAP_MARKERS = (
+    "to summarize", "in summary", "here's a summary", "here is a summary", "here's a quick summary",
+    "to recap", "let me recap", "quick recap", "here's what i understood", "here is what i understood",
+    "does this accurately capture", "does that capture", "did i get that right", "did i get everything right"
+)
 
 
 class LogoDesignAgents:
-    def __init__(self):
+    def __init__(
+        self,
+        asset_store: Optional[AssetStore] = None,
+        package_builder: Optional[PackageBuilder] = None,
+        router: Optional[ModelRouter] = None
+    ):
         self.provider = OpenAIProvider()
-        self.llm = self.provider.client
-        self.vision_llm = OpenAIProvider(model="gpt-4-vision-preview").client
+        # Which model each node calls; see routing.DEFAULT_ROUTES
+        self.router = router or create_model_router()
         self.replicate_provider = ReplicateProvider()
+        self.asset_store = asset_store or create_asset_store()
+        self.package_builder = package_builder or create_package_builder(self.asset_store)
+        self.ledger: GenerationLedger = create_generation_ledger()
+        # Replicate outputs per prediction; the best scoring one is kept
+        self.num_outputs = max(1, int(os.getenv("IMAGE_NUM_OUTPUTS", "1")))
+        # owner -> prefetch_id -> image generation started while the designer was still streaming
+        self._prefetched: Dict[Optional[str], Dict[str, asyncio.Task]] = {}
+        self.context = ConversationContext(
+            summarize=self._summarize_conversation,
+            token_budget=default_token_budget(),
+            model=self.router.routes["chat"].model
+        )
+
+    def llm(self, model: str, temperature: float = 0.7):
+        """Pooled chat client for `model` (re-resolved so it survives a registry shutdown).
+
+        Extraction and classification calls use temperature 0: their answer
+        should not vary, and only those clients go through the response cache.
+        """
+        return provider_clients.chat_client(self.provider.api_key, model, temperature)
         
-    def chat_agent(self, state: LogoDesignState) -> LogoDesignState:
+    async def chat_agent(self, state: LogoDesignState) -> LogoDesignState:
         """Conducts initial consultation with user"""
         
         system_prompt = """You are Alex, a senior brand consultant specializing in logo design for tech companies.
@@ -36,45 +102,73 @@ class LogoDesignAgents:
         summarize what you've learned and confirm with the user before concluding. Ask as less questions as possible. Do not respond with 
         Large texts. It should not feel like a headache to user"""
         
-        messages = [SystemMessage(content=system_prompt)]
-        
-        # Add conversation history
-        for msg in state.get("conversation_history", []):
-            if msg["role"] == "user":
-                messages.append(HumanMessage(content=msg["content"]))
-        
-        # Add current user input
+        # The user turn is normally recorded by the orchestrator already; append() skips repeats
         if state["user_input"]:
-            messages.append(HumanMessage(content=state["user_input"]))
-        
-        response = self.llm.invoke(messages)
-        
-        # Update conversation history
-        conversation_history = state.get("conversation_history", [])
-        conversation_history.extend([
-            {"role": "user", "content": state["user_input"]},
-            {"role": "assistant", "content": response.content}
-        ])
-        
-        recent_user_msg = state["user_input"].lower().strip()
-        recent_assistant_msg = response.content.lower()
+            self.context.append(state, "user", state["user_input"])
 
-        user_said_yes = any(x in recent_user_msg for x in ["yes", "go ahead", "correct", "that's right", "sounds good"])
-        assistant_provided_summary = any(
-            x in recent_assistant_msg for x in [
-                "to summarize", "summary", "here’s what i understood", "let me recap", "does this accurately capture"
-            ]
-        )
+        # Was the previous assistant message a recap waiting for the user's answer?
+        history = state["conversation_history"]
+        previous = next((m["content"] for m in reversed(history) if m["role"] == "assistant"), "")
+        recap_pending = self.offers_recap(previous)
+        intent = detect_intent(state["user_input"])
+
+        # Confirming or rejecting a recap, or small talk, needs no model
+        threshold = fast_path_threshold()
+        reply = None
+        if threshold is not None and intent.confidence >= threshold:
+            reply = local_reply(intent, state["user_input"], history, recap_pending)
+        chat_fast_path.inc(intent=intent.label, route="local" if reply else "llm")
+        if reply is not None:
+            if events.is_streaming():
+                events.emit("token", content=reply["content"])
+            self.context.append(state, "assistant", reply["content"])
+            return {
+                **state,
+                "current_step": reply["current_step"],
+                "user_input": ""
+            }
 
-        is_complete = user_said_yes and assistant_provided_summary
+        messages = await self.context.build_messages(state, system_prompt)
+        
+        with self.router.call("chat", state) as route:
+            if events.is_streaming():
+                # Forward tokens to the client as they arrive
+                content = ""
+                async for chunk in self.llm(route.model).astream(messages):
+                    if chunk.content:
+                        content += chunk.content
+                        events.emit("token", content=chunk.content)
+            else:
+                content = (await self.llm(route.model).ainvoke(messages)).content
+        
+        self.context.append(state, "assistant", content)
+        
+        # A yes with additions went to the model; it is still complete if the reply recaps again
+        is_complete = intent.label == CONFIRM and self.offers_recap(content)
         return {
             **state,
-            "conversation_history": conversation_history,
             "current_step": "summary" if is_complete else "chat",
             "user_input": ""  # Clear for next iteration
         }
     
-    def summary_agent(self, state: LogoDesignState) -> LogoDesignState:
+    @staticmethod
+    def offers_recap(content: str) -> bool:
+        """Whether an assistant message recaps the brief for the user to confirm"""
+        content = content.lower().replace("’", "'")
+        return any(marker in content for marker in RECAP_MARKERS)
+
+    async def _summarize_conversation(self, text: str) -> str:
+        """Condense older consultation turns for the chat context window"""
+        messages = [
+            SystemMessage(content="""Condense this logo design consultation into a short factual summary.
+        Keep every requirement, preference and decision the client stated. No commentary."""),
+            HumanMessage(content=text)
+        ]
+        with self.router.call("context") as route:
+            response = await self.llm(route.model, temperature=0).ainvoke(messages)
+        return response.content
+
+    async def summary_agent(self, state: LogoDesignState) -> LogoDesignState:
         """Creates structured summary from consultation"""
         
         system_prompt = """You are a brand strategist who creates actionable design briefs from client consultations.
@@ -127,7 +221,8 @@ class LogoDesignAgents:
             HumanMessage(content=f"Conversation to summarize:\n{conversation_text}")
         ]
         
-        response = self.llm.invoke(messages)
+        with self.router.call("summary", state) as route:
+            response = await self.llm(route.model, temperature=0).ainvoke(messages)
         
         try:
             client_requirements = json.loads(response.content)
@@ -140,12 +235,15 @@ class LogoDesignAgents:
         except json.JSONDecodeError:
             return {
                 **state,
-                "error_message": "Failed to parse client requirements",
-                "current_step": "error"
+                "error_message": "Failed to parse client requirements"
             }
         
-    async def designer_agent(self, state: LogoDesignState) -> LogoDesignState:
-        """Creates design concepts and specifications using LLM"""
+    async def designer_agent(self, state: LogoDesignState, start_generation: bool = True) -> LogoDesignState:
+        """Creates design concepts and specifications using LLM.
+
+        The response is streamed; with `start_generation`, each concept's image
+        starts generating as soon as its JSON object is complete.
+        """
 
         # REMOVE: AgentConfig dependency
         # config = AgentConfig.get_config("designer")
@@ -187,113 +285,245 @@ class LogoDesignAgents:
             {"role": "user", "content": f"Client Requirements:\n{requirements_text}"}
         ]
 
-        try:
-            print("[🎨 DESIGNER AGENT] Requesting logo concepts from LLM...")
+        started: List[str] = []
+
+        def on_concept(concept: Dict[str, Any]):
+            events.emit("concept", concept_id=concept.get("concept_id"), concept_name=concept.get("name"))
+            prompt = concept.get("generation_prompt") or concept.get("midjourney_prompt")
+            if start_generation and prompt:
+                prefetch_id = str(uuid.uuid4())
+                concept["prefetch_id"] = prefetch_id
+                task = asyncio.create_task(self._produce_image(prompt, state.get("seen_digests") or ()))
+                self._prefetched.setdefault(_prefetch_owner.get(), {})[prefetch_id] = task
+                started.append(prefetch_id)
 
-            # REMOVE: config["provider"], USE default provider
-            response = await self.llm_manager.generate_text(messages)
+        parser = ConceptStreamParser(on_concept)
 
-            print("[✅ RAW LLM RESPONSE]")
-            print(response)
+        try:
+            with self.router.call("design", state) as route:
+                kwargs = {"stream": True}
+                response_format = design_response_format(route.model)
+                if response_format:
+                    kwargs["response_format"] = response_format
+                provider = OpenAIProvider(self.provider.api_key, route.model)
+                response = await provider.generate_text(messages, callbacks=[TokenCallback(parser.feed)], **kwargs)
+            logger.debug("Designer raw response: %s", response)
+            parser.finish(response)
 
-            design_concepts_json = json.loads(response)
+            # Repair truncated or sloppy JSON rather than failing the session; fall back to the streamed concepts
+            design = repair_json(response)
+            concepts = design.get("concepts") if isinstance(design, dict) else None
+            if not concepts or len(concepts) < len(parser.concepts):
+                concepts = parser.concepts
+            concepts = [
+                c for c in concepts
+                if isinstance(c, dict) and (c.get("generation_prompt") or c.get("midjourney_prompt"))
+            ]
+            for index, concept in enumerate(concepts):
+                concept.setdefault("concept_id", index + 1)
+                concept.setdefault("name", f"Concept {concept['concept_id']}")
+                # Keep the prefetch only if the final concept still has the prompt it was started with
+                streamed = parser.concepts[index] if index < len(parser.concepts) else {}
+                prompt = concept.get("generation_prompt") or concept.get("midjourney_prompt")
+                if streamed.get("prefetch_id") and prompt == (streamed.get("generation_prompt") or streamed.get("midjourney_prompt")):
+                    concept["prefetch_id"] = streamed["prefetch_id"]
+            self._discard_prefetches(set(started) - {c.get("prefetch_id") for c in concepts})
 
-            # Print each concept clearly to terminal
-            for concept in design_concepts_json.get("concepts", []):
-                print("\n[🧠 DESIGN CONCEPT]")
-                print(f"Name: {concept['name']}")
-                print(f"Style: {concept['style']}")
-                print(f"Colors: {concept['color_palette']}")
-                print(f"Typography: {concept['typography']}")
-                print(f"Prompt: {concept['midjourney_prompt']}\n")
+            if not concepts:
+                logger.warning("Designer returned no usable concepts: %s", response)
+                return {
+                    **state,
+                    "error_message": "Failed to parse design concepts"
+                }
 
-            return {
-                **state,
-                "design_concepts": design_concepts_json["concepts"],
-                "current_step": "generate"
-            }
+            if logger.isEnabledFor(logging.DEBUG):
+                for concept in concepts:
+                    logger.debug(
+                        "Design concept %s | style=%s | colors=%s | typography=%s | prompt=%s",
+                        concept.get("name"), concept.get("style"), concept.get("color_palette"),
+                        concept.get("typography"), concept.get("midjourney_prompt")
+                    )
 
-        except json.JSONDecodeError as e:
-            print("[❌ DESIGNER ERROR] Failed to parse JSON:\n", e)
-            print("[❌ RAW RESPONSE WAS]:\n", response)
             return {
                 **state,
-                "error_message": "Failed to parse design concepts",
-                "current_step": "error"
+                "design_concepts": concepts,
+                "current_step": "generate"
             }
 
         except Exception as e:
-            print("[❌ DESIGNER AGENT EXCEPTION]", str(e))
+            self._discard_prefetches(started)
+            logger.exception("Designer agent failed")
             return {
                 **state,
-                "error_message": f"Designer agent error: {str(e)}",
-                "current_step": "error"
+                "error_message": f"Designer agent error: {str(e)}"
             }
-    
-    def generator_agent(self, state: LogoDesignState) -> LogoDesignState:
-        """Generates logo images and attaches to chat. Compatible with sync context."""
-        import asyncio
-        from datetime import datetime
-        import os
-
-        async def generate_all():
-            generated_logos = []
-            log_file = "generated_images_log.txt"
-            os.makedirs(os.path.dirname(log_file), exist_ok=True)
-
-            async def generate_for_concept(concept):
-                print(f"[🔄 LOG] Generating image for concept: {concept['name']}")
-                result = await self.replicate_provider.generate_image(
-                    prompt=concept["generation_prompt"],
-                    width=1024,
-                    height=1024,
-                    style="minimal tech logo"
-                )
-                print(f"[✅ IMAGE GENERATED] {concept['name']}: {result['image_url']}")
-
-                with open(log_file, "a") as f:
-                    f.write(f"[{datetime.now()}] {concept['name']} → {result['image_url']}\n")
 
+    def _discard_prefetches(self, prefetch_ids):
+        prefetched = self._prefetched.get(_prefetch_owner.get(), {})
+        for prefetch_id in prefetch_ids:
+            task = prefetched.pop(prefetch_id, None)
+            if task is not None:
+                task.cancel()
+
+    async def cancel_prefetches(self, owner: Optional[str] = None):
+        """Cancel the prefetched generations nobody consumed: `owner`'s, or everyone's when no owner is given"""
+        owners = [owner] if owner is not None else list(self._prefetched)
+        tasks = [task for key in owners for task in self._prefetched.pop(key, {}).values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _generate_image(self, prompt: str) -> Dict[str, Any]:
+        """Replicate, hedged with DALL-E 3 when it runs past its usual latency (IMAGE_HEDGE=1)"""
+        def replicate():
+            return self.replicate_provider.generate_image(prompt=prompt, num_outputs=self.num_outputs, **IMAGE_PARAMS)
+
+        delay = hedge_delay("replicate", "image", self.replicate_provider.model_version)
+        if delay is None:
+            return await replicate()
+        return await hedge(replicate, lambda: self.provider.generate_image(prompt), delay)
+    
+    async def _produce_image(self, prompt: str, exclude) -> Dict[str, Any]:
+        """A stored image for this exact request that the session has not seen yet, else a new generation"""
+        key = generation_key(prompt, self.replicate_provider.model_version, IMAGE_PARAMS)
+        for entry in await self.ledger.cached(key, exclude):
+            asset = await self.asset_store.get(entry["digest"], entry.get("source_url"))
+            if asset is not None:
+                image_cache_lookups.inc(result="hit")
                 return {
-                    "concept_id": concept["concept_id"],
-                    "concept_name": concept["name"],
-                    "image_url": result["image_url"],
-                    "variations": {
-                        "primary": result["image_url"],
-                        "horizontal": result["image_url"],
-                        "icon": result["image_url"]
-                    },
-                    "generation_metadata": {
-                        "prompt_used": concept["generation_prompt"],
-                        "generation_time": result.get("generation_time", "unknown"),
-                        "model": result.get("model", "replicate/unknown")
-                    }
+                    "image_url": entry.get("source_url"),
+                    "model": entry.get("model"),
+                    "asset": asset,
+                    "key": key,
+                    "cached": True
                 }
+        image_cache_lookups.inc(result="miss")
+        result = {**await self._generate_image(prompt), "key": key, "cached": False}
+        urls = result.get("image_urls") or []
+        if len(urls) > 1:
+            # Best of N: score every output locally and store only the winner
+            result["image_url"], data = await pick_best(urls)
+            try:
+                result["asset"] = await self.asset_store.add(data, result["image_url"])
+            except Exception as e:
+                logger.warning("Could not store best of %d images: %s", len(urls), e)
+        return result
 
-            return await asyncio.gather(*[generate_for_concept(c) for c in state["design_concepts"]])
+    async def generator_agent(self, state: LogoDesignState) -> LogoDesignState:
+        """Generates logo images concurrently and attaches them to chat.
 
-        # Handle running loop issue
-        try:
-            generated_logos = asyncio.run(generate_all())
-        except RuntimeError:  # Already inside async loop
-            generated_logos = asyncio.get_event_loop().run_until_complete(generate_all())
+        After ranking asks for a retry, only the concepts in `pending_concepts`
+        are regenerated; the logos that passed are kept as they are.
+        """
+        seen = state.get("seen_digests") or []
+        pending = state.get("pending_concepts")
+
+        async def generate_for_concept(concept):
+            logger.debug("Generating image for concept %s", concept["name"])
+            # designer_agent emits midjourney_prompt; generation_prompt is accepted as an override
+            prompt = concept.get("generation_prompt") or concept["midjourney_prompt"]
+            result = None
+            prefetch = self._prefetched.get(_prefetch_owner.get(), {}).pop(concept.get("prefetch_id"), None)
+            if prefetch is not None:
+                # Started while the designer was still streaming
+                try:
+                    result = await prefetch
+                except Exception as e:
+                    logger.warning("Prefetched image for concept %s failed, retrying: %s", concept["name"], e)
+            if result is None:
+                result = await self._produce_image(prompt, seen)
+            logger.info("Generated image for concept %s: %s", concept["name"], result["image_url"])
+
+            # Keep our own copy: provider CDN links are short-lived
+            asset = result.get("asset")
+            if asset is None:
+                try:
+                    asset = await self.asset_store.ingest(result["image_url"])
+                except Exception as e:
+                    logger.warning("Could not store image for concept %s: %s", concept["name"], e)
+            if asset is not None:
+                variations = {
+                    "primary": asset["primary"],
+                    "horizontal": asset["horizontal"],
+                    "icon": asset["icon"],
+                    "favicon": asset["favicon"]
+                }
+            else:
+                variations = {
+                    "primary": result["image_url"],
+                    "horizontal": result["image_url"],
+                    "icon": result["image_url"]
+                }
+
+            await self.ledger.record({
+                "key": result["key"],
+                "source": "cache" if result["cached"] else "provider",
+                "prompt": prompt,
+                "model": result.get("model"),
+                "params": IMAGE_PARAMS,
+                "concept": concept["name"],
+                "source_url": result["image_url"],
+                "digest": asset["digest"] if asset else None,
+                "candidates": len(result.get("image_urls") or [result["image_url"]])
+            })
+
+            events.emit(
+                "image",
+                concept_id=concept["concept_id"],
+                concept_name=concept["name"],
+                image_url=variations["primary"]
+            )
+
+            return {
+                "concept_id": concept["concept_id"],
+                "concept_name": concept["name"],
+                "image_url": variations["primary"],
+                "source_url": result["image_url"],
+                "asset_digest": asset["digest"] if asset else None,
+                "variations": variations,
+                "generation_metadata": {
+                    "prompt_used": prompt,
+                    "generation_time": result.get("generation_time", "unknown"),
+                    "model": result.get("model", "replicate/unknown"),
+                    "cached": result["cached"]
+                }
+            }
+
+        concepts = state["design_concepts"]
+        if pending is None:
+            # A full round (first generation, or after feedback) starts every concept's count again
+            targets, kept, attempts = concepts, {}, {}
+        else:
+            kept = {logo["concept_id"]: logo for logo in state.get("generated_logos") or []}
+            targets = [c for c in concepts if c["concept_id"] in pending or c["concept_id"] not in kept]
+            attempts = dict(state.get("concept_attempts") or {})
+
+        fresh = {
+            logo["concept_id"]: logo
+            for logo in await asyncio.gather(*[generate_for_concept(c) for c in targets])
+        }
+        for concept in targets:
+            attempts[str(concept["concept_id"])] = attempts.get(str(concept["concept_id"]), 0) + 1
+        generated_logos = [fresh.get(c["concept_id"]) or kept[c["concept_id"]] for c in concepts]
 
         image_message = {
             "role": "assistant",
-            "content": "🖼️ Here are your logo concepts:\n" +
-                    "\n".join([logo["image_url"] for logo in generated_logos])
+            "content": ("🖼️ Here are your logo concepts:\n" if pending is None else "🖼️ Regenerated concepts:\n") +
+                    "\n".join([logo["image_url"] for logo in fresh.values()])
         }
         state["conversation_history"].append(image_message)
 
         return {
             **state,
             "generated_logos": generated_logos,
+            "seen_digests": seen + [logo["asset_digest"] for logo in fresh.values() if logo.get("asset_digest")],
+            "concept_attempts": attempts,
             "generation_attempts": state.get("generation_attempts", 0) + 1,
             "current_step": "ranking"
         }
     
     
-    def ranking_agent(self, state: LogoDesignState) -> LogoDesignState:
+    async def ranking_agent(self, state: LogoDesignState) -> LogoDesignState:
         """Evaluates generated logos for quality and adherence to requirements"""
         
         system_prompt = """You are a logo quality assessor. Evaluate each generated logo against the client requirements.
@@ -329,57 +559,104 @@ class LogoDesignAgents:
         
         Mark as "pass" if at least one logo scores 28+ total points with no major issues."""
         
-        # In production, you'd analyze actual images here
-        # For now, simulate the ranking process
-        
-        ranking_results = {
-            "overall_quality": "pass",
-            "best_concept_id": 1,
-            "assessments": [
-                {
-                    "concept_id": 1,
-                    "scores": {
-                        "design_quality": 9,
-                        "brand_alignment": 8,
-                        "technical_quality": 8,
-                        "uniqueness": 9
-                    },
-                    "total_score": 34,
-                    "issues": [],
-                    "recommendation": "Approved - excellent quality"
-                },
-                {
-                    "concept_id": 2,
-                    "scores": {
-                        "design_quality": 7,
-                        "brand_alignment": 8,
-                        "technical_quality": 6,
-                        "uniqueness": 7
-                    },
-                    "total_score": 28,
-                    "issues": ["Text could be clearer at small sizes"],
-                    "recommendation": "Approved with minor concerns"
-                }
-            ],
-            "regeneration_needed": False,
-            "regeneration_reasons": []
+        # Logos kept from an earlier round keep their assessment; only new ones are scored
+        pending = state.get("pending_concepts")
+        previous = {
+            a["concept_id"]: a for a in (state.get("ranking_results") or {}).get("assessments") or []
+            if pending is not None and a["concept_id"] not in pending and "passed" in a
         }
-        
-        needs_regeneration = (
-            ranking_results["overall_quality"] == "fail" and
-            state.get("generation_attempts", 0) < state.get("max_attempts", 3)
+        logos = state.get("generated_logos") or []
+
+        # Stage one: download and score locally; each image is scored as soon as it arrives
+        candidates = await asyncio.gather(
+            *[download_and_score(logo, self.asset_store) for logo in logos if logo["concept_id"] not in previous]
         )
-        
+        survivors = [c for c in candidates if c["passed"]]
+
+        # Stage two: a single batched vision request for everything that survived
+        vision_scores = {}
+        if survivors:
+            try:
+                with self.router.call("ranking", state) as route:
+                    vision_scores = await vision_assessment(
+                        self.llm(route.model), system_prompt, state.get("client_requirements"), survivors
+                    )
+            except Exception:
+                logger.exception("Vision ranking failed, falling back to local scores")
+
+        fresh = {}
+        for candidate in candidates:
+            concept_id = candidate["logo"]["concept_id"]
+            local_score = candidate["score"]
+            vision = vision_scores.get(concept_id)
+
+            if not candidate["passed"]:
+                scores = {"design_quality": 0, "brand_alignment": 0, "technical_quality": local_score, "uniqueness": 0}
+                issues = candidate["issues"]
+                recommendation = "Rejected by local pre-filter"
+            elif vision:
+                scores = {
+                    key: float((vision.get("scores") or {}).get(key, 0) or 0)
+                    for key in ("design_quality", "brand_alignment", "technical_quality", "uniqueness")
+                }
+                # Blend the model's technical score with the measured one
+                scores["technical_quality"] = round((scores["technical_quality"] + local_score) / 2, 1)
+                issues = list(vision.get("issues") or [])
+                recommendation = vision.get("recommendation", "")
+            else:
+                scores = {key: local_score for key in ("design_quality", "brand_alignment", "technical_quality", "uniqueness")}
+                issues = []
+                recommendation = "Scored locally only"
+
+            total_score = round(sum(scores.values()), 1)
+            fresh[concept_id] = {
+                "concept_id": concept_id,
+                "scores": scores,
+                "total_score": total_score,
+                "issues": issues,
+                "recommendation": recommendation,
+                "local_metrics": candidate.get("features", {}),
+                "passed": candidate["passed"] and total_score >= PASS_SCORE
+            }
+
+        assessments = [
+            fresh.get(logo["concept_id"]) or previous[logo["concept_id"]]
+            for logo in logos if logo["concept_id"] in fresh or logo["concept_id"] in previous
+        ]
+        passing = [a for a in assessments if a["passed"]]
+        failed = [a for a in assessments if not a["passed"]]
+        ranked = sorted(passing or assessments, key=lambda a: a["total_score"], reverse=True)
+
+        # Each failed concept gets up to max_attempts generations of its own
+        attempts = state.get("concept_attempts") or {}
+        retry = [
+            a["concept_id"] for a in failed
+            if attempts.get(str(a["concept_id"]), 0) < state.get("max_attempts", 3)
+        ]
+        needs_regeneration = bool(retry)
+        ranking_results = {
+            "overall_quality": "pass" if passing else "fail",
+            "best_concept_id": ranked[0]["concept_id"] if ranked else None,
+            "assessments": assessments,
+            "regeneration_needed": needs_regeneration,
+            "regenerate_concepts": retry,
+            "regeneration_reasons": [
+                f"Concept {a['concept_id']}: {issue}" for a in failed for issue in a["issues"]
+            ]
+        }
+
         next_step = "regenerate" if needs_regeneration else "user_review"
-        
+
         return {
             **state,
             "ranking_results": ranking_results,
             "needs_regeneration": needs_regeneration,
+            # The next generator round only redoes these; None means every concept
+            "pending_concepts": retry if needs_regeneration else None,
             "current_step": next_step
         }
     
-    def feedback_agent(self, state: LogoDesignState) -> LogoDesignState:
+    async def feedback_agent(self, state: LogoDesignState) -> LogoDesignState:
         """Handles user feedback and iterations"""
         
         system_prompt = """You are a design iteration specialist. Analyze user feedback and determine next steps.
@@ -410,7 +687,8 @@ class LogoDesignAgents:
             HumanMessage(content=f"Feedback Context:\n{json.dumps(feedback_context, indent=2)}")
         ]
         
-        response = self.llm.invoke(messages)
+        with self.router.call("feedback", state) as route:
+            response = await self.llm(route.model, temperature=0).ainvoke(messages)
         
         try:
             feedback_analysis = json.loads(response.content)
@@ -435,35 +713,36 @@ class LogoDesignAgents:
         except json.JSONDecodeError:
             return {
                 **state,
-                "error_message": "Failed to parse feedback analysis",
-                "current_step": "error"
+                "error_message": "Failed to parse feedback analysis"
             }
     
-    def package_agent(self, state: LogoDesignState) -> LogoDesignState:
+    async def package_agent(self, state: LogoDesignState) -> LogoDesignState:
         """Creates final package with all logo assets"""
-        
+
         # Get the best logo concepts based on ranking
+        logos = state.get("generated_logos") or []
         best_concepts = []
         if state.get("ranking_results"):
             best_concept_id = state["ranking_results"]["best_concept_id"]
             best_concepts = [
-                logo for logo in state["generated_logos"] 
+                logo for logo in logos
                 if logo["concept_id"] == best_concept_id
             ]
-        
-        # Create package structure
+        best_concepts = best_concepts or logos[:1]
+        if not best_concepts:
+            return {
+                **state,
+                "error_message": "No generated logo to package"
+            }
+
+        package_id = f"logo_package_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        client_info = state.get("client_requirements") or {}
         package_data = {
-            "package_id": f"logo_package_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            "client_info": state.get("client_requirements", {}),
+            "client_info": client_info,
+            "company_name": (client_info.get("company_details") or {}).get("name"),
             "final_logos": best_concepts,
             "color_palette": self._extract_color_palette(state),
             "brand_guidelines": self._create_brand_guidelines(state),
-            "file_deliverables": {
-                "svg_files": ["logo.svg", "logo_horizontal.svg", "logo_icon.svg"],
-                "png_files": ["logo_300dpi.png", "logo_web.png"],
-                "pdf_files": ["logo_vector.pdf", "brand_guidelines.pdf"],
-                "additional": ["favicon.ico", "social_media_kit.zip"]
-            },
             "usage_guidelines": self._create_usage_guidelines(state),
             "technical_specs": {
                 "color_codes": {"primary": "#000000", "secondary": "#ffffff"},
@@ -471,23 +750,34 @@ class LogoDesignAgents:
                 "minimum_sizes": {"print": "1 inch", "digital": "32px"}
             }
         }
-        
-        # In production, you'd actually generate PDF, ZIP files, etc.
-        package_path = f"packages/{package_data['package_id']}.pdf"
-        
+
+        try:
+            manifest = await self.package_builder.build(package_id, best_concepts[0], package_data)
+        except Exception as e:
+            logger.exception("Package build failed")
+            return {
+                **state,
+                "error_message": f"Package build error: {str(e)}"
+            }
+
+        events.emit("package", package_id=package_id, download_url=manifest["download_url"])
         return {
             **state,
-            "final_package": package_path,
+            "final_package": manifest["download_url"],
             "current_step": "complete"
         }
-    
+
     def _extract_color_palette(self, state: LogoDesignState) -> Dict[str, str]:
         """Extract color palette from design concepts"""
         if not state.get("design_concepts"):
             return {}
         
         # Get colors from the best concept
-        best_concept = state["design_concepts"][0]  # Simplified
+        best_concept_id = (state.get("ranking_results") or {}).get("best_concept_id")
+        best_concept = next(
+            (c for c in state["design_concepts"] if c.get("concept_id") == best_concept_id),
+            state["design_concepts"][0]
+        )
         return best_concept.get("color_palette", {})
     
     def _create_brand_guidelines(self, state: LogoDesignState) -> Dict[str, Any]:
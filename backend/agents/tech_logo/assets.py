@@ -0,0 +1,254 @@
+import io
+import os
+import re
+import time
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional
+from PIL import Image
+from llms.clients import provider_clients
+from agents.tech_logo.variants import render_variants, ready
+
+logger = logging.getLogger(__name__)
+
+VARIANTS = ("horizontal", "icon", "favicon")
+ASSET_NAME = re.compile(r"^([0-9a-f]{64})(-(horizontal|icon|favicon))?\.(png|ico)$")
+
+
+def _normalize(data: bytes) -> bytes:
+    """Re-encode whatever the provider returned as PNG so stored originals are uniform"""
+    with Image.open(io.BytesIO(data)) as image:
+        if image.format == "PNG":
+            return data
+        buffer = io.BytesIO()
+        image.convert("RGBA" if "A" in image.getbands() else "RGB").save(buffer, format="PNG")
+        return buffer.getvalue()
+
+
+class AssetStore:
+    """Content-addressed store for generated logos and their locally derived variants.
+
+    Every file is named after the SHA-256 of the original image, so the same
+    image is only downloaded, written and resized once. Variants are rendered
+    in a process pool. Once the store grows past max_bytes, whole assets
+    (original plus variants) are evicted, least recently used first.
+    """
+
+    def __init__(
+        self,
+        root: str = "data/assets",
+        max_bytes: int = 2 * 2**30,
+        max_concurrent_downloads: int = 8,
+        workers: int = 2,
+        url_prefix: str = "/assets"
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.url_prefix = url_prefix
+        self.workers = workers
+        self._downloads = asyncio.Semaphore(max_concurrent_downloads)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # digest -> [bytes on disk, last access]
+        self._index: Optional[Dict[str, list]] = None
+        self._size = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        os.makedirs(root, exist_ok=True)
+
+    def _directory(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2])
+
+    def path_for(self, name: str) -> Optional[str]:
+        """Filesystem path of an asset file name, or None if the name is not a valid asset"""
+        match = ASSET_NAME.match(name)
+        if not match:
+            return None
+        path = os.path.join(self._directory(match.group(1)), name)
+        return path if os.path.exists(path) else None
+
+    def _url(self, name: str) -> str:
+        return f"{self.url_prefix}/{name}"
+
+    def _load_index(self) -> Dict[str, list]:
+        index: Dict[str, list] = {}
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                match = ASSET_NAME.match(name)
+                if not match:
+                    continue
+                stat = os.stat(os.path.join(directory, name))
+                entry = index.setdefault(match.group(1), [0, 0.0])
+                entry[0] += stat.st_size
+                entry[1] = max(entry[1], stat.st_mtime)
+        return index
+
+    async def _ensure_index(self):
+        if self._index is None:
+            self._index = await asyncio.to_thread(self._load_index)
+            self._size = sum(entry[0] for entry in self._index.values())
+
+    def executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn, not fork: the parent runs an event loop and client threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def _write(self, digest: str, data: bytes) -> int:
+        directory = self._directory(digest)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{digest}.png")
+        if not os.path.exists(path):
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return os.path.getsize(path)
+
+    def _variant_files(self, digest: str) -> Dict[str, str]:
+        names = {
+            "horizontal": f"{digest}-horizontal.png",
+            "icon": f"{digest}-icon.png",
+            "favicon": f"{digest}-favicon.ico"
+        }
+        directory = self._directory(digest)
+        if all(os.path.exists(os.path.join(directory, n)) for n in names.values()):
+            return names
+        return {}
+
+    def _describe(self, digest: str, variants: Dict[str, str], source_url: Optional[str]) -> Dict[str, Any]:
+        return {
+            "digest": digest,
+            "source_url": source_url,
+            "primary": self._url(f"{digest}.png"),
+            **{name: self._url(filename) for name, filename in variants.items()}
+        }
+
+    async def get(self, digest: str, source_url: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """The stored asset for `digest`, or None if it was never stored or has been evicted"""
+        await self._ensure_index()
+        if digest not in self._index:
+            return None
+        variants = await asyncio.to_thread(self._variant_files, digest)
+        if not variants:
+            return None
+        self.touch(f"{digest}.png")
+        return self._describe(digest, variants, source_url)
+
+    async def ingest(self, url: str) -> Dict[str, Any]:
+        """Download an image once, store it by content hash and derive its variants"""
+        async with self._downloads:
+            async with provider_clients.http_session().get(url) as resp:
+                resp.raise_for_status()
+                data = await resp.read()
+        return await self.add(data, url)
+
+    async def add(self, data: bytes, source_url: Optional[str] = None) -> Dict[str, Any]:
+        """Store image bytes by content hash and derive its variants"""
+        await self._ensure_index()
+        data = await asyncio.to_thread(_normalize, data)
+        digest = hashlib.sha256(data).hexdigest()
+
+        # Concurrent ingests of identical content share one render
+        pending = self._inflight.get(digest)
+        if pending is not None:
+            return self._describe(digest, await asyncio.shield(pending), source_url)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[digest] = future
+        try:
+            size = await asyncio.to_thread(self._write, digest, data)
+            variants = await asyncio.to_thread(self._variant_files, digest)
+            if not variants:
+                variants = await asyncio.get_running_loop().run_in_executor(
+                    self.executor(),
+                    render_variants,
+                    os.path.join(self._directory(digest), f"{digest}.png"),
+                    self._directory(digest),
+                    digest
+                )
+                size += sum(
+                    os.path.getsize(os.path.join(self._directory(digest), name)) for name in variants.values()
+                )
+            self._track(digest, size)
+            future.set_result(variants)
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be awaiting it; mark the exception retrieved
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(digest, None)
+
+        await self._evict()
+        return self._describe(digest, variants, source_url)
+
+    def _track(self, digest: str, size: int):
+        entry = self._index.get(digest)
+        if entry is None:
+            self._index[digest] = [size, time.time()]
+            self._size += size
+        else:
+            self._size += size - entry[0]
+            entry[0] = size
+            entry[1] = time.time()
+
+    def touch(self, name: str):
+        """Record a read so hot assets survive eviction"""
+        match = ASSET_NAME.match(name)
+        if match and self._index is not None and match.group(1) in self._index:
+            self._index[match.group(1)][1] = time.time()
+
+    def read(self, digest: str) -> bytes:
+        with open(os.path.join(self._directory(digest), f"{digest}.png"), "rb") as f:
+            return f.read()
+
+    def _delete(self, digest: str):
+        directory = self._directory(digest)
+        for name in [f"{digest}.png"] + [f"{digest}-{v}.{'ico' if v == 'favicon' else 'png'}" for v in VARIANTS]:
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+
+    async def _evict(self):
+        if self._size <= self.max_bytes:
+            return
+        victims = []
+        for digest, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._size <= self.max_bytes:
+                break
+            if digest in self._inflight:
+                continue
+            victims.append(digest)
+            self._size -= size
+            del self._index[digest]
+        for digest in victims:
+            await asyncio.to_thread(self._delete, digest)
+
+    async def warm_up(self):
+        """Start every pool worker and load the index now rather than on the first generated logo"""
+        loop = asyncio.get_running_loop()
+        executor = self.executor()
+        pids = await asyncio.gather(*(loop.run_in_executor(executor, ready) for _ in range(self.workers)))
+        await self._ensure_index()
+        logger.debug("Asset workers ready: %s", sorted(set(pids)))
+
+    def shutdown(self, wait: bool = False):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+
+
+def create_asset_store() -> AssetStore:
+    """Build the store from ASSET_* settings"""
+    return AssetStore(
+        root=os.getenv("ASSET_DIR", "data/assets"),
+        max_bytes=int(os.getenv("ASSET_MAX_BYTES", str(2 * 2**30))),
+        max_concurrent_downloads=int(os.getenv("ASSET_MAX_DOWNLOADS", "8")),
+        workers=int(os.getenv("ASSET_WORKERS", str(min(4, os.cpu_count() or 1))))
+    )
@@ -0,0 +1,234 @@
+"""Batch mode: run structured briefs through design → generate → ranking → package, no chat.
+
+Each input line is a `client_requirements` object (the schema summary_agent
+emits), or {"id": ..., "client_requirements": {...}}. Results are appended
+to --out as each brief finishes. Running again with the same --out skips
+briefs that already completed. With CHECKPOINTER=sqlite, a brief that was
+interrupted also resumes from its last finished node.
+
+Run from backend/:
+  python -m agents.tech_logo.batch briefs.jsonl --out results.jsonl --concurrency 8
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import argparse
+from typing import Dict, Any, List, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from agents.tech_logo.workflow import LogoDesignOrchestrator
+
+logger = logging.getLogger(__name__)
+
+# Top-level sections of the summary_agent brief the designer relies on
+REQUIRED_SECTIONS = ("company_details", "brand_requirements", "design_specifications")
+
+
+def brief_id(requirements: Dict[str, Any]) -> str:
+    """Stable id for a brief without one, so reruns recognise it"""
+    raw = json.dumps(requirements, sort_keys=True, separators=(",", ":"))
+    return "brief-" + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def load_briefs(path: str) -> Tuple[List[Tuple[str, Dict[str, Any]]], List[Dict[str, Any]]]:
+    """(id, client_requirements) pairs, plus a result for every line that is not a usable brief"""
+    briefs = []
+    invalid = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                invalid.append({"id": f"line-{number}", "status": "invalid", "error": f"Bad JSON: {e}"})
+                continue
+            requirements = record.get("client_requirements", record) if isinstance(record, dict) else None
+            missing = [s for s in REQUIRED_SECTIONS if not isinstance(requirements, dict) or s not in requirements]
+            identifier = str(record.get("id")) if isinstance(record, dict) and record.get("id") else None
+            if missing:
+                invalid.append({
+                    "id": identifier or f"line-{number}",
+                    "status": "invalid",
+                    "error": f"Missing sections: {', '.join(missing)}"
+                })
+                continue
+            briefs.append((identifier or brief_id(requirements), requirements))
+    return briefs, invalid
+
+
+def recorded_ids(path: str, status: str) -> Set[str]:
+    """Ids an earlier run's output already records with `status`"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if result.get("status") == status:
+                done.add(result["id"])
+    return done
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class BatchRunner:
+    """Runs briefs with bounded concurrency and appends each result as it finishes.
+
+    Provider calls from all briefs share the process-wide scheduler, so its
+    rate limits and in-flight caps apply to the batch as a whole.
+    """
+
+    def __init__(self, orchestrator: "LogoDesignOrchestrator", out_path: str, concurrency: int = 4):
+        self.orchestrator = orchestrator
+        self.out_path = out_path
+        self.concurrency = concurrency
+        self._write_lock = asyncio.Lock()
+        self.durations: List[float] = []
+        self.counts = {"completed": 0, "failed": 0, "invalid": 0, "skipped": 0}
+
+    def _append(self, result: Dict[str, Any]):
+        with open(self.out_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result) + "\n")
+
+    async def write(self, result: Dict[str, Any]):
+        async with self._write_lock:
+            await asyncio.to_thread(self._append, result)
+        self.counts[result["status"]] += 1
+
+    def _result(self, identifier: str, state: Dict[str, Any], seconds: float) -> Dict[str, Any]:
+        ranking = state.get("ranking_results") or {}
+        package_url = state.get("final_package")
+        package_dir = None
+        if package_url:
+            package_id = package_url.rsplit("/", 1)[-1].removesuffix(".zip")
+            package_dir = os.path.join(self.orchestrator.package_builder.root, package_id)
+        return {
+            "id": identifier,
+            "status": "completed" if state.get("current_step") == "complete" else "failed",
+            "seconds": round(seconds, 3),
+            "package_url": package_url,
+            "package_dir": package_dir,
+            "best_concept_id": ranking.get("best_concept_id"),
+            "generation_attempts": state.get("generation_attempts"),
+            "logos": [
+                {"concept_id": logo["concept_id"], "concept_name": logo["concept_name"], "image_url": logo["image_url"]}
+                for logo in state.get("generated_logos") or []
+            ],
+            "error": state.get("error_message")
+        }
+
+    async def _run_one(self, identifier: str, requirements: Dict[str, Any], semaphore: asyncio.Semaphore):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                state = await self.orchestrator.run_brief(f"batch:{identifier}", requirements)
+            except Exception as e:
+                logger.warning("Brief %s failed", identifier, exc_info=True)
+                state = {"current_step": "error", "error_message": f"{type(e).__name__}: {e}"}
+            seconds = time.perf_counter() - started
+            result = self._result(identifier, state, seconds)
+            if result["status"] == "completed":
+                self.durations.append(seconds)
+            await self.write(result)
+            logger.info("%s %s in %.1fs", identifier, result["status"], seconds)
+
+    async def run(self, briefs: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        done = await asyncio.to_thread(recorded_ids, self.out_path, "completed")
+        pending = [(i, r) for i, r in briefs if i not in done]
+        self.counts["skipped"] = len(briefs) - len(pending)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started = time.perf_counter()
+        await asyncio.gather(*(self._run_one(i, r, semaphore) for i, r in pending))
+        wall = time.perf_counter() - started
+
+        return {
+            **self.counts,
+            "wall_seconds": round(wall, 2),
+            "briefs_per_minute": round(self.counts["completed"] / wall * 60, 2) if wall > 0 else None,
+            "brief_seconds_p50": _percentile(self.durations, 0.5),
+            "brief_seconds_p95": _percentile(self.durations, 0.95)
+        }
+
+
+def print_report(report: Dict[str, Any]):
+    def seconds(value):
+        return "-" if value is None else f"{value:.1f}s"
+
+    print(
+        f"\nbriefs: {report['completed']} completed, {report['failed']} failed, {report['invalid']} invalid, "
+        f"{report['skipped']} already done",
+        file=sys.stderr
+    )
+    print(
+        f"throughput: {report['briefs_per_minute']} briefs/min over {report['wall_seconds']}s "
+        f"(per brief p50 {seconds(report['brief_seconds_p50'])}, p95 {seconds(report['brief_seconds_p95'])})",
+        file=sys.stderr
+    )
+
+
+async def run_batch(args) -> Dict[str, Any]:
+    from agents.tech_logo.workflow import LogoDesignOrchestrator
+
+    briefs, invalid = await asyncio.to_thread(load_briefs, args.briefs)
+    orchestrator = LogoDesignOrchestrator()
+    runner = BatchRunner(orchestrator, args.out, concurrency=args.concurrency)
+    try:
+        reported = await asyncio.to_thread(recorded_ids, args.out, "invalid")
+        for result in invalid:
+            if result["id"] not in reported:
+                await runner.write(result)
+        return await runner.run(briefs)
+    finally:
+        from llms.clients import provider_clients
+        await provider_clients.aclose()
+        await orchestrator.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run client briefs through design → package without the chat")
+    parser.add_argument("briefs", help="JSONL of client_requirements objects")
+    parser.add_argument("--out", default="batch_results.jsonl", help="JSONL results, appended as briefs finish")
+    parser.add_argument("--concurrency", type=int, default=4, help="Briefs in flight at once")
+    parser.add_argument("--openai-rps", type=float, help="Overrides OPENAI_RPS")
+    parser.add_argument("--replicate-rps", type=float, help="Overrides REPLICATE_RPS")
+    parser.add_argument("--replicate-max-in-flight", type=int, help="Overrides REPLICATE_MAX_IN_FLIGHT")
+    parser.add_argument("--json", help="Also write the throughput report to this file")
+    args = parser.parse_args()
+
+    # The provider scheduler reads its limits when first imported, which run_batch does later
+    for flag, env in (
+        ("openai_rps", "OPENAI_RPS"),
+        ("replicate_rps", "REPLICATE_RPS"),
+        ("replicate_max_in_flight", "REPLICATE_MAX_IN_FLIGHT")
+    ):
+        if getattr(args, flag) is not None:
+            os.environ[env] = str(getattr(args, flag))
+
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    report = asyncio.run(run_batch(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    sys.exit(1 if report["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import os
+import asyncio
+from typing import List, Dict, Optional, Callable, Awaitable
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, AIMessage
+from agents.tech_logo.state import LogoDesignState
+
+# Fixed per-message overhead OpenAI adds for role/separators
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_encoders: Dict[str, Optional[object]] = {}
+
+
+def _encoder(model: str) -> Optional[object]:
+    if model not in _encoders:
+        try:
+            import tiktoken
+            _encoders[model] = tiktoken.encoding_for_model(model)
+        except Exception:
+            # Unknown model or encoding files not downloadable (offline deploys)
+            _encoders[model] = None
+    return _encoders[model]
+
+
+async def load_encoder(model: str = "gpt-4"):
+    """Load the tokenizer for `model` in a thread; importing tiktoken and reading its BPE file takes ~350ms"""
+    if model not in _encoders:
+        await asyncio.to_thread(_encoder, model)
+
+
+def count_tokens(text: str, model: str = "gpt-4") -> int:
+    """Token count via tiktoken, falling back to ~4 chars/token if the encoding is unavailable"""
+    encoder = _encoder(model)
+    if encoder is None:
+        return max(1, len(text) // 4)
+    return len(encoder.encode(text))
+
+
+class ConversationContext:
+    """Token-budgeted, incrementally counted view of a session's conversation.
+
+    `conversation_history` stays the append-only record shown to the client.
+    Per-message token counts are cached in `history_token_counts` and only
+    new messages get counted. When the unsummarized window goes over the
+    budget, the oldest turns are folded into `context_summary` and dropped
+    from the prompt.
+    """
+
+    def __init__(
+        self,
+        summarize: Callable[[str], Awaitable[str]],
+        token_budget: int = 3000,
+        model: str = "gpt-4"
+    ):
+        self.summarize = summarize
+        self.token_budget = token_budget
+        self.model = model
+
+    @staticmethod
+    def append(state: LogoDesignState, role: str, content: str) -> bool:
+        """Append a message unless it repeats the last one; returns True if appended"""
+        history = state["conversation_history"]
+        if history and history[-1]["role"] == role and history[-1]["content"] == content:
+            return False
+        history.append({"role": role, "content": content})
+        return True
+
+    def _sync_counts(self, state: LogoDesignState) -> List[int]:
+        history = state["conversation_history"]
+        counts = state.get("history_token_counts") or []
+        for msg in history[len(counts):]:
+            counts.append(count_tokens(msg["content"], self.model) + MESSAGE_OVERHEAD_TOKENS)
+        state["history_token_counts"] = counts
+        return counts
+
+    async def _fold(self, state: LogoDesignState, counts: List[int]):
+        """Summarize the oldest turns until the window fits in half the budget"""
+        start = state.get("summarized_upto") or 0
+        history = state["conversation_history"]
+        window_tokens = sum(counts[start:])
+
+        end = start
+        # Always keep the last exchange verbatim
+        while window_tokens > self.token_budget // 2 and end < len(history) - 2:
+            window_tokens -= counts[end]
+            end += 1
+        if end == start:
+            return
+
+        folded = "\n".join(f"{msg['role']}: {msg['content']}" for msg in history[start:end])
+        previous = state.get("context_summary")
+        text = f"Existing summary:\n{previous}\n\nNew turns:\n{folded}" if previous else folded
+        state["context_summary"] = await self.summarize(text)
+        state["summarized_upto"] = end
+
+    async def build_messages(self, state: LogoDesignState, system_prompt: str) -> List[BaseMessage]:
+        # Normally loaded by the warm-up; otherwise the first turn loads it without blocking the loop
+        await load_encoder(self.model)
+        counts = self._sync_counts(state)
+        start = state.get("summarized_upto") or 0
+        if sum(counts[start:]) > self.token_budget:
+            await self._fold(state, counts)
+            start = state["summarized_upto"]
+
+        messages: List[BaseMessage] = [SystemMessage(content=system_prompt)]
+        if state.get("context_summary"):
+            messages.append(SystemMessage(
+                content=f"Summary of the earlier conversation:\n{state['context_summary']}"
+            ))
+        for msg in state["conversation_history"][start:]:
+            if msg["role"] == "user":
+                messages.append(HumanMessage(content=msg["content"]))
+            else:
+                messages.append(AIMessage(content=msg["content"]))
+        return messages
+
+    def prompt_tokens(self, state: LogoDesignState, system_prompt: str) -> int:
+        """Prompt size of the next build_messages call, from the cached counts"""
+        counts = self._sync_counts(state)
+        start = state.get("summarized_upto") or 0
+        total = count_tokens(system_prompt, self.model) + MESSAGE_OVERHEAD_TOKENS + sum(counts[start:])
+        if state.get("context_summary"):
+            total += count_tokens(state["context_summary"], self.model) + MESSAGE_OVERHEAD_TOKENS
+        return total
+
+
+def default_token_budget() -> int:
+    return int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", "3000"))
@@ -0,0 +1,57 @@
+import json
+import asyncio
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, Union
+
+
+class Fanout:
+    """Every stream listening to one chat turn: its own caller's, plus those of identical messages that joined it"""
+
+    def __init__(self):
+        self.queues: List[asyncio.Queue] = []
+
+    def add(self, queue: Optional[asyncio.Queue]):
+        if queue is not None and queue not in self.queues:
+            self.queues.append(queue)
+
+    def put_nowait(self, event: Dict[str, Any]):
+        for queue in self.queues:
+            queue.put_nowait(event)
+
+
+# Queue of the stream listening to the current request, or the fan-out of the
+# turn it runs in, if any. Tasks spawned with asyncio.gather/create_task
+# inherit it, so agents can emit from anywhere.
+_listener: ContextVar[Optional[Union[asyncio.Queue, Fanout]]] = ContextVar("logo_design_listener", default=None)
+
+
+def listen(queue: Union[asyncio.Queue, Fanout]):
+    """Route events emitted in the current context to queue"""
+    return _listener.set(queue)
+
+
+def listener() -> Optional[Union[asyncio.Queue, Fanout]]:
+    """Where events emitted in the current context go, if anywhere"""
+    return _listener.get()
+
+
+def is_streaming() -> bool:
+    """True when someone is listening, so agents can pick a streaming code path"""
+    queue = _listener.get()
+    if isinstance(queue, Fanout):
+        return bool(queue.queues)
+    return queue is not None
+
+
+def emit(event: str, **data: Any):
+    """Push an event to the current listener; a no-op outside streaming requests"""
+    queue = _listener.get()
+    if queue is not None:
+        queue.put_nowait({"event": event, **data})
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Serialize an event as a Server-Sent Events frame"""
+    name = event.get("event", "message")
+    data = {k: v for k, v in event.items() if k != "event"}
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
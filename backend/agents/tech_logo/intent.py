@@ -0,0 +1,161 @@
+import os
+import re
+from typing import NamedTuple, Optional, List, Dict, Any
+from observability.metrics import registry
+
+CONFIRM = "confirm"
+REJECT = "reject"
+SMALL_TALK = "small_talk"
+OTHER = "other"
+
+chat_fast_path = registry.counter(
+    "chat_fast_path_total", "Chat turns answered locally or sent to the LLM, by detected intent", ["intent", "route"]
+)
+
+# Multi-word cues folded into one token before classification
+PHRASES = (
+    (r"\bgood (morning|afternoon|evening|day)\b", "greeting"),
+    (r"\bthank(s| you)( so much| very much| a lot)?\b", "thanks"),
+    (r"\bhow are (you|u)( doing)?\b", "howareyou"),
+    (r"\bwhat'?s up\b", "greeting"),
+    (r"\bno (problem|worries)\b", "noproblem"),
+    (r"\bnot (quite|really|exactly|yet)\b", "no"),
+    (r"\b((hold|hang) on( a sec(ond)?| a minute)?|one sec(ond)?)\b", "wait"),
+    (r"\b(go|going) ahead\b", "proceed"),
+    (r"\b(let'?s|lets) (go|do it|do this|proceed)\b", "proceed"),
+    (r"\b(spot on|nailed it|all good|works for me|sounds (good|great|right|perfect)|looks (good|great|right|perfect))\b", "good"),
+    (r"\b(that'?s|this is|it'?s) (it|right|correct|accurate)\b", "correct"),
+)
+
+CONFIRM_CUES = frozenset({
+    "yes", "yep", "yeah", "yea", "yup", "ya", "y", "ok", "okay", "k", "kk", "sure", "correct", "exactly", "right",
+    "perfect", "great", "good", "fine", "accurate", "lgtm", "absolutely", "definitely", "agreed", "agree",
+    "approve", "approved", "confirm", "confirmed", "proceed", "cool", "nice", "awesome", "excellent", "love",
+    "indeed", "totally", "precisely", "affirmative", "noproblem"
+})
+REJECT_CUES = frozenset({
+    "no", "nope", "nah", "wrong", "incorrect", "inaccurate", "wait", "stop", "redo", "change", "missing"
+})
+NEGATORS = frozenset({"not", "isn't", "isnt", "don't", "dont", "doesn't", "doesnt", "didn't", "didnt", "never"})
+SMALL_TALK_CUES = frozenset({
+    "hi", "hello", "hey", "heya", "hiya", "yo", "greeting", "thanks", "thx", "ty", "cheers", "howareyou",
+    "bye", "goodbye", "lol", "haha", "hah"
+})
+# Words that carry no requirement of their own
+FILLERS = frozenset({
+    "it", "that", "that's", "thats", "this", "is", "all", "please", "do", "so", "just", "very", "really", "much",
+    "the", "a", "me", "to", "seems", "everything", "you", "i", "think", "guess", "oh", "well", "then", "there",
+    "alex", "and", "sound", "sounds", "look", "looks", "seem", "captures", "covers", "pretty", "quite", "for",
+    "now", "again", "ahead",
+    "with", "what", "we", "us", "our", "am", "are", "be", "been", "was", "will", "would", "lets", "let's", "go",
+    "too", "also", "sir", "mate", "buddy", "man", "hmm", "um", "uh", "ah", "of", "course", "in", "sense", "makes"
+})
+EMOJI = {"👍": " yes ", "✅": " yes ", "👌": " ok ", "🙌": " great ", "👎": " no ", "❌": " no ", "🙏": " thanks ", "👋": " hi "}
+
+MAX_BARE_WORDS = 10
+
+
+class Intent(NamedTuple):
+    label: str
+    confidence: float
+
+
+def _tokens(message: str) -> List[str]:
+    text = message.lower().replace("’", "'")
+    for emoji, word in EMOJI.items():
+        text = text.replace(emoji, word)
+    for pattern, token in PHRASES:
+        text = re.sub(pattern, f" {token} ", text)
+    return re.findall(r"[a-z0-9']+", text)
+
+
+def detect_intent(message: str) -> Intent:
+    """Classify a chat message as confirm, reject, small talk or other.
+
+    Confidence is 1.0 only when every word is a cue or filler, so nothing
+    in the message could be a new requirement. Any content word lowers it
+    in proportion, and a trailing question mark halves it unless the
+    message is small talk ("how are you?").
+    """
+    tokens = _tokens(message)
+    if not tokens:
+        return Intent(OTHER, 0.0)
+
+    confirm = reject = small_talk = content = 0
+    negated = False
+    for index, token in enumerate(tokens):
+        if token in NEGATORS:
+            negated = True
+        elif token in CONFIRM_CUES:
+            # "not right", "doesn't look good": a negated confirmation is a rejection
+            if negated or (index and tokens[index - 1] in NEGATORS):
+                reject += 1
+            else:
+                confirm += 1
+        elif token in REJECT_CUES:
+            reject += 1
+        elif token in SMALL_TALK_CUES:
+            small_talk += 1
+        elif token not in FILLERS:
+            content += 1
+
+    if reject:
+        label, cues = REJECT, reject
+    elif confirm:
+        label, cues = CONFIRM, confirm
+    elif small_talk:
+        label, cues = SMALL_TALK, small_talk
+    else:
+        return Intent(OTHER, 0.0)
+
+    if content == 0 and len(tokens) <= MAX_BARE_WORDS and not (reject and confirm):
+        confidence = 1.0
+    else:
+        confidence = round(0.8 * cues / (cues + content + (confirm if reject else 0)), 2)
+    if message.rstrip().endswith("?") and label != SMALL_TALK:
+        confidence = round(confidence / 2, 2)
+    return Intent(label, confidence)
+
+
+def fast_path_threshold() -> Optional[float]:
+    """Minimum confidence for answering a turn without the LLM; None when INTENT_FAST_PATH=0"""
+    if os.getenv("INTENT_FAST_PATH", "1") == "0":
+        return None
+    return float(os.getenv("INTENT_FAST_PATH_CONFIDENCE", "0.9"))
+
+
+def _last_question(content: str) -> Optional[str]:
+    questions = re.findall(r"[^.!?\n]*\?", content)
+    return questions[-1].strip() if questions else None
+
+
+def local_reply(intent: Intent, message: str, history: List[Dict[str, Any]], recap_pending: bool) -> Optional[Dict[str, str]]:
+    """A reply and next step for a turn that needs no model, or None to ask the LLM.
+
+    Only turns whose outcome does not depend on what the user said beyond
+    the intent qualify: confirming or rejecting a recap, and small talk when
+    the last question can simply be asked again.
+    """
+    if intent.label == CONFIRM and recap_pending:
+        return {
+            "content": "Great, I have everything I need. I'll put the brief together and start on your logo concepts now.",
+            "current_step": "summary"
+        }
+    if intent.label == REJECT and recap_pending:
+        return {"content": "No problem. What would you like me to change?", "current_step": "chat"}
+    if intent.label == SMALL_TALK:
+        previous = next((m["content"] for m in reversed(history) if m["role"] == "assistant"), "")
+        question = _last_question(previous)
+        if not question:
+            return None
+        tokens = set(_tokens(message))
+        if tokens & {"thanks", "thx", "ty", "cheers"}:
+            opener = "You're welcome!"
+        elif "howareyou" in tokens:
+            opener = "I'm doing well, thanks for asking!"
+        elif tokens & {"bye", "goodbye"}:
+            opener = "Before you go,"
+        else:
+            opener = "Hi!"
+        return {"content": f"{opener} {question}", "current_step": "chat"}
+    return None
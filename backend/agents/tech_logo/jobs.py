@@ -0,0 +1,174 @@
+import os
+import time
+import uuid
+import asyncio
+import contextvars
+from collections import OrderedDict, deque
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at capacity"""
+
+
+class Job:
+    """A unit of background work and its lifecycle timestamps"""
+
+    def __init__(
+        self,
+        session_id: str,
+        run: Callable[[], Awaitable[Any]],
+        context: contextvars.Context,
+        job_id: Optional[str] = None
+    ):
+        self.job_id = job_id or str(uuid.uuid4())
+        self.session_id = session_id
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.result: Any = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.done = asyncio.Event()
+        self._run = run
+        self._context = context
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "session_id": self.session_id,
+            "status": self.status,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "wait_seconds": (self.started_at or time.time()) - self.submitted_at,
+            "run_seconds": (self.finished_at or time.time()) - self.started_at if self.started_at else None
+        }
+
+
+class JobEngine:
+    """Bounded worker pool that runs pipelines outside the HTTP request"""
+
+    def __init__(self, max_concurrent: int = 2, max_queue: int = 100, keep_finished: int = 1000):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.keep_finished = keep_finished
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list = []
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._running = 0
+        self._wait_times: deque = deque(maxlen=500)
+        self._completed = 0
+        self._failed = 0
+
+    def _ensure_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker(), name=f"pipeline-worker-{i}")
+                for i in range(self.max_concurrent)
+            ]
+
+    async def _worker(self):
+        while True:
+            job: Job = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            self._wait_times.append(job.started_at - job.submitted_at)
+            self._running += 1
+            try:
+                # Run in the submitter's context so stream listeners still see events
+                job.result = await asyncio.create_task(job._run(), context=job._context)
+                job.status = "completed"
+                self._completed += 1
+            except asyncio.CancelledError:
+                job.status = "cancelled"
+                raise
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                self._failed += 1
+            finally:
+                job.finished_at = time.time()
+                self._running -= 1
+                job.done.set()
+                self._queue.task_done()
+                self._trim()
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done.is_set()]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+    def submit(self, session_id: str, run: Callable[[], Awaitable[Any]], job_id: Optional[str] = None) -> Job:
+        """Queue run() and return immediately; raises QueueFullError when saturated"""
+        self._ensure_workers()
+        job = Job(session_id, run, contextvars.copy_context(), job_id=job_id)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Pipeline queue is full ({self.max_queue} jobs)")
+        self._jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            await job.done.wait()
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._wait_times)
+        return {
+            "max_concurrent": self.max_concurrent,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_capacity": self.max_queue,
+            "running": self._running,
+            "completed": self._completed,
+            "failed": self._failed,
+            "wait_seconds_avg": sum(waits) / len(waits) if waits else 0.0,
+            "wait_seconds_p95": waits[int(len(waits) * 0.95)] if waits else 0.0,
+            "wait_seconds_max": waits[-1] if waits else 0.0
+        }
+
+    def metric_samples(self):
+        """(name, type, help, labels, value) samples for the /metrics registry"""
+        stats = self.stats()
+        yield ("pipeline_queue_depth", "gauge", "Pipeline jobs waiting for a worker", {}, stats["queue_depth"])
+        yield ("pipeline_jobs_running", "gauge", "Pipeline jobs currently running", {}, stats["running"])
+        for status in ("completed", "failed"):
+            yield (
+                "pipeline_jobs_finished_total", "counter", "Pipeline jobs finished by outcome",
+                {"status": status}, stats[status]
+            )
+        yield (
+            "pipeline_queue_wait_seconds_p95", "gauge", "p95 queue wait over recent jobs",
+            {}, stats["wait_seconds_p95"]
+        )
+
+    async def shutdown(self):
+        """Cancel the workers and drop anything still queued"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        while self._queue is not None and not self._queue.empty():
+            job = self._queue.get_nowait()
+            job.status = "cancelled"
+            job.done.set()
+        self._queue = None
+
+
+def create_job_engine() -> JobEngine:
+    """Build the engine sized by PIPELINE_WORKERS / PIPELINE_QUEUE_SIZE"""
+    return JobEngine(
+        max_concurrent=int(os.getenv("PIPELINE_WORKERS", "2")),
+        max_queue=int(os.getenv("PIPELINE_QUEUE_SIZE", "100"))
+    )
@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict, deque
+from typing import Dict, Any, List, Optional, Iterable, Set
+from observability.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+image_cache_lookups = registry.counter(
+    "image_cache_lookups_total", "Image generations served from the ledger cache or sent to a provider", ["result"]
+)
+
+
+def generation_key(prompt: str, model: str, params: Dict[str, Any]) -> str:
+    """Identity of an image request: the same prompt, model and parameters give the same key"""
+    raw = json.dumps({"prompt": prompt, "model": model, "params": params}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class GenerationLedger:
+    """Append-only JSONL record of every image generation, indexed by request key.
+
+    `record()` indexes an entry at once and queues it. Queued entries are
+    appended to the file in batches from a background task, once
+    `batch_size` are waiting or `flush_interval` has passed. A crash loses
+    at most that window, and a torn last line is skipped on reload. The
+    in-memory index keeps the newest `per_key` entries for up to `max_keys`
+    keys. The file keeps everything.
+    """
+
+    def __init__(
+        self,
+        path: str = "data/generations.jsonl",
+        batch_size: int = 64,
+        flush_interval: float = 0.5,
+        max_keys: int = 100_000,
+        per_key: int = 16,
+        cache_enabled: bool = True
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_keys = max_keys
+        self.per_key = per_key
+        self.cache_enabled = cache_enabled
+        # key -> newest entries last; least recently used key first
+        self._index: Optional["OrderedDict[str, deque]"] = None
+        self._index_lock = asyncio.Lock()
+        self._pending: List[Dict[str, Any]] = []
+        self._write_lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+        # Full-batch flushes in progress; held so they are not garbage collected and close() can wait for them
+        self._flushes: Set[asyncio.Task] = set()
+        self.entries_written = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _load(self) -> "OrderedDict[str, deque]":
+        index: "OrderedDict[str, deque]" = OrderedDict()
+        if not os.path.exists(self.path):
+            return index
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._add(index, entry)
+        return index
+
+    def _add(self, index: "OrderedDict[str, deque]", entry: Dict[str, Any]):
+        entries = index.get(entry["key"])
+        if entries is None:
+            entries = index[entry["key"]] = deque(maxlen=self.per_key)
+        else:
+            index.move_to_end(entry["key"])
+        entries.append(entry)
+        while len(index) > self.max_keys:
+            index.popitem(last=False)
+
+    async def _ensure_index(self) -> "OrderedDict[str, deque]":
+        if self._index is None:
+            async with self._index_lock:
+                if self._index is None:
+                    self._index = await asyncio.to_thread(self._load)
+        return self._index
+
+    async def record(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Index `entry` (which must carry a "key") and queue it for the file"""
+        index = await self._ensure_index()
+        entry = {"ts": time.time(), **entry}
+        self._add(index, entry)
+        self._pending.append(entry)
+        if len(self._pending) >= self.batch_size:
+            task = asyncio.create_task(self.flush())
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+        elif self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_later())
+        return entry
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    def _append(self, batch: List[Dict[str, Any]]):
+        data = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in batch)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+
+    async def flush(self):
+        """Write every queued entry; batches go out in the order they were recorded"""
+        async with self._write_lock:
+            batch, self._pending = self._pending, []
+            if not batch:
+                return
+            try:
+                await asyncio.to_thread(self._append, batch)
+                self.entries_written += len(batch)
+            except OSError:
+                logger.warning("Could not append %d ledger entries, keeping them queued", len(batch), exc_info=True)
+                self._pending[:0] = batch
+
+    async def cached(self, key: str, exclude: Iterable[str] = ()) -> List[Dict[str, Any]]:
+        """Provider generations for `key` with a stored image not in `exclude`, newest first"""
+        if not self.cache_enabled:
+            return []
+        index = await self._ensure_index()
+        entries = index.get(key)
+        if not entries:
+            return []
+        index.move_to_end(key)
+        excluded = set(exclude)
+        return [
+            entry for entry in reversed(entries)
+            if entry.get("source") == "provider" and entry.get("digest") and entry["digest"] not in excluded
+        ]
+
+    async def history(self, prompt: str, model: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Recent generations (provider and cache hits) for one request, oldest first"""
+        index = await self._ensure_index()
+        return list(index.get(generation_key(prompt, model, params), ()))
+
+    async def close(self):
+        """Stop the timed flush, wait for batch flushes in progress and write whatever is still queued"""
+        if self._flusher is not None and not self._flusher.done():
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+        await asyncio.gather(*self._flushes, return_exceptions=True)
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "keys": len(self._index) if self._index is not None else None,
+            "pending": len(self._pending),
+            "written": self.entries_written
+        }
+
+
+def create_generation_ledger() -> GenerationLedger:
+    """Build the ledger from GENERATION_LEDGER_* settings; IMAGE_CACHE=0 keeps recording but never serves from it"""
+    return GenerationLedger(
+        path=os.getenv("GENERATION_LEDGER_PATH", "data/generations.jsonl"),
+        batch_size=int(os.getenv("GENERATION_LEDGER_BATCH", "64")),
+        flush_interval=float(os.getenv("GENERATION_LEDGER_FLUSH_INTERVAL", "0.5")),
+        cache_enabled=os.getenv("IMAGE_CACHE", "1") != "0"
+    )
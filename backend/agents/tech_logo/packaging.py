@@ -0,0 +1,131 @@
+import io
+import os
+import re
+import json
+import asyncio
+import logging
+import zipfile
+from typing import Dict, Any, Iterator, Optional
+from llms.clients import provider_clients
+from agents.tech_logo.assets import AssetStore
+from agents.tech_logo.variants import export_pngs, export_favicon, trace_svg, brand_guidelines_pdf
+
+logger = logging.getLogger(__name__)
+
+PACKAGE_ID = re.compile(r"^logo_package_[0-9a-z_]+$")
+
+# Already-compressed formats are stored as-is instead of deflated again
+STORED_SUFFIXES = (".png", ".ico", ".pdf")
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only, non-seekable buffer drained after every chunk of the archive"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class PackageBuilder:
+    """Builds the final deliverables for a logo and streams them as a ZIP.
+
+    Rendering runs in the asset store's process pool, one job per
+    deliverable so they render in parallel. Files are written to
+    `root/<package_id>/` and zipped on the fly when downloaded.
+    """
+
+    def __init__(self, asset_store: AssetStore, root: str = "data/packages", url_prefix: str = "/packages"):
+        self.asset_store = asset_store
+        self.root = root
+        self.url_prefix = url_prefix
+        os.makedirs(root, exist_ok=True)
+
+    def directory_for(self, package_id: str) -> Optional[str]:
+        if not PACKAGE_ID.match(package_id):
+            return None
+        directory = os.path.join(self.root, package_id)
+        return directory if os.path.isdir(directory) else None
+
+    def download_url(self, package_id: str) -> str:
+        return f"{self.url_prefix}/{package_id}.zip"
+
+    async def _source(self, logo: Dict[str, Any], directory: str) -> str:
+        """Path of the logo original, fetched from the provider if it was never stored"""
+        if logo.get("asset_digest"):
+            path = self.asset_store.path_for(f"{logo['asset_digest']}.png")
+            if path:
+                return path
+        async with provider_clients.http_session().get(logo.get("source_url") or logo["image_url"]) as resp:
+            resp.raise_for_status()
+            data = await resp.read()
+        path = os.path.join(directory, "logo_original.png")
+        await asyncio.to_thread(_write_bytes, path, data)
+        return path
+
+    async def build(self, package_id: str, logo: Dict[str, Any], details: Dict[str, Any]) -> Dict[str, Any]:
+        """Render every deliverable for `logo` and write a manifest next to them"""
+        directory = os.path.join(self.root, package_id)
+        await asyncio.to_thread(os.makedirs, directory, exist_ok=True)
+        source = await self._source(logo, directory)
+
+        loop = asyncio.get_running_loop()
+        executor = self.asset_store.executor()
+        results = await asyncio.gather(
+            loop.run_in_executor(executor, export_pngs, source, directory),
+            loop.run_in_executor(executor, export_favicon, source, directory),
+            loop.run_in_executor(executor, trace_svg, source, directory),
+            loop.run_in_executor(executor, brand_guidelines_pdf, source, directory, details)
+        )
+        png_files, favicon, svg_files, pdf_files = results
+
+        manifest = {
+            **details,
+            "package_id": package_id,
+            "download_url": self.download_url(package_id),
+            "file_deliverables": {
+                "svg_files": svg_files,
+                "png_files": png_files,
+                "pdf_files": pdf_files,
+                "additional": favicon
+            }
+        }
+        await asyncio.to_thread(_write_bytes, os.path.join(directory, "manifest.json"), json.dumps(manifest, indent=2).encode())
+        return manifest
+
+    def iter_zip(self, package_id: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Yield a ZIP of the package piece by piece; at most one chunk is buffered"""
+        directory = os.path.join(self.root, package_id)
+        sink = _ZipSink()
+        with zipfile.ZipFile(sink, "w") as archive:
+            for name in sorted(os.listdir(directory)):
+                path = os.path.join(directory, name)
+                info = zipfile.ZipInfo.from_file(path, arcname=f"{package_id}/{name}")
+                info.compress_type = zipfile.ZIP_STORED if name.endswith(STORED_SUFFIXES) else zipfile.ZIP_DEFLATED
+                with open(path, "rb") as src, archive.open(info, "w") as dst:
+                    while chunk := src.read(chunk_size):
+                        dst.write(chunk)
+                        data = sink.drain()
+                        if data:
+                            yield data
+                yield sink.drain()
+        yield sink.drain()
+
+
+def _write_bytes(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def create_package_builder(asset_store: AssetStore) -> PackageBuilder:
+    return PackageBuilder(asset_store, root=os.getenv("PACKAGE_DIR", "data/packages"))
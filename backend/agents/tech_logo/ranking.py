@@ -0,0 +1,190 @@
+import io
+import json
+import base64
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from PIL import Image
+from langchain_core.messages import HumanMessage, SystemMessage
+from llms.clients import provider_clients
+
+logger = logging.getLogger(__name__)
+
+# Images are analysed (and sent to the vision model) at this size
+ANALYSIS_SIZE = 256
+
+# Stage-one rejection thresholds
+MIN_CONTRAST = 0.06
+MAX_EMPTY_RATIO = 0.985
+MAX_COLOR_COUNT = 48
+MIN_EDGE_DENSITY = 0.003
+MAX_EDGE_DENSITY = 0.30
+
+PASS_SCORE = 28
+
+
+def image_features(data: bytes) -> Tuple[Dict[str, float], bytes]:
+    """Cheap visual statistics for a logo, plus a downsized PNG for the vision call"""
+    image = Image.open(io.BytesIO(data))
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        canvas = Image.new("RGBA", image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(canvas, image)
+    image = image.convert("RGB")
+    image.thumbnail((ANALYSIS_SIZE, ANALYSIS_SIZE))
+
+    pixels = np.asarray(image, dtype=np.float32) / 255.0
+    luminance = pixels @ np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+
+    # Background = most common border colour; "empty" = share of pixels close to it
+    border = np.concatenate([pixels[0], pixels[-1], pixels[:, 0], pixels[:, -1]])
+    quantized_border = np.round(border * 15).astype(np.int32)
+    codes, counts = np.unique(quantized_border[:, 0] * 256 + quantized_border[:, 1] * 16 + quantized_border[:, 2], return_counts=True)
+    code = codes[np.argmax(counts)]
+    background = np.array([code // 256, (code // 16) % 16, code % 16], dtype=np.float32) / 15.0
+    empty_ratio = float(np.mean(np.max(np.abs(pixels - background), axis=2) < 0.08))
+
+    # Distinct colours covering at least 0.2% of the canvas, at 4 bits per channel
+    quantized = np.round(pixels * 15).astype(np.int32)
+    color_codes = quantized[..., 0] * 256 + quantized[..., 1] * 16 + quantized[..., 2]
+    histogram = np.bincount(color_codes.ravel(), minlength=4096)
+    color_count = int(np.sum(histogram >= 0.002 * color_codes.size))
+
+    gx = np.abs(np.diff(luminance, axis=1))
+    gy = np.abs(np.diff(luminance, axis=0))
+    edge_density = float((np.mean(gx > 0.1) + np.mean(gy > 0.1)) / 2)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+
+    features = {
+        "contrast": float(luminance.std()),
+        "empty_ratio": empty_ratio,
+        "color_count": color_count,
+        "edge_density": edge_density
+    }
+    return features, buffer.getvalue()
+
+
+def prefilter(features: Dict[str, float]) -> Tuple[bool, List[str], float]:
+    """Stage one: reject obvious failures and give a 0-10 technical score"""
+    issues = []
+    if features["empty_ratio"] > MAX_EMPTY_RATIO:
+        issues.append("Canvas is essentially empty")
+    if features["contrast"] < MIN_CONTRAST:
+        issues.append("Contrast too low to read")
+    if features["color_count"] > MAX_COLOR_COUNT:
+        issues.append("Too many colours for a logo (photographic or noisy output)")
+    if features["edge_density"] < MIN_EDGE_DENSITY:
+        issues.append("No discernible shapes")
+    elif features["edge_density"] > MAX_EDGE_DENSITY:
+        issues.append("Cluttered, noisy detail")
+
+    score = 10.0
+    score -= 4 * max(0.0, (MIN_CONTRAST * 3 - features["contrast"]) / (MIN_CONTRAST * 3))
+    score -= 3 * min(1.0, features["color_count"] / MAX_COLOR_COUNT) ** 2
+    score -= 3 * min(1.0, features["edge_density"] / MAX_EDGE_DENSITY) ** 2
+    return not issues, issues, round(max(0.0, score), 1)
+
+
+async def download_and_score(logo: Dict[str, Any], asset_store=None) -> Dict[str, Any]:
+    """Load one logo (from the asset store when it has been ingested) and score it locally"""
+    try:
+        if asset_store is not None and logo.get("asset_digest"):
+            data = await asyncio.to_thread(asset_store.read, logo["asset_digest"])
+        else:
+            async with provider_clients.http_session().get(logo.get("source_url") or logo["image_url"]) as resp:
+                resp.raise_for_status()
+                data = await resp.read()
+        features, thumbnail = await asyncio.to_thread(image_features, data)
+    except Exception as e:
+        logger.warning("Could not analyse logo %s: %s", logo.get("concept_id"), e)
+        return {"logo": logo, "passed": False, "issues": [f"Image could not be analysed: {e}"], "score": 0.0}
+
+    passed, issues, score = prefilter(features)
+    return {
+        "logo": logo,
+        "passed": passed,
+        "issues": issues,
+        "score": score,
+        "features": features,
+        "thumbnail": thumbnail
+    }
+
+
+async def pick_best(urls: List[str]) -> Tuple[str, bytes]:
+    """Download every output of one prediction and keep the one that scores best locally"""
+    async def load(url: str):
+        try:
+            async with provider_clients.http_session().get(url) as resp:
+                resp.raise_for_status()
+                data = await resp.read()
+            features, _ = await asyncio.to_thread(image_features, data)
+        except Exception as e:
+            logger.warning("Could not analyse candidate %s: %s", url, e)
+            return None
+        passed, _, score = prefilter(features)
+        return (passed, score), url, data
+
+    scored = [candidate for candidate in await asyncio.gather(*map(load, urls)) if candidate]
+    if not scored:
+        raise ValueError(f"None of the {len(urls)} candidate images could be analysed")
+    _, url, data = max(scored, key=lambda candidate: candidate[0])
+    return url, data
+
+
+def _parse_json(content: str) -> Optional[Dict[str, Any]]:
+    start, end = content.find("{"), content.rfind("}")
+    if start == -1 or end == -1:
+        return None
+    try:
+        return json.loads(content[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+
+
+async def vision_assessment(
+    vision_llm,
+    system_prompt: str,
+    client_requirements: Optional[Dict[str, Any]],
+    survivors: List[Dict[str, Any]]
+) -> Dict[int, Dict[str, Any]]:
+    """Stage two: score every surviving logo in one multi-image vision request"""
+    content: List[Dict[str, Any]] = [{
+        "type": "text",
+        "text": (
+            f"Client requirements:\n{json.dumps(client_requirements or {}, indent=2)}\n\n"
+            f"Evaluate the {len(survivors)} logos below. Each image is preceded by its concept_id. "
+            "Return only the JSON structure."
+        )
+    }]
+    for candidate in survivors:
+        encoded = base64.b64encode(candidate["thumbnail"]).decode("ascii")
+        content.append({"type": "text", "text": f"concept_id: {candidate['logo']['concept_id']}"})
+        content.append({
+            "type": "image_url",
+            "image_url": {"url": f"data:image/png;base64,{encoded}", "detail": "low"}
+        })
+
+    response = await vision_llm.ainvoke([SystemMessage(content=system_prompt), HumanMessage(content=content)])
+    parsed = _parse_json(response.content) or {}
+    assessments = {}
+    for assessment in parsed.get("assessments", []):
+        if not isinstance(assessment, dict):
+            continue
+        # Models often echo the id as a string ("2"); logos carry ints
+        try:
+            concept_id = int(assessment.get("concept_id"))
+        except (TypeError, ValueError):
+            logger.warning("Vision assessment with unusable concept_id %r", assessment.get("concept_id"))
+            continue
+        assessments[concept_id] = {**assessment, "concept_id": concept_id}
+
+    expected = {candidate["logo"]["concept_id"] for candidate in survivors}
+    if assessments.keys() != expected:
+        logger.warning(
+            "Vision assessments do not match the logos sent: missing %s, unexpected %s",
+            sorted(expected - assessments.keys()), sorted(assessments.keys() - expected)
+        )
+    return assessments
@@ -0,0 +1,246 @@
+import os
+import json
+import time
+import random
+import logging
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, NamedTuple
+from agents.tech_logo import events
+from observability.metrics import Histogram, registry, track_usage
+
+logger = logging.getLogger(__name__)
+
+model_route_decisions = registry.counter(
+    "model_route_decisions_total", "LLM calls per agent node by chosen model and routing reason", ["node", "model", "reason"]
+)
+model_route_seconds = registry.histogram(
+    "model_route_seconds", "LLM call latency per agent node by chosen model and routing reason", ["node", "model", "reason"]
+)
+llm_cost = registry.counter(
+    "llm_cost_usd_total", "Estimated LLM spend from token usage and list prices", ["node", "model"]
+)
+
+
+class Route(NamedTuple):
+    """Model for one agent node, the faster or cheaper fallback, and the node's p95 latency budget in seconds"""
+    model: str
+    fallback: Optional[str]
+    p95_budget: float
+
+
+class Decision(NamedTuple):
+    node: str
+    model: str
+    # primary, slo (primary p95 over budget), budget (session spend over budget) or probe
+    reason: str
+    p95: Optional[float]
+
+
+# Agent node -> route. "context" condenses old chat turns inside the chat node.
+DEFAULT_ROUTES = {
+    "chat": Route("gpt-4", "gpt-4o-mini", 4.0),
+    "context": Route("gpt-4", "gpt-4o-mini", 8.0),
+    "summary": Route("gpt-4", "gpt-4o-mini", 20.0),
+    "design": Route("gpt-4", "gpt-4o", 60.0),
+    "ranking": Route("gpt-4-vision-preview", "gpt-4o", 30.0),
+    "feedback": Route("gpt-4", "gpt-4o-mini", 20.0),
+}
+
+# USD per million (prompt, completion) tokens
+MODEL_PRICES = {
+    "gpt-4": (30.0, 60.0),
+    "gpt-4-turbo": (10.0, 30.0),
+    "gpt-4-vision-preview": (10.0, 30.0),
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+    "gpt-3.5-turbo": (0.5, 1.5),
+}
+
+# Decisions kept per session in state["routing_log"]
+ROUTING_LOG_SIZE = 50
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """List-price cost of a call in USD; 0 for models without a known price"""
+    prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1e6
+
+
+class LatencyWindow:
+    """Recent call latencies per (node, model), in two rotating windows.
+
+    Quantiles come from the current window once it has `min_samples`
+    calls, else from the previous one. Latency from an old incident ages
+    out after at most two windows.
+    """
+
+    def __init__(self, seconds: float = 300.0, min_samples: int = 20):
+        self.seconds = seconds
+        self.min_samples = min_samples
+        self.current = self._histogram()
+        self.previous = self._histogram()
+        self.started = time.monotonic()
+
+    @staticmethod
+    def _histogram() -> Histogram:
+        # Not registered: /metrics already exposes model_route_seconds
+        return Histogram("model_route_window_seconds", "", ["node", "model"])
+
+    def _rotate(self):
+        now = time.monotonic()
+        if now - self.started < self.seconds:
+            return
+        # After a whole window without calls, the current one is too old to keep as well
+        self.previous = self.current if now - self.started < 2 * self.seconds else self._histogram()
+        self.current = self._histogram()
+        self.started = now
+
+    def observe(self, seconds: float, node: str, model: str):
+        self._rotate()
+        self.current.observe(seconds, node=node, model=model)
+
+    def quantile(self, q: float, node: str, model: str) -> Optional[float]:
+        self._rotate()
+        for histogram in (self.current, self.previous):
+            if histogram.count(node=node, model=model) >= self.min_samples:
+                return histogram.quantile(q, node=node, model=model)
+        return None
+
+
+class ModelRouter:
+    """Picks the model for each agent node's LLM calls and records what it picked.
+
+    A node uses its primary model unless:
+    - its session has spent more than the token or cost budget ("budget"), or
+    - the primary's recent p95 is over the node's latency budget ("slo").
+    In both cases it uses the node's fallback model. While the SLO fallback
+    is active, `probe_rate` of the calls still go to the primary ("probe"),
+    so the router notices when the primary recovers.
+
+    Each call's latency, tokens and estimated cost go to the metrics, and
+    the session's totals go to state["llm_usage"]. The decision itself is
+    appended to state["routing_log"].
+    """
+
+    def __init__(
+        self,
+        routes: Optional[Dict[str, Route]] = None,
+        enabled: bool = True,
+        percentile: float = 0.95,
+        window: Optional[LatencyWindow] = None,
+        probe_rate: float = 0.05,
+        session_token_budget: int = 0,
+        session_cost_budget: float = 0.0
+    ):
+        self.routes = routes or dict(DEFAULT_ROUTES)
+        self.enabled = enabled
+        self.percentile = percentile
+        self.window = window or LatencyWindow()
+        self.probe_rate = probe_rate
+        # 0 means no budget
+        self.session_token_budget = session_token_budget
+        self.session_cost_budget = session_cost_budget
+
+    def over_budget(self, state: Optional[Dict[str, Any]]) -> bool:
+        usage = (state or {}).get("llm_usage") or {}
+        if self.session_token_budget and usage.get("tokens", 0) >= self.session_token_budget:
+            return True
+        return bool(self.session_cost_budget and usage.get("cost_usd", 0.0) >= self.session_cost_budget)
+
+    def choose(self, node: str, state: Optional[Dict[str, Any]] = None) -> Decision:
+        route = self.routes[node]
+        if not self.enabled or not route.fallback or route.fallback == route.model:
+            return Decision(node, route.model, "primary", None)
+        p95 = self.window.quantile(self.percentile, node, route.model)
+        if self.over_budget(state):
+            return Decision(node, route.fallback, "budget", p95)
+        if p95 is not None and p95 > route.p95_budget:
+            if random.random() < self.probe_rate:
+                return Decision(node, route.model, "probe", p95)
+            return Decision(node, route.fallback, "slo", p95)
+        return Decision(node, route.model, "primary", p95)
+
+    @contextmanager
+    def call(self, node: str, state: Optional[Dict[str, Any]] = None):
+        """Choose a model for `node` and yield the decision; the LLM calls made inside are timed and costed.
+
+        Failed calls are not recorded: the latency budget covers calls that
+        produced an answer. Answers replayed from the response cache are
+        recorded but kept out of the SLO window.
+        """
+        decision = self.choose(node, state)
+        started = time.perf_counter()
+        with track_usage() as usage:
+            yield decision
+        cached = usage["calls"] > 0 and usage["cached"] == usage["calls"]
+        self.record(decision, time.perf_counter() - started, usage["prompt"], usage["completion"], state, cached)
+
+    def record(
+        self,
+        decision: Decision,
+        seconds: float,
+        prompt_tokens: int,
+        completion_tokens: int,
+        state: Optional[Dict[str, Any]] = None,
+        cached: bool = False
+    ):
+        node, model, reason = decision.node, decision.model, decision.reason
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        if not cached:
+            self.window.observe(seconds, node, model)
+        model_route_decisions.inc(node=node, model=model, reason=reason)
+        model_route_seconds.observe(seconds, node=node, model=model, reason=reason)
+        if cost:
+            llm_cost.inc(cost, node=node, model=model)
+        if reason != "primary":
+            logger.info(
+                "Routed %s to %s (%s, primary p95 %s) in %.2fs",
+                node, model, reason, f"{decision.p95:.2f}s" if decision.p95 is not None else "n/a", seconds
+            )
+        events.emit("route", node=node, model=model, reason=reason, duration_ms=round(seconds * 1000, 1))
+
+        if state is None:
+            return
+        usage = state.get("llm_usage") or {"tokens": 0, "cost_usd": 0.0}
+        state["llm_usage"] = {
+            "tokens": usage["tokens"] + prompt_tokens + completion_tokens,
+            "cost_usd": round(usage["cost_usd"] + cost, 6)
+        }
+        log = state.get("routing_log") or []
+        log.append({
+            "node": node,
+            "model": model,
+            "reason": reason,
+            "seconds": round(seconds, 3),
+            "tokens": prompt_tokens + completion_tokens
+        })
+        state["routing_log"] = log[-ROUTING_LOG_SIZE:]
+
+
+def load_routes(overrides: Optional[str]) -> Dict[str, Route]:
+    """DEFAULT_ROUTES with MODEL_ROUTES applied.
+
+    MODEL_ROUTES is JSON such as {"chat": {"model": "gpt-4o", "p95_budget": 3}}.
+    Fields that are left out keep their defaults.
+    """
+    routes = dict(DEFAULT_ROUTES)
+    for node, fields in json.loads(overrides or "{}").items():
+        base = routes.get(node, Route("gpt-4", None, float("inf")))
+        routes[node] = base._replace(**{k: v for k, v in fields.items() if k in Route._fields})
+    return routes
+
+
+def create_model_router() -> ModelRouter:
+    """Routing table and budgets from the environment; MODEL_ROUTING=0 pins every node to its primary model"""
+    return ModelRouter(
+        routes=load_routes(os.getenv("MODEL_ROUTES")),
+        enabled=os.getenv("MODEL_ROUTING", "1") != "0",
+        percentile=float(os.getenv("MODEL_SLO_PERCENTILE", "0.95")),
+        window=LatencyWindow(
+            seconds=float(os.getenv("MODEL_SLO_WINDOW_SECONDS", "300")),
+            min_samples=int(os.getenv("MODEL_SLO_MIN_SAMPLES", "20"))
+        ),
+        probe_rate=float(os.getenv("MODEL_SLO_PROBE_RATE", "0.05")),
+        session_token_budget=int(os.getenv("SESSION_TOKEN_BUDGET", "0")),
+        session_cost_budget=float(os.getenv("SESSION_COST_BUDGET", "0"))
+    )
@@ -0,0 +1,73 @@
+"""Typed state-change events for event-sourced sessions.
+
+Three event types cover every change an agent makes to LogoDesignState:
+
+  {"type": "set", "fields": {...}}                top-level fields replaced
+  {"type": "append", "field": f, "items": [...]}  a list grew at the end
+  {"type": "remove", "fields": [...]}             top-level fields dropped
+
+`diff()` compares a state against the shadow of the last persisted
+version, so only what changed is encoded and written. `apply()` replays
+events onto a snapshot to rebuild the materialized view.
+"""
+import copy
+from typing import Dict, Any, List, Iterable
+
+SET = "set"
+APPEND = "append"
+REMOVE = "remove"
+
+
+def shadow(state: Dict[str, Any]) -> Dict[str, Any]:
+    """What `diff` compares against: a deep copy, so in-place edits at any depth still show up"""
+    return copy.deepcopy(state)
+
+
+def advance(previous: Dict[str, Any], events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Move a shadow past `events` in place; only the changed values are copied, not the whole state"""
+    return apply(previous, copy.deepcopy(events))
+
+
+def _appended(old: list, new: list) -> bool:
+    if len(new) <= len(old):
+        return False
+    return new[:len(old)] == old
+
+
+def diff(previous: Dict[str, Any], state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Events that turn `previous` (a shadow) into `state`"""
+    events = []
+    changed = {}
+    for field, value in state.items():
+        if field not in previous:
+            changed[field] = value
+            continue
+        old = previous[field]
+        if old is value:
+            continue
+        if isinstance(old, list) and isinstance(value, list) and _appended(old, value):
+            events.append({"type": APPEND, "field": field, "items": value[len(old):]})
+        elif old != value:
+            changed[field] = value
+    if changed:
+        events.insert(0, {"type": SET, "fields": changed})
+    removed = [field for field in previous if field not in state]
+    if removed:
+        events.append({"type": REMOVE, "fields": removed})
+    return events
+
+
+def apply(state: Dict[str, Any], events: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Replay `events` onto `state` in place and return it"""
+    for event in events:
+        kind = event["type"]
+        if kind == SET:
+            state.update(event["fields"])
+        elif kind == APPEND:
+            state.setdefault(event["field"], []).extend(event["items"])
+        elif kind == REMOVE:
+            for field in event["fields"]:
+                state.pop(field, None)
+        else:
+            raise ValueError(f"Unknown session event type: {kind}")
+    return state
@@ -0,0 +1,376 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from agents.tech_logo import session_log
+from agents.tech_logo.state import LogoDesignState
+from observability.metrics import registry
+
+session_write_bytes = registry.counter(
+    "session_store_write_bytes_total", "Bytes of session state written to storage", ["backend", "kind"]
+)
+
+
+class SessionStore(ABC):
+    """Storage backend for per-session LogoDesignState"""
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[LogoDesignState]:
+        """Return the session state, or None if unknown or expired"""
+
+    @abstractmethod
+    async def set(self, session_id: str, state: LogoDesignState) -> None:
+        """Create or replace the session state"""
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> None:
+        """Drop a session"""
+
+    async def close(self) -> None:
+        """Release any resources held by the backend"""
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store with a size cap, LRU eviction and idle TTL"""
+
+    def __init__(self, max_sessions: int = 10_000, ttl_seconds: Optional[float] = 3600):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        # session_id -> (state, last_access); ordered least to most recently used
+        self._sessions: "OrderedDict[str, Tuple[LogoDesignState, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _evict_expired(self, now: float):
+        # LRU order is also idle-time order, so expired entries sit at the front
+        if self.ttl_seconds is None:
+            return
+        while self._sessions:
+            session_id, (_, last_access) = next(iter(self._sessions.items()))
+            if now - last_access < self.ttl_seconds:
+                break
+            del self._sessions[session_id]
+
+    async def get(self, session_id: str) -> Optional[LogoDesignState]:
+        now = time.monotonic()
+        self._evict_expired(now)
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        self._sessions[session_id] = (entry[0], now)
+        self._sessions.move_to_end(session_id)
+        return entry[0]
+
+    async def set(self, session_id: str, state: LogoDesignState) -> None:
+        now = time.monotonic()
+        self._evict_expired(now)
+        self._sessions[session_id] = (state, now)
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    async def delete(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Disk-backed store that several uvicorn workers can share through one SQLite file"""
+
+    def __init__(self, path: str = "sessions.db", ttl_seconds: Optional[float] = 24 * 3600):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL lets readers in other workers proceed while one worker writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions(updated_at)")
+
+    def _get(self, session_id: str) -> Optional[LogoDesignState]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, updated_at FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        if self.ttl_seconds is not None and time.time() - row[1] >= self.ttl_seconds:
+            self._delete(session_id)
+            return None
+        return json.loads(row[0])
+
+    def _set(self, session_id: str, state: LogoDesignState):
+        payload = json.dumps(state, separators=(",", ":"))
+        session_write_bytes.inc(len(payload), backend="sqlite", kind="state")
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (session_id, state, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+                (session_id, payload, time.time())
+            )
+
+    def _delete(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def purge_expired(self) -> int:
+        """Delete every expired session; returns the number removed"""
+        if self.ttl_seconds is None:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl_seconds,)
+            )
+        return cursor.rowcount
+
+    async def get(self, session_id: str) -> Optional[LogoDesignState]:
+        return await asyncio.to_thread(self._get, session_id)
+
+    async def set(self, session_id: str, state: LogoDesignState) -> None:
+        await asyncio.to_thread(self._set, session_id, state)
+
+    async def delete(self, session_id: str) -> None:
+        await asyncio.to_thread(self._delete, session_id)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class EventSourcedSessionStore(SessionStore):
+    """SQLite store that persists each change as typed events instead of the whole state.
+
+    `set()` diffs the state against the last persisted version and appends
+    only the delta to the session's event log, so a turn costs O(change),
+    not O(session). The full state is snapshotted once at least
+    `snapshot_every` events, and at least as many bytes as the previous
+    snapshot, have been logged since it. That keeps snapshot writes to a
+    constant share of the log and replay to about one snapshot's worth.
+
+    A view is rebuilt from the latest snapshot plus the events after it.
+    Up to `cache_size` materialized views stay in memory. Other sessions
+    are rebuilt from disk on demand, so memory no longer grows with the
+    number of idle sessions.
+
+    The last persisted version is kept as a deep copy, so edits made in
+    place at any depth are seen. A list that only grew at the end is
+    logged as its new items; any other changed field is logged whole.
+    """
+
+    def __init__(
+        self,
+        path: str = "sessions.db",
+        ttl_seconds: Optional[float] = 24 * 3600,
+        snapshot_every: int = 50,
+        cache_size: int = 1000
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.snapshot_every = snapshot_every
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        # session_id -> (view, shadow of what was persisted, last event seq); least recently used first
+        self._views: "OrderedDict[str, Tuple[LogoDesignState, Dict[str, Any], int]]" = OrderedDict()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS session_events ("
+            "session_id TEXT NOT NULL, seq INTEGER NOT NULL, event TEXT NOT NULL, "
+            "PRIMARY KEY (session_id, seq)) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS session_snapshots ("
+            "session_id TEXT PRIMARY KEY, seq INTEGER NOT NULL, state TEXT NOT NULL)"
+        )
+        # Latest seq per session: lets a worker tell whether its cached view is current
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS session_heads ("
+            "session_id TEXT PRIMARY KEY, seq INTEGER NOT NULL, snapshot_seq INTEGER NOT NULL, "
+            "log_bytes INTEGER NOT NULL, snapshot_bytes INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS session_heads_updated_at ON session_heads(updated_at)")
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def _head(self, session_id: str) -> Optional[Tuple[int, int, int, int, float]]:
+        return self._conn.execute(
+            "SELECT seq, snapshot_seq, log_bytes, snapshot_bytes, updated_at FROM session_heads WHERE session_id = ?",
+            (session_id,)
+        ).fetchone()
+
+    def _events_after(self, session_id: str, seq: int) -> List[Dict[str, Any]]:
+        rows = self._conn.execute(
+            "SELECT event FROM session_events WHERE session_id = ? AND seq > ? ORDER BY seq", (session_id, seq)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def _cache(
+        self, session_id: str, view: LogoDesignState, seq: int, persisted: Optional[Dict[str, Any]] = None
+    ) -> Tuple[LogoDesignState, Dict[str, Any], int]:
+        if persisted is None:
+            persisted = session_log.shadow(view)
+        entry = self._views[session_id] = (view, persisted, seq)
+        self._views.move_to_end(session_id)
+        while len(self._views) > self.cache_size:
+            self._views.popitem(last=False)
+        return entry
+
+    def _materialize(self, session_id: str, head_seq: int) -> Tuple[LogoDesignState, Dict[str, Any], int]:
+        """The current view: the cached one caught up with newer events, or snapshot plus replay"""
+        cached = self._views.get(session_id)
+        if cached is not None and cached[2] == head_seq:
+            self._views.move_to_end(session_id)
+            return cached
+        if cached is not None and cached[2] < head_seq:
+            # Another worker wrote since; replay just its events onto a clean copy of our persisted state
+            view = session_log.apply(session_log.shadow(cached[1]), self._events_after(session_id, cached[2]))
+        else:
+            row = self._conn.execute(
+                "SELECT seq, state FROM session_snapshots WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            base_seq, view = (row[0], json.loads(row[1])) if row else (0, {})
+            view = session_log.apply(view, self._events_after(session_id, base_seq))
+        return self._cache(session_id, view, head_seq)
+
+    def _get(self, session_id: str) -> Optional[LogoDesignState]:
+        with self._lock:
+            head = self._head(session_id)
+            if head is None:
+                self._views.pop(session_id, None)
+                return None
+            if self.ttl_seconds is not None and time.time() - head[4] >= self.ttl_seconds:
+                self._delete_locked(session_id)
+                return None
+            return self._materialize(session_id, head[0])[0]
+
+    def _set(self, session_id: str, state: LogoDesignState):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                head = self._head(session_id)
+                seq, snapshot_seq, log_bytes, snapshot_bytes = head[:4] if head else (0, 0, 0, 0)
+                _, persisted, _ = self._materialize(session_id, seq)
+                events = session_log.diff(persisted, state)
+                rows = []
+                for event in events:
+                    seq += 1
+                    payload = json.dumps(event, separators=(",", ":"))
+                    rows.append((session_id, seq, payload))
+                    log_bytes += len(payload)
+                    session_write_bytes.inc(len(payload), backend="events", kind="event")
+                if rows:
+                    self._conn.executemany("INSERT INTO session_events (session_id, seq, event) VALUES (?, ?, ?)", rows)
+
+                if seq - snapshot_seq >= self.snapshot_every and log_bytes >= snapshot_bytes:
+                    payload = json.dumps(state, separators=(",", ":"))
+                    self._conn.execute(
+                        "INSERT INTO session_snapshots (session_id, seq, state) VALUES (?, ?, ?) "
+                        "ON CONFLICT(session_id) DO UPDATE SET seq = excluded.seq, state = excluded.state",
+                        (session_id, seq, payload)
+                    )
+                    session_write_bytes.inc(len(payload), backend="events", kind="snapshot")
+                    snapshot_seq, log_bytes, snapshot_bytes = seq, 0, len(payload)
+
+                self._conn.execute(
+                    "INSERT INTO session_heads (session_id, seq, snapshot_seq, log_bytes, snapshot_bytes, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(session_id) DO UPDATE SET seq = excluded.seq, "
+                    "snapshot_seq = excluded.snapshot_seq, log_bytes = excluded.log_bytes, "
+                    "snapshot_bytes = excluded.snapshot_bytes, updated_at = excluded.updated_at",
+                    (session_id, seq, snapshot_seq, log_bytes, snapshot_bytes, time.time())
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                self._views.pop(session_id, None)
+                raise
+            self._cache(session_id, state, seq, session_log.advance(persisted, events))
+
+    def _delete_locked(self, session_id: str):
+        self._views.pop(session_id, None)
+        for table in ("session_events", "session_snapshots", "session_heads"):
+            self._conn.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
+
+    def _delete(self, session_id: str):
+        with self._lock:
+            self._delete_locked(session_id)
+
+    def purge_expired(self) -> int:
+        """Delete every expired session with its events and snapshot; returns the number removed"""
+        if self.ttl_seconds is None:
+            return 0
+        with self._lock:
+            expired = [
+                row[0] for row in self._conn.execute(
+                    "SELECT session_id FROM session_heads WHERE updated_at < ?", (time.time() - self.ttl_seconds,)
+                )
+            ]
+            for session_id in expired:
+                self._delete_locked(session_id)
+        return len(expired)
+
+    def events(self, session_id: str) -> List[Dict[str, Any]]:
+        """The session's event log since its latest snapshot, oldest first"""
+        with self._lock:
+            head = self._head(session_id)
+            return self._events_after(session_id, head[1]) if head else []
+
+    async def get(self, session_id: str) -> Optional[LogoDesignState]:
+        return await asyncio.to_thread(self._get, session_id)
+
+    async def set(self, session_id: str, state: LogoDesignState) -> None:
+        await asyncio.to_thread(self._set, session_id, state)
+
+    async def delete(self, session_id: str) -> None:
+        await asyncio.to_thread(self._delete, session_id)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_session_store() -> SessionStore:
+    """Build the store selected by SESSION_STORE (memory | sqlite | events)"""
+    backend = os.getenv("SESSION_STORE", "memory").lower()
+    ttl = float(os.getenv("SESSION_TTL_SECONDS", "3600"))
+
+    if backend == "sqlite":
+        return SQLiteSessionStore(
+            path=os.getenv("SESSION_DB_PATH", "data/sessions.db"),
+            ttl_seconds=ttl
+        )
+    if backend == "events":
+        return EventSourcedSessionStore(
+            path=os.getenv("SESSION_DB_PATH", "data/sessions.db"),
+            ttl_seconds=ttl,
+            snapshot_every=int(os.getenv("SESSION_SNAPSHOT_EVERY", "50")),
+            cache_size=int(os.getenv("SESSION_VIEW_CACHE", "1000"))
+        )
+    if backend == "memory":
+        return InMemorySessionStore(
+            max_sessions=int(os.getenv("SESSION_MAX_SESSIONS", "10000")),
+            ttl_seconds=ttl
+        )
+    raise ValueError(f"Unknown SESSION_STORE backend: {backend}")
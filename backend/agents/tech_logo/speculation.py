@@ -0,0 +1,85 @@
+import os
+import asyncio
+import logging
+import contextvars
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Awaitable, Optional
+from agents.tech_logo.intent import CONFIRM, detect_intent
+from observability.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Fields produced by summary_agent and designer_agent that a confirmed speculation supplies
+SPECULATED_FIELDS = ("client_requirements", "chat_summary", "design_concepts")
+
+speculations = registry.counter(
+    "speculative_brief_total", "Background summary+design runs by outcome", ["outcome"]
+)
+
+
+def is_bare_confirmation(message: str) -> bool:
+    """True if the message agrees with the recap and adds no new requirements"""
+    return detect_intent(message) == (CONFIRM, 1.0)
+
+
+class SpeculationManager:
+    """Runs summary and design in the background while the user reads the recap.
+
+    One task per session. A new chat turn replaces or cancels it. A bare
+    confirmation keeps it for the pipeline to take. Tasks run in an empty
+    context so they never write to the chat turn's event stream.
+    """
+
+    def __init__(self, max_sessions: int = 1000):
+        self.max_sessions = max_sessions
+        self._tasks: "OrderedDict[str, asyncio.Task]" = OrderedDict()
+
+    def start(self, session_id: str, run: Callable[[], Awaitable[Dict[str, Any]]]):
+        self.cancel(session_id)
+        self._tasks[session_id] = asyncio.create_task(run(), context=contextvars.Context())
+        speculations.inc(outcome="started")
+        while len(self._tasks) > self.max_sessions:
+            oldest = next(iter(self._tasks))
+            self.cancel(oldest)
+
+    def cancel(self, session_id: str):
+        task = self._tasks.pop(session_id, None)
+        if task is not None:
+            task.cancel()
+            speculations.inc(outcome="discarded")
+
+    async def take(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Wait for the session's speculation and return its state, or None if there is no usable result"""
+        task = self._tasks.pop(session_id, None)
+        if task is None:
+            return None
+        try:
+            state = await task
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                # The caller itself is being cancelled
+                raise
+            return None
+        except Exception:
+            logger.warning("Speculative brief for %s failed", session_id, exc_info=True)
+            speculations.inc(outcome="failed")
+            return None
+        if state.get("current_step") != "generate":
+            speculations.inc(outcome="failed")
+            return None
+        speculations.inc(outcome="committed")
+        return state
+
+    async def shutdown(self):
+        """Cancel every speculation and wait until they have stopped"""
+        tasks = list(self._tasks.values())
+        for session_id in list(self._tasks):
+            self.cancel(session_id)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def create_speculation_manager() -> Optional[SpeculationManager]:
+    """SPECULATIVE_BRIEF=0 turns speculation off"""
+    if os.getenv("SPECULATIVE_BRIEF", "1") == "0":
+        return None
+    return SpeculationManager(max_sessions=int(os.getenv("SPECULATIVE_BRIEF_MAX_SESSIONS", "1000")))
@@ -7,6 +7,9 @@ class LogoDesignState(TypedDict):
     # User interaction
     user_input: str
     conversation_history: List[Dict[str, str]]
+    context_summary: Optional[str]
+    summarized_upto: int
+    history_token_counts: List[int]
     user_feedback: Optional[str]
     iteration_count: int
     
@@ -17,12 +20,23 @@ class LogoDesignState(TypedDict):
     ranking_results: Optional[Dict[str, Any]]
     final_package: Optional[str]
     generation_attempts: Optional[int]
+    # Asset digests already shown in this session; a cached image is never served twice
+    seen_digests: Optional[List[str]]
+    # Generations per concept (keyed by str(concept_id)), each capped at max_attempts
+    concept_attempts: Optional[Dict[str, int]]
+    # Concept ids the next generator round redoes; None regenerates every concept
+    pending_concepts: Optional[List[int]]
+    # LLM tokens and estimated USD spent by this session, checked against the routing budgets
+    llm_usage: Optional[Dict[str, Any]]
+    # Recent model routing decisions: node, model, reason, seconds, tokens
+    routing_log: Optional[List[Dict[str, Any]]]
     
     # Control flow
     current_step: str
     needs_regeneration: bool
     user_approved: bool
     error_message: Optional[str]
+    pipeline_job: Optional[Dict[str, Any]]
     
     # Technical data
     client_requirements: Optional[Dict[str, Any]]
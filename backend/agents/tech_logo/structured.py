@@ -0,0 +1,213 @@
+import os
+import re
+import json
+import logging
+from typing import Dict, Any, List, Optional, Callable
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+CONCEPT_FIELDS = (
+    "concept_id", "name", "description", "style", "color_palette", "typography",
+    "symbol_concept", "rationale", "midjourney_prompt"
+)
+
+DESIGN_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "concepts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "concept_id": {"type": "integer"},
+                    "name": {"type": "string"},
+                    "description": {"type": "string"},
+                    "style": {"type": "string"},
+                    "color_palette": {
+                        "type": "object",
+                        "properties": {
+                            "primary": {"type": "string"},
+                            "secondary": {"type": "string"},
+                            "accent": {"type": "string"}
+                        },
+                        "required": ["primary", "secondary", "accent"],
+                        "additionalProperties": False
+                    },
+                    "typography": {"type": "string"},
+                    "symbol_concept": {"type": "string"},
+                    "rationale": {"type": "string"},
+                    "midjourney_prompt": {"type": "string"}
+                },
+                "required": list(CONCEPT_FIELDS),
+                "additionalProperties": False
+            }
+        },
+        "design_rationale": {"type": "string"},
+        "technical_notes": {"type": "string"}
+    },
+    # concepts first, so each one can be acted on before the closing notes arrive
+    "required": ["concepts", "design_rationale", "technical_notes"],
+    "additionalProperties": False
+}
+
+# Model families that accept json_schema (structured outputs) or json_object (JSON mode)
+JSON_SCHEMA_MODELS = ("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")
+JSON_OBJECT_MODELS = ("gpt-4-turbo", "gpt-4-1106", "gpt-4-0125", "gpt-3.5-turbo")
+
+
+def design_response_format(model: str) -> Optional[Dict[str, Any]]:
+    """response_format for the designer call; DESIGNER_RESPONSE_FORMAT (auto | json_schema | json_object | text) overrides"""
+    mode = os.getenv("DESIGNER_RESPONSE_FORMAT", "auto").lower()
+    if mode == "auto":
+        if model.startswith(JSON_SCHEMA_MODELS):
+            mode = "json_schema"
+        elif model.startswith(JSON_OBJECT_MODELS):
+            mode = "json_object"
+        else:
+            mode = "text"
+
+    if mode == "json_schema":
+        return {"type": "json_schema", "json_schema": {"name": "logo_concepts", "strict": True, "schema": DESIGN_SCHEMA}}
+    if mode == "json_object":
+        return {"type": "json_object"}
+    return None
+
+
+def repair_json(text: str) -> Optional[Any]:
+    """Best-effort parse of truncated or slightly malformed model JSON"""
+    text = re.sub(r"^\s*```(?:json)?|```\s*$", "", text.strip())
+    start = min((i for i in (text.find("{"), text.find("[")) if i != -1), default=-1)
+    if start == -1:
+        return None
+    text = text[start:]
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    # Drop anything after the outermost structure closes, then close whatever is still open
+    out = []
+    stack = []
+    in_string = escape = False
+    for char in text:
+        out.append(char)
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                break
+
+    repaired = "".join(out)
+    if in_string:
+        repaired += '"'
+    # A dangling key or trailing separator cannot be completed; cut back to the last full value
+    repaired = re.sub(r'(,\s*"[^"]*"\s*:?\s*|,\s*|:\s*)$', "", repaired)
+    repaired += "".join(reversed(stack))
+    repaired = re.sub(r",\s*([}\]])", r"\1", repaired)
+    try:
+        return json.loads(repaired)
+    except json.JSONDecodeError:
+        return None
+
+
+class ConceptStreamParser:
+    """Incremental scanner over streamed designer output.
+
+    Calls `on_concept(concept)` as soon as each object in the top-level
+    "concepts" array closes, without waiting for the rest of the document.
+    """
+
+    def __init__(self, on_concept: Callable[[Dict[str, Any]], None]):
+        self.on_concept = on_concept
+        self.concepts: List[Dict[str, Any]] = []
+        self.text = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string = None
+        self._root_key = None
+        self._in_concepts = False
+        self._object_start = None
+
+    def feed(self, chunk: str):
+        self.text += chunk
+        text = self.text
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start:i]
+                continue
+            if not self._stack and char != "{":
+                # Prose or a code fence before the document starts
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i + 1
+            elif char == ":" and len(self._stack) == 1:
+                self._root_key = self._last_string
+            elif char == "[":
+                if self._stack == ["{"] and self._root_key == "concepts":
+                    self._in_concepts = True
+                self._stack.append("[")
+            elif char == "{":
+                if self._in_concepts and len(self._stack) == 2:
+                    self._object_start = i
+                self._stack.append("{")
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if char == "}" and self._in_concepts and len(self._stack) == 2 and self._object_start is not None:
+                    self._emit(text[self._object_start:i + 1])
+                    self._object_start = None
+                elif char == "]" and self._in_concepts and len(self._stack) == 1:
+                    self._in_concepts = False
+        self._pos = len(text)
+
+    def finish(self, content: str):
+        """Feed whatever of the final content was not streamed (all of it on a cache hit)"""
+        if content.startswith(self.text):
+            self.feed(content[len(self.text):])
+
+    def _emit(self, raw: str):
+        concept = repair_json(raw)
+        if not isinstance(concept, dict):
+            logger.warning("Skipping unparseable streamed concept: %.200s", raw)
+            return
+        self.concepts.append(concept)
+        self.on_concept(concept)
+
+
+class TokenCallback(BaseCallbackHandler):
+    """Forwards each streamed token to `on_token`"""
+
+    # Run on the event loop thread so on_token may schedule tasks
+    run_inline = True
+
+    def __init__(self, on_token: Callable[[str], None]):
+        self.on_token = on_token
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        if token:
+            self.on_token(token)
@@ -0,0 +1,71 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Tuple, Callable, Awaitable
+from agents.tech_logo import events
+from observability.metrics import registry
+
+session_turns = registry.counter(
+    "session_turns_total", "Chat turns by outcome (run, or coalesced into an identical turn in flight)", ["outcome"]
+)
+
+
+def _message_key(message: str) -> str:
+    return " ".join(message.split()).casefold()
+
+
+class SessionTurns:
+    """Serializes work per session and coalesces duplicate in-flight messages.
+
+    Turns for one session run one at a time in arrival order, while
+    different sessions run in parallel. A message identical to one that
+    is still queued or running for the same session (a double-clicked
+    send, a client retry) does not run again; it gets the same result.
+    A streaming caller that joins such a turn also gets its events from
+    then on, including those of the pipeline job it starts.
+    """
+
+    def __init__(self):
+        # session_id -> [lock, holders and waiters]; dropped once nobody uses it
+        self._locks: Dict[str, List[Any]] = {}
+        self._inflight: Dict[Tuple[str, str], Tuple[asyncio.Task, events.Fanout]] = {}
+
+    @asynccontextmanager
+    async def lock(self, session_id: str):
+        entry = self._locks.get(session_id)
+        if entry is None:
+            entry = self._locks[session_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[session_id]
+
+    async def run(self, session_id: str, message: str, turn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `turn` under the session lock, or join the identical turn already in flight"""
+        key = (session_id, _message_key(message))
+        entry = self._inflight.get(key)
+        if entry is None:
+            fanout = events.Fanout()
+
+            async def locked():
+                # The turn and any job it starts emit to every stream that joins it
+                events.listen(fanout)
+                async with self.lock(session_id):
+                    return await turn()
+
+            # A task, so the turn still completes if the caller disconnects halfway
+            task = asyncio.create_task(locked())
+            entry = self._inflight[key] = (task, fanout)
+            task.add_done_callback(lambda done: self._inflight.pop(key, None) if self._inflight.get(key) is entry else None)
+            session_turns.inc(outcome="run")
+        else:
+            session_turns.inc(outcome="coalesced")
+        task, fanout = entry
+        fanout.add(events.listener())
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {"sessions_busy": len(self._locks), "turns_in_flight": len(self._inflight)}
@@ -0,0 +1,197 @@
+"""Pillow rendering for logo variants and package deliverables.
+
+Kept free of app imports: process-pool workers are spawned and import only this module.
+"""
+import os
+import textwrap
+from typing import Dict, Any, List, Tuple
+import numpy as np
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+
+# (file name, width in pixels, dots per inch)
+PNG_EXPORTS = (
+    ("logo_web.png", 512, 72),
+    ("logo_retina.png", 1024, 144),
+    ("logo_150dpi.png", 600, 150),
+    ("logo_300dpi.png", 1200, 300)
+)
+FAVICON_SIZES = ((16, 16), (32, 32), (48, 48), (64, 64))
+
+
+def ready() -> int:
+    """No-op job that makes a pool worker start and import this module"""
+    return os.getpid()
+
+
+def _trim(image: Image.Image, threshold: int = 12) -> Image.Image:
+    """Crop to the mark by dropping margins that match the corner colour"""
+    background = Image.new("RGB", image.size, image.getpixel((0, 0)))
+    diff = ImageChops.difference(image, background).convert("L").point(lambda v: 255 if v > threshold else 0)
+    box = diff.getbbox()
+    return image.crop(box) if box else image
+
+
+def _place(mark: Image.Image, size: Tuple[int, int], fill: Tuple[int, int, int], padding: float) -> Image.Image:
+    """Centre `mark` on a canvas of `size`, scaled to fit inside the padding"""
+    canvas = Image.new("RGB", size, fill)
+    inner = (max(1, int(size[0] * (1 - 2 * padding))), max(1, int(size[1] * (1 - 2 * padding))))
+    mark = mark.copy()
+    mark.thumbnail(inner, Image.LANCZOS)
+    canvas.paste(mark, ((size[0] - mark.width) // 2, (size[1] - mark.height) // 2))
+    return canvas
+
+
+def render_variants(source_path: str, directory: str, digest: str) -> Dict[str, str]:
+    """Derive horizontal, icon and favicon files from a stored original (runs in the process pool)"""
+    with Image.open(source_path) as source:
+        image = source.convert("RGB")
+    fill = image.getpixel((0, 0))
+    mark = _trim(image)
+
+    outputs = {}
+    horizontal = _place(mark, (1200, 400), fill, padding=0.08)
+    outputs["horizontal"] = f"{digest}-horizontal.png"
+    horizontal.save(os.path.join(directory, outputs["horizontal"]), format="PNG", optimize=True)
+
+    icon = _place(mark, (512, 512), fill, padding=0.1)
+    outputs["icon"] = f"{digest}-icon.png"
+    icon.save(os.path.join(directory, outputs["icon"]), format="PNG", optimize=True)
+
+    outputs["favicon"] = f"{digest}-favicon.ico"
+    icon.save(os.path.join(directory, outputs["favicon"]), format="ICO", sizes=[(16, 16), (32, 32), (48, 48)])
+    return outputs
+
+
+def _open_rgb(source_path: str) -> Image.Image:
+    with Image.open(source_path) as source:
+        if source.mode in ("RGBA", "LA", "P"):
+            source = source.convert("RGBA")
+            return Image.alpha_composite(Image.new("RGBA", source.size, (255, 255, 255, 255)), source).convert("RGB")
+        return source.convert("RGB")
+
+
+def export_pngs(source_path: str, directory: str) -> List[str]:
+    """Resized PNG exports with their DPI recorded in the file"""
+    image = _open_rgb(source_path)
+    names = []
+    for name, width, dpi in PNG_EXPORTS:
+        height = max(1, round(image.height * width / image.width))
+        image.resize((width, height), Image.LANCZOS).save(os.path.join(directory, name), format="PNG", dpi=(dpi, dpi))
+        names.append(name)
+    return names
+
+
+def export_favicon(source_path: str, directory: str) -> List[str]:
+    image = _open_rgb(source_path)
+    icon = _place(_trim(image), (256, 256), image.getpixel((0, 0)), padding=0.08)
+    icon.save(os.path.join(directory, "favicon.ico"), format="ICO", sizes=list(FAVICON_SIZES))
+    return ["favicon.ico"]
+
+
+def _runs_to_rects(mask: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """Cover a boolean mask with rectangles: horizontal runs merged down identical rows"""
+    rects = []
+    open_runs: Dict[Tuple[int, int], int] = {}
+    height = mask.shape[0]
+    for y in range(height + 1):
+        runs = set()
+        if y < height:
+            edges = np.flatnonzero(np.diff(np.concatenate(([0], mask[y].view(np.int8), [0]))))
+            runs = set(zip(edges[::2].tolist(), edges[1::2].tolist()))
+        for run in list(open_runs):
+            if run not in runs:
+                top = open_runs.pop(run)
+                rects.append((run[0], top, run[1] - run[0], y - top))
+        for run in runs:
+            open_runs.setdefault(run, y)
+    return rects
+
+
+def trace_svg(source_path: str, directory: str, max_colors: int = 6, resolution: int = 256) -> List[str]:
+    """Posterize the logo and trace each colour layer into SVG paths"""
+    image = _open_rgb(source_path)
+    image.thumbnail((resolution, resolution), Image.LANCZOS)
+    quantized = image.quantize(colors=max_colors, method=Image.Quantize.MEDIANCUT)
+    palette = quantized.getpalette()
+    indices = np.asarray(quantized)
+
+    border = np.concatenate([indices[0], indices[-1], indices[:, 0], indices[:, -1]])
+    background = int(np.bincount(border).argmax())
+
+    width, height = image.size
+    background_rgb = palette[background * 3:background * 3 + 3]
+    layers = []
+    for index in np.unique(indices).tolist():
+        r, g, b = palette[index * 3:index * 3 + 3]
+        # Anti-aliasing fringe close to the background colour is left transparent
+        if max(abs(c - bg) for c, bg in zip((r, g, b), background_rgb)) < 32:
+            continue
+        commands = "".join(f"M{x} {y}h{w}v{h}h-{w}z" for x, y, w, h in _runs_to_rects(indices == index))
+        layers.append(f'<path fill="#{r:02x}{g:02x}{b:02x}" d="{commands}"/>')
+
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" shape-rendering="crispEdges">'
+        + "".join(layers)
+        + "</svg>\n"
+    )
+    with open(os.path.join(directory, "logo.svg"), "w") as f:
+        f.write(svg)
+    return ["logo.svg"]
+
+
+def brand_guidelines_pdf(source_path: str, directory: str, details: Dict[str, Any]) -> List[str]:
+    """Three-page brand guidelines PDF: logo, colour palette, usage rules"""
+    dpi = 150
+    size = (int(8.5 * dpi), int(11 * dpi))
+    margin = dpi
+    title = ImageFont.load_default(size=48)
+    heading = ImageFont.load_default(size=32)
+    body = ImageFont.load_default(size=22)
+
+    def page(heading_text: str) -> Tuple[Image.Image, ImageDraw.ImageDraw]:
+        canvas = Image.new("RGB", size, "white")
+        draw = ImageDraw.Draw(canvas)
+        draw.text((margin, margin), heading_text, fill="black", font=heading)
+        return canvas, draw
+
+    cover = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(cover)
+    draw.text((margin, margin), details.get("company_name") or "Brand Guidelines", fill="black", font=title)
+    draw.text((margin, margin + 70), "Brand guidelines", fill="#555555", font=heading)
+    logo = _open_rgb(source_path)
+    logo.thumbnail((size[0] - 2 * margin, size[0] - 2 * margin), Image.LANCZOS)
+    cover.paste(logo, ((size[0] - logo.width) // 2, margin * 2 + 40))
+
+    colors, draw = page("Colour palette")
+    y = margin + 80
+    for role, value in (details.get("color_palette") or {}).items():
+        try:
+            draw.rectangle((margin, y, margin + 160, y + 100), fill=value, outline="#cccccc")
+        except ValueError:
+            continue
+        draw.text((margin + 190, y + 20), role.title(), fill="black", font=heading)
+        draw.text((margin + 190, y + 60), str(value), fill="#555555", font=body)
+        y += 140
+
+    usage, draw = page("Usage")
+    y = margin + 80
+    sections = [("", details.get("usage_guidelines") or [])]
+    sections += [(key.replace("_", " ").title(), [text]) for key, text in (details.get("brand_guidelines") or {}).items()]
+    for label, lines in sections:
+        if label:
+            draw.text((margin, y), label, fill="black", font=heading)
+            y += 45
+        for line in lines:
+            for wrapped in textwrap.wrap(f"- {line}", width=70):
+                draw.text((margin, y), wrapped, fill="#333333", font=body)
+                y += 32
+        y += 20
+
+    cover.save(
+        os.path.join(directory, "brand_guidelines.pdf"),
+        format="PDF",
+        resolution=dpi,
+        save_all=True,
+        append_images=[colors, usage]
+    )
+    return ["brand_guidelines.pdf"]
@@ -1,58 +1,140 @@
 
-from langgraph.graph import StateGraph, END
 from agents.tech_logo.state import LogoDesignState
-from agents.tech_logo.agents import LogoDesignAgents
-from typing import TypedDict, List, Dict, Any, Optional
+from agents.tech_logo.session_store import SessionStore, create_session_store
+from agents.tech_logo.jobs import JobEngine, QueueFullError, create_job_engine
+from agents.tech_logo.speculation import SPECULATED_FIELDS, is_bare_confirmation, create_speculation_manager
+from agents.tech_logo.turns import SessionTurns
+from agents.tech_logo import events
+from llms.cache import cache_scope
+from observability.metrics import agent_node_seconds, agent_node_errors
+from typing import TypedDict, List, Dict, Any, Optional, Callable, Awaitable, TYPE_CHECKING
 import asyncio
+import copy
+import functools
+import json
+import logging
+import os
+import time
+import uuid
+import threading
 
+# langgraph and the agents (langchain_openai, openai) take seconds to import;
+# they are loaded on first use or by warm_up() so the app can serve right away
+if TYPE_CHECKING:
+    from langgraph.checkpoint.base import BaseCheckpointSaver
+    from agents.tech_logo.agents import LogoDesignAgents
+    from agents.tech_logo.assets import AssetStore
+    from agents.tech_logo.packaging import PackageBuilder
 
-def create_logo_design_workflow():
-    """Create the complete logo design workflow using LangGraph"""
-    
-    agents = LogoDesignAgents()
+logger = logging.getLogger(__name__)
+
+
+PIPELINE_STEPS = ("summary", "design", "generate", "ranking", "regenerate", "user_review", "package")
+
+# Written by chat turns, which may land while the pipeline runs; the pipeline's copy is stale when it finishes
+TURN_FIELDS = ("user_input", "context_summary", "summarized_upto", "history_token_counts")
+
+# current_step -> the node whose edges lead to it; used to seed a thread that has no checkpoint
+RESUME_AFTER = {
+    "summary": "chat",
+    "design": "summary",
+    "generate": "design",
+    "ranking": "generate",
+    "regenerate": "ranking",
+    "user_review": "ranking",
+    "package": "feedback"
+}
+
+
+def _next_step(state: LogoDesignState) -> str:
+    # A failed node sets error_message and leaves current_step on itself, so a retry resumes there
+    return "error" if state.get("error_message") else state["current_step"]
+
+
+def _route_after_ranking(state: LogoDesignState) -> str:
+    # Without feedback from the user, a passing set goes straight to packaging
+    if state["current_step"] == "user_review" and state.get("user_feedback"):
+        return "feedback"
+    return state["current_step"]
+
+
+def create_logo_design_workflow(
+    agents: Optional["LogoDesignAgents"] = None,
+    checkpointer: Optional["BaseCheckpointSaver"] = None,
+    run_node: Optional[Callable[[str, Callable, LogoDesignState], Awaitable[LogoDesignState]]] = None
+):
+    """Create the complete logo design workflow using LangGraph.
+
+    With a checkpointer every finished node is saved per thread (session),
+    so a run that is cut off resumes from the last finished node. Chat turns
+    call the chat node directly; the graph runs summary → package.
+    """
+    from langgraph.graph import StateGraph, END
+    from agents.tech_logo.agents import LogoDesignAgents
+
+    agents = agents or LogoDesignAgents()
     
+    def node(name: str, agent_fn):
+        if run_node is None:
+            return agent_fn
+
+        async def run(state: LogoDesignState) -> LogoDesignState:
+            return await run_node(name, agent_fn, state)
+        return run
+
     # Define the workflow graph
     workflow = StateGraph(LogoDesignState)
     
     # Add nodes (agents)
-    workflow.add_node("chat", agents.chat_agent)
-    workflow.add_node("summary", agents.summary_agent)
-    workflow.add_node("design", agents.designer_agent)
-    workflow.add_node("generate", agents.generator_agent)
-    workflow.add_node("ranking", agents.ranking_agent)
-    workflow.add_node("feedback", agents.feedback_agent)
-    workflow.add_node("package", agents.package_agent)
+    workflow.add_node("chat", node("chat", agents.chat_agent))
+    workflow.add_node("summary", node("summary", agents.summary_agent))
+    workflow.add_node("design", node("design", agents.designer_agent))
+    workflow.add_node("generate", node("generate", agents.generator_agent))
+    workflow.add_node("ranking", node("ranking", agents.ranking_agent))
+    workflow.add_node("feedback", node("feedback", agents.feedback_agent))
+    workflow.add_node("package", node("package", agents.package_agent))
     
     # Define workflow edges and conditions
     workflow.add_conditional_edges(
         "chat",
         lambda state: state["current_step"],
         {
-            "chat": "chat",      # Continue conversation
+            "chat": END,          # Wait for the next user message
             "summary": "summary"  # Move to summary
         }
     )
     
-    workflow.add_edge("summary", "design")
-    workflow.add_edge("design", "generate")
+    workflow.add_conditional_edges(
+        "summary",
+        _next_step,
+        {"design": "design", "error": END}
+    )
+    workflow.add_conditional_edges(
+        "design",
+        _next_step,
+        {"generate": "generate", "error": END}
+    )
     workflow.add_edge("generate", "ranking")
     
     workflow.add_conditional_edges(
         "ranking",
-        lambda state: state["current_step"],
+        _route_after_ranking,
         {
             "regenerate": "generate",     # Regenerate if quality is poor
-            "user_review": "feedback"     # Present to user for feedback
+            "feedback": "feedback",       # Apply the user's feedback
+            "user_review": "package"      # Package the best logo
         }
     )
     
     workflow.add_conditional_edges(
         "feedback",
-        lambda state: state["current_step"],
+        _next_step,
         {
             "design": "design",       # New design concepts needed
             "generate": "generate",   # Regenerate with modifications
-            "package": "package"      # User approved, create package
+            "package": "package",     # User approved, create package
+            "user_review": END,       # Wait for clearer feedback
+            "error": END
         }
     )
     
@@ -61,18 +143,117 @@ def create_logo_design_workflow():
     # Set entry point
     workflow.set_entry_point("chat")
     
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
+
+
+async def create_checkpointer() -> "BaseCheckpointSaver":
+    """Build the checkpointer selected by CHECKPOINTER (memory | sqlite), defaulting to SESSION_STORE"""
+    backend = os.getenv("CHECKPOINTER", os.getenv("SESSION_STORE", "memory")).lower()
+
+    # Event-sourced sessions are durable too, so their pipelines checkpoint to disk; chat turns are not checkpointed
+    if backend in ("sqlite", "events"):
+        # Imported here so the memory backend does not need aiosqlite
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        path = os.getenv("CHECKPOINT_DB_PATH", "data/checkpoints.db")
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        saver = AsyncSqliteSaver(await aiosqlite.connect(path))
+        await saver.setup()
+        return saver
+    if backend == "memory":
+        from langgraph.checkpoint.memory import InMemorySaver
+        return InMemorySaver()
+    raise ValueError(f"Unknown CHECKPOINTER backend: {backend}")
 
 class LogoDesignOrchestrator:
-    def __init__(self):
-        self.agent = LogoDesignAgents()
-        self.session_state: Dict[str, LogoDesignState] = {}
+    def __init__(
+        self,
+        session_store: Optional[SessionStore] = None,
+        job_engine: Optional[JobEngine] = None,
+        checkpointer: Optional["BaseCheckpointSaver"] = None,
+        asset_store: Optional["AssetStore"] = None
+    ):
+        self._agent: Optional["LogoDesignAgents"] = None
+        self._asset_store = asset_store
+        self._package_builder: Optional["PackageBuilder"] = None
+        # warm_up() builds the agents in a thread while requests may ask for them on the loop
+        self._build_lock = threading.RLock()
+        self.session_store = session_store or create_session_store()
+        self.jobs = job_engine or create_job_engine()
+        self.checkpointer = checkpointer
+        self.speculation = create_speculation_manager()
+        self.turns = SessionTurns()
+        self._graph = None
+        self._graph_lock = asyncio.Lock()
 
-    def start_session(self, session_id: str) -> Dict[str, Any]:
-        """Start a new design session, agent initiates the chat"""
-        state: LogoDesignState = {
+    @property
+    def asset_store(self) -> "AssetStore":
+        with self._build_lock:
+            if self._asset_store is None:
+                from agents.tech_logo.assets import create_asset_store
+                self._asset_store = create_asset_store()
+        return self._asset_store
+
+    @property
+    def package_builder(self) -> "PackageBuilder":
+        with self._build_lock:
+            if self._package_builder is None:
+                from agents.tech_logo.packaging import create_package_builder
+                self._package_builder = create_package_builder(self.asset_store)
+        return self._package_builder
+
+    @property
+    def agent(self) -> "LogoDesignAgents":
+        """The agents, created on first use"""
+        with self._build_lock:
+            if self._agent is None:
+                from agents.tech_logo.agents import LogoDesignAgents
+                self._agent = LogoDesignAgents(self.asset_store, self.package_builder)
+        return self._agent
+
+    async def warm_up(self):
+        """Import the heavy modules, load the tokenizer, build the graph and start the image workers ahead of the first request"""
+        started = time.perf_counter()
+        # Importing in a thread keeps the loop serving while langgraph and langchain_openai load
+        await asyncio.to_thread(lambda: self.agent)
+        from agents.tech_logo.context import load_encoder
+        await load_encoder(self.agent.context.model)
+        await self.graph()
+        await self.asset_store.warm_up()
+        logger.info("Warm-up finished in %.2fs", time.perf_counter() - started)
+
+    async def graph(self):
+        """The compiled workflow; built on first use because the SQLite checkpointer needs a running loop"""
+        if self._graph is None:
+            async with self._graph_lock:
+                if self._graph is None:
+                    self.checkpointer = self.checkpointer or await create_checkpointer()
+                    self._graph = create_logo_design_workflow(self.agent, self.checkpointer, self._run_node)
+        return self._graph
+
+    @staticmethod
+    def _thread(session_id: str) -> Dict[str, Any]:
+        return {"configurable": {"thread_id": session_id}}
+
+    def _job_active(self, job: Optional[Dict[str, Any]]) -> bool:
+        """True while the session's pipeline job is queued or running in this process"""
+        if not job or job["status"] not in ("queued", "running"):
+            return False
+        # Jobs from before a restart are gone from the engine and must be resubmitted
+        engine_job = self.jobs.get(job["job_id"])
+        return engine_job is not None and not engine_job.done.is_set()
+
+    @staticmethod
+    def new_state() -> LogoDesignState:
+        """Empty state for a new session or brief"""
+        return {
             "user_input": "",  # No user input initially
             "conversation_history": [],
+            "context_summary": None,
+            "summarized_upto": 0,
+            "history_token_counts": [],
             "user_feedback": None,
             "iteration_count": 0,
             "chat_summary": None,
@@ -81,14 +262,24 @@ class LogoDesignOrchestrator:
             "ranking_results": None,
             "final_package": None,
             "generation_attempts": 0,
+            "seen_digests": [],
+            "concept_attempts": {},
+            "pending_concepts": None,
+            "llm_usage": {"tokens": 0, "cost_usd": 0.0},
+            "routing_log": [],
             "current_step": "chat",
             "needs_regeneration": False,
             "user_approved": False,
             "error_message": None,
+            "pipeline_job": None,
             "client_requirements": None,
             "max_attempts": 3
         }
 
+    async def start_session(self, session_id: str) -> Dict[str, Any]:
+        """Start a new design session, agent initiates the chat"""
+        state = self.new_state()
+
         # Initial synthetic agent message
         system_greeting = {
             "role": "assistant",
@@ -96,43 +287,270 @@ class LogoDesignOrchestrator:
         }
         state["conversation_history"].append(system_greeting)
         
-        self.session_state[session_id] = state
+        await self.session_store.set(session_id, state)
         return {"message": system_greeting["content"]}
 
-    async def process_user_message(self, session_id: str, user_message: str) -> Dict[str, Any]:
-        state = self.session_state.get(session_id)
+    async def _run_node(self, node: str, agent_fn, state: LogoDesignState) -> LogoDesignState:
+        """Run one agent node, announcing start and finish to any stream listener"""
+        logger.info("Running %s", node)
+        events.emit("node_start", node=node)
+        started = time.perf_counter()
+
+        try:
+            with cache_scope(node):
+                state = await agent_fn(state)
+        except Exception:
+            agent_node_errors.inc(node=node)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            agent_node_seconds.observe(elapsed, node=node)
+
+        if state.get("error_message"):
+            agent_node_errors.inc(node=node)
+        events.emit(
+            "node_end",
+            node=node,
+            current_step=state["current_step"],
+            duration_ms=round(elapsed * 1000, 1)
+        )
+        return state
+
+    async def process_user_message(
+        self,
+        session_id: str,
+        user_message: str,
+        wait_for_pipeline: bool = False
+    ) -> Dict[str, Any]:
+        # One turn at a time per session; a repeat of a message still in flight shares its result
+        result = await self.turns.run(session_id, user_message, lambda: self._process_turn(session_id, user_message))
+        job = result.get("job")
+
+        if wait_for_pipeline and job and job["status"] == "queued":
+            await self.jobs.wait(job["job_id"])
+            state = await self.session_store.get(session_id)
+            result = {
+                "conversation": state["conversation_history"],
+                "current_step": state["current_step"],
+                "job": state.get("pipeline_job")
+            }
+        return result
+
+    async def _process_turn(self, session_id: str, user_message: str) -> Dict[str, Any]:
+        """Apply one user message to the session; the caller holds the session's turn lock"""
+        state = await self.session_store.get(session_id)
         if not state:
             return {"error": "Session not found"}
 
-        print(f"\n[USER MESSAGE] {user_message}")
-        print(f"[STEP] Current Step: {state['current_step']}")
+        logger.debug("Session %s at step %s received: %s", session_id, state["current_step"], user_message)
         
         state["user_input"] = user_message
-        state["conversation_history"].append({"role": "user", "content": user_message})
+        self.agent.context.append(state, "user", user_message)
 
         if state["current_step"] == "chat":
-            state = self.agent.chat_agent(state)
-            print("[STEP] Completed chat_agent")
-            
-            if state["current_step"] == "summary":
-                print("[STEP] Moving to summary_agent")
-                state = self.agent.summary_agent(state)
+            # Not checkpointed: the session already holds the turn, and the pipeline seeds its thread from it
+            state = await self._run_node("chat", self.agent.chat_agent, state)
+            self._update_speculation(session_id, user_message, state)
 
-                print("[STEP] Moving to designer_agent")
-                state = await self.agent.designer_agent(state)
+        job = state.get("pipeline_job")
+        if state["current_step"] in PIPELINE_STEPS and not self._job_active(job):
+            # Hand summary → package to the job engine so this request returns right away.
+            # After a failure this resumes the pipeline at the step that failed.
+            job = {"job_id": str(uuid.uuid4()), "status": "queued"}
+            state["pipeline_job"] = job
+            await self.session_store.set(session_id, state)
+            try:
+                self.jobs.submit(session_id, lambda: self._run_pipeline(session_id), job_id=job["job_id"])
+                events.emit("job", **job)
+            except QueueFullError as e:
+                # current_step is unchanged so the next message retries the submission
+                job["status"] = "rejected"
+                state["error_message"] = str(e)
 
-                print("[STEP] Moving to generator_agent")
-                state = await self.agent.generator_agent(state)
+        await self.session_store.set(session_id, state)
 
-                print("[STEP] Moving to ranking_agent")
-                state = self.agent.ranking_agent(state)
+        return {
+            "conversation": list(state["conversation_history"]),
+            "current_step": state["current_step"],
+            # A copy: the pipeline updates the stored job while this result is on its way out
+            "job": dict(job) if job else None
+        }
 
-                print("[STEP] Moving to package_agent")
-                state = self.agent.package_agent(state)
-        
-        # ... similarly log each step
-        self.session_state[session_id] = state
+    def _update_speculation(self, session_id: str, user_message: str, state: LogoDesignState):
+        """Start summary+design behind a recap; keep it only if the user confirms without changes"""
+        if self.speculation is None:
+            return
+        if state["current_step"] == "summary":
+            if not is_bare_confirmation(user_message):
+                self.speculation.cancel(session_id)
+            return
+
+        self.speculation.cancel(session_id)
+        history = state["conversation_history"]
+        if state["current_step"] == "chat" and history and self.agent.offers_recap(history[-1]["content"]):
+            snapshot = copy.deepcopy(state)
+            self.speculation.start(session_id, lambda: self._speculate(snapshot))
+
+    async def _speculate(self, state: LogoDesignState) -> LogoDesignState:
+        state = await self._run_node("summary", self.agent.summary_agent, state)
+        if state["current_step"] == "design":
+            # No image prefetch: the brief may still be discarded
+            state = await self._run_node("design", functools.partial(self.agent.designer_agent, start_generation=False), state)
+        return state
+
+    async def _run_pipeline(self, session_id: str) -> str:
+        """Run the graph from the session's current step to the end, persisting the result in the session.
+
+        The thread is checkpointed only while the run is in flight: once the
+        result is back in the session it is deleted, so abandoned sessions
+        leave nothing behind in the checkpointer.
+        """
+        async with self.turns.lock(session_id):
+            state = await self.session_store.get(session_id)
+            job = state["pipeline_job"]
+            job["status"] = "running"
+            # A retry starts clean; the failed step is still current_step
+            state["error_message"] = None
+            await self.session_store.set(session_id, state)
+        from agents.tech_logo.agents import prefetch_owner
+
+        graph = await self.graph()
+        config = self._thread(session_id)
+        # Messages past this index were added by the pipeline
+        base = len(state["conversation_history"])
+        try:
+            snapshot = await graph.aget_state(config)
+            brief = await self.speculation.take(session_id) if self.speculation else None
+            # Only a run cut off mid-node (e.g. by a restart with the SQLite checkpointer) leaves a checkpoint to resume
+            if not snapshot.next:
+                if brief and state["current_step"] == "summary":
+                    # Summary and design already ran while the user read the recap
+                    state = {**state, **{field: brief[field] for field in SPECULATED_FIELDS}, "current_step": "generate"}
+                    await graph.aupdate_state(config, state, as_node="design")
+                else:
+                    await graph.aupdate_state(config, state, as_node=RESUME_AFTER[state["current_step"]])
+            base = len((await graph.aget_state(config)).values["conversation_history"])
+            # Finished nodes are checkpointed, so a retry never repeats them
+            with prefetch_owner(session_id):
+                await graph.ainvoke(None, config)
+            state = (await graph.aget_state(config)).values
+            job["status"] = "failed" if state.get("error_message") else "completed"
+        except Exception as e:
+            # Keep what finished; current_step still names the node to retry
+            state = (await graph.aget_state(config)).values or state
+            job["status"] = "failed"
+            state["error_message"] = f"Pipeline error: {str(e)}"
+            raise
+        finally:
+            # Images prefetched by design but never reached by generate (failure, cancel) would run on, and bill
+            await self.agent.cancel_prefetches(session_id)
+            async with self.turns.lock(session_id):
+                state = self._merge_pipeline(await self.session_store.get(session_id), state, base)
+                state["pipeline_job"] = job
+                await self.session_store.set(session_id, state)
+            if job["status"] != "running":
+                # The session now names the node to retry, so the next run seeds its thread from it again
+                await self.checkpointer.adelete_thread(session_id)
+        return state["current_step"]
+
+    @staticmethod
+    def _merge_pipeline(session: LogoDesignState, result: LogoDesignState, base: int) -> LogoDesignState:
+        """The pipeline's result on top of the session as stored now.
+
+        Turns taken during the run keep their messages and context fields;
+        the messages the pipeline added (from `base` on) follow them.
+        """
         return {
-            "conversation": state["conversation_history"],
-            "current_step": state["current_step"]
-        }
\ No newline at end of file
+            **result,
+            **{field: session[field] for field in TURN_FIELDS if field in session},
+            "conversation_history": session["conversation_history"] + result["conversation_history"][base:]
+        }
+
+    async def run_brief(self, thread_id: str, client_requirements: Dict[str, Any]) -> LogoDesignState:
+        """Run design → package for a structured brief, skipping the consultation.
+
+        The thread is checkpointed like a session pipeline, so a brief that
+        failed or was interrupted resumes from its last finished node.
+        """
+        from agents.tech_logo.agents import prefetch_owner
+
+        graph = await self.graph()
+        config = self._thread(thread_id)
+        snapshot = await graph.aget_state(config)
+        if not snapshot.next:
+            state = self.new_state()
+            state.update({
+                "client_requirements": client_requirements,
+                "chat_summary": json.dumps(client_requirements),
+                "current_step": "design"
+            })
+            # As if summary_agent had just produced the brief
+            await graph.aupdate_state(config, state, as_node="summary")
+        try:
+            with prefetch_owner(thread_id):
+                await graph.ainvoke(None, config)
+        finally:
+            await self.agent.cancel_prefetches(thread_id)
+        state = (await graph.aget_state(config)).values
+        if state["current_step"] == "complete":
+            await self.checkpointer.adelete_thread(thread_id)
+        return state
+
+    async def close(self):
+        """Cancel speculative work and prefetches, flush the generation ledger, close the checkpointer and stop the image workers"""
+        if self.speculation is not None:
+            await self.speculation.shutdown()
+        if self._agent is not None:
+            await self._agent.cancel_prefetches()
+        conn = getattr(self.checkpointer, "conn", None)
+        if conn is not None:
+            await conn.close()
+        if self._agent is not None:
+            await self._agent.ledger.close()
+        if self._asset_store is not None:
+            self._asset_store.shutdown()
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job status, plus the session result once it has finished"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        status = job.to_dict()
+        if job.done.is_set():
+            state = await self.session_store.get(job.session_id)
+            if state:
+                status["current_step"] = state["current_step"]
+                status["error_message"] = state.get("error_message")
+                status["conversation"] = state["conversation_history"]
+                status["final_package"] = state.get("final_package")
+        return status
+
+    async def stream_user_message(self, session_id: str, user_message: str, keepalive: float = 15.0):
+        """Process a message while yielding chat tokens, node progress and images as they happen"""
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def run():
+            events.listen(queue)
+            try:
+                result = await self.process_user_message(session_id, user_message, wait_for_pipeline=True)
+                queue.put_nowait({"event": "error" if "error" in result else "done", **result})
+            except Exception as e:
+                queue.put_nowait({"event": "error", "error": str(e)})
+            finally:
+                queue.put_nowait(None)
+
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    # Keep idle proxies from closing the connection during long generations
+                    yield {"event": "keepalive"}
+                    continue
+                if event is None:
+                    break
+                yield event
+        finally:
+            if not task.done():
+                task.cancel()
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""Prompt tokens and context-build latency per turn over long chat_agent conversations.
+
+Compares re-sending the full history every turn with the token-budgeted
+ConversationContext. The LLM is not called; the rolling summarizer is a stub.
+
+Run from backend/:  python -m benchmarks.chat_context [--turns 50] [--budget 3000]
+"""
+import argparse
+import asyncio
+import time
+from agents.tech_logo.context import ConversationContext, count_tokens, MESSAGE_OVERHEAD_TOKENS
+
+SYSTEM_PROMPT = "You are Alex, a senior brand consultant specializing in logo design for tech companies. " * 6
+USER_TURN = "Our product is a developer platform for observability and we want something bold but trustworthy. " * 3
+ASSISTANT_TURN = "Thanks, that helps. Could you tell me more about your audience, colours you like and any competitors? " * 5
+
+
+def full_history_tokens(history):
+    """Pre-context behaviour: re-serialize and re-count the whole history every turn"""
+    total = count_tokens(SYSTEM_PROMPT) + MESSAGE_OVERHEAD_TOKENS
+    for msg in history:
+        total += count_tokens(msg["content"]) + MESSAGE_OVERHEAD_TOKENS
+    return total
+
+
+async def run(turns: int, budget: int):
+    async def summarize(text: str) -> str:
+        return text[-1200:]
+
+    context = ConversationContext(summarize=summarize, token_budget=budget)
+    naive = {"conversation_history": []}
+    state = {"conversation_history": [], "history_token_counts": [], "summarized_upto": 0, "context_summary": None}
+
+    rows = []
+    for turn in range(1, turns + 1):
+        user = f"[{turn}] {USER_TURN}"
+        assistant = f"[{turn}] {ASSISTANT_TURN}"
+
+        naive["conversation_history"].append({"role": "user", "content": user})
+        start = time.perf_counter()
+        naive_tokens = full_history_tokens(naive["conversation_history"])
+        naive_ms = (time.perf_counter() - start) * 1000
+        naive["conversation_history"].append({"role": "assistant", "content": assistant})
+
+        context.append(state, "user", user)
+        start = time.perf_counter()
+        await context.build_messages(state, SYSTEM_PROMPT)
+        budget_ms = (time.perf_counter() - start) * 1000
+        budget_tokens = context.prompt_tokens(state, SYSTEM_PROMPT)
+        context.append(state, "assistant", assistant)
+
+        rows.append((turn, naive_tokens, naive_ms, budget_tokens, budget_ms))
+
+    print(f"{'turn':>4} {'full tokens':>12} {'full ms':>8} {'budget tokens':>14} {'budget ms':>10}")
+    for turn, naive_tokens, naive_ms, budget_tokens, budget_ms in rows:
+        if turn == 1 or turn % 10 == 0:
+            print(f"{turn:>4} {naive_tokens:>12} {naive_ms:>8.2f} {budget_tokens:>14} {budget_ms:>10.2f}")
+    print(
+        f"total prompt tokens over {turns} turns: full {sum(r[1] for r in rows)}, "
+        f"budgeted {sum(r[3] for r in rows)}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--budget", type=int, default=3000)
+    args = parser.parse_args()
+    asyncio.run(run(args.turns, args.budget))
@@ -0,0 +1,97 @@
+"""Compare per-call aiohttp sessions against the pooled provider registry.
+
+Run from backend/:  python -m benchmarks.connection_reuse
+"""
+import asyncio
+import os
+import time
+import aiohttp
+from aiohttp import web
+from llms.clients import ProviderClients
+import llms.logo as logo_module
+from llms.logo import ReplicateProvider
+from llms.scheduler import create_provider_scheduler
+
+
+class StubReplicate:
+    """Minimal Replicate predictions API that counts TCP connections"""
+
+    def __init__(self):
+        self.peers = set()
+        self.requests = 0
+
+    def _track(self, request: web.Request):
+        self.requests += 1
+        self.peers.add(request.transport.get_extra_info("peername"))
+
+    async def create(self, request: web.Request):
+        self._track(request)
+        return web.json_response({"id": "stub", "status": "starting"}, status=201)
+
+    async def poll(self, request: web.Request):
+        self._track(request)
+        return web.json_response({"status": "succeeded", "output": ["http://stub/logo.png"]})
+
+    def reset(self):
+        self.peers.clear()
+        self.requests = 0
+
+
+async def unpooled_generate(base_url: str):
+    """The pre-registry behaviour: a fresh ClientSession per image"""
+    async with aiohttp.ClientSession() as session:
+        async with session.post(base_url, json={}) as resp:
+            prediction_id = (await resp.json())["id"]
+        async with session.get(f"{base_url}/{prediction_id}") as resp:
+            return await resp.json()
+
+
+async def run(calls: int = 500, concurrency: int = 20):
+    stub = StubReplicate()
+    app = web.Application()
+    app.router.add_post("/v1/predictions", stub.create)
+    app.router.add_get("/v1/predictions/{id}", stub.poll)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}/v1/predictions"
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(coro_factory):
+        async with semaphore:
+            return await coro_factory()
+
+    async def measure(label, coro_factory):
+        stub.reset()
+        start = time.perf_counter()
+        await asyncio.gather(*[bounded(coro_factory) for _ in range(calls)])
+        elapsed = time.perf_counter() - start
+        print(
+            f"{label:<10} {calls / elapsed:>9.1f} images/s  "
+            f"{stub.requests:>5} requests over {len(stub.peers):>4} connections"
+        )
+
+    await measure("unpooled", lambda: unpooled_generate(base_url))
+
+    # Measure the connection pool, not the client-side rate limiter: lift the Replicate limits past the stub's pace
+    os.environ.update({
+        "REPLICATE_RPS": "100000",
+        "REPLICATE_MAX_IN_FLIGHT": str(concurrency),
+        "REPLICATE_POLL_RPS": "100000",
+        "REPLICATE_POLL_MAX_IN_FLIGHT": str(concurrency)
+    })
+    logo_module.scheduler = create_provider_scheduler()
+    clients = ProviderClients(max_connections_per_host=concurrency)
+    logo_module.provider_clients = clients
+    provider = ReplicateProvider(api_token="stub", base_url=base_url)
+    await measure("pooled", lambda: provider.generate_image("logo"))
+    await clients.aclose()
+
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
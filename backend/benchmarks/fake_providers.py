@@ -0,0 +1,365 @@
+"""Local stand-ins for the OpenAI and Replicate APIs used by the load benchmarks.
+
+Serves:
+  POST /v1/chat/completions        (plain and streamed)
+  POST /v1/images/generations      (DALL-E 3 shape)
+  POST /v1/predictions             (Replicate create)
+  GET  /v1/predictions/{id}        (Replicate poll)
+  POST /v1/predictions/{id}/cancel (Replicate cancel)
+  GET  /images/{name}.png          (generated logo bytes)
+
+Latency is drawn per request as `latency * uniform(1 - jitter, 1 + jitter)`,
+`failure_rate` of requests answer 500 and `throttle_rate` answer 429 with
+a one-second Retry-After. `model_latency` overrides the chat latency for
+some models. `blank_rate` of generated images are an empty
+canvas, which the local ranking pre-filter rejects. Chat replies take `token_delay`
+per word on top, streamed word by word or returned whole at the end.
+
+Run standalone from backend/:  python -m benchmarks.fake_providers --port 8900
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import struct
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from aiohttp import web
+
+CHAT_REPLY = (
+    "To summarize: you are Acme Observability, a developer tools company that wants a bold, "
+    "trustworthy, minimal geometric mark in deep blue. Does this accurately capture your brand?"
+)
+
+CLIENT_REQUIREMENTS = {
+    "company_details": {
+        "name": "Acme Observability",
+        "industry": "Developer tools",
+        "business_function": "Monitoring platform",
+        "target_audience": "Platform engineers",
+        "unique_value": "Zero-config tracing"
+    },
+    "brand_requirements": {
+        "personality": ["bold", "trustworthy", "precise"],
+        "desired_perception": "Reliable infrastructure",
+        "core_values": ["clarity", "speed"],
+        "emotional_goal": "Confidence"
+    },
+    "design_specifications": {
+        "logo_style": "Minimal geometric",
+        "color_direction": "Deep blue with a bright accent",
+        "aesthetic_approach": "Flat",
+        "visual_inspiration": "Swiss design",
+        "avoid": "Gradients"
+    },
+    "technical_requirements": {
+        "primary_applications": ["web", "app icon"],
+        "scalability_needs": "16px to billboard",
+        "background_variations": "Light and dark",
+        "file_priorities": "SVG, PNG"
+    },
+    "competitive_context": {
+        "key_competitors": ["Datadog", "Grafana"],
+        "differentiation": "Simpler",
+        "industry_positioning": "Challenger"
+    }
+}
+
+
+def design_concepts():
+    palettes = [("#0B3D91", "#FFFFFF", "#FFB000"), ("#111827", "#F3F4F6", "#10B981"), ("#1E40AF", "#E0E7FF", "#F43F5E")]
+    return {
+        "concepts": [
+            {
+                "concept_id": i + 1,
+                "name": f"Concept {i + 1}",
+                "description": "Geometric monogram",
+                "style": "minimalist",
+                "color_palette": {"primary": p, "secondary": s, "accent": a},
+                "typography": "Geometric sans",
+                "symbol_concept": "Abstract signal wave",
+                "rationale": "Clean and scalable",
+                "midjourney_prompt": f"minimal geometric tech logo variant {i + 1}, flat vector, white background"
+            }
+            for i, (p, s, a) in enumerate(palettes)
+        ],
+        "design_rationale": "Three takes on a precise, technical mark",
+        "technical_notes": "Keep strokes thick enough for favicons"
+    }
+
+
+def reply_for(messages):
+    system = next((m.get("content") for m in messages if m.get("role") == "system"), "") or ""
+    if isinstance(system, list):
+        system = " ".join(part.get("text", "") for part in system if isinstance(part, dict))
+    if "brand strategist" in system:
+        return json.dumps(CLIENT_REQUIREMENTS)
+    if "elite logo designer" in system:
+        return json.dumps(design_concepts())
+    if "quality assessor" in system:
+        text = json.dumps([m.get("content") for m in messages if m.get("role") == "user"])
+        concept_ids = [int(i) for i in re.findall(r"concept_id: (\d+)", text)]
+        return json.dumps({
+            "overall_quality": "pass",
+            "best_concept_id": concept_ids[0] if concept_ids else 1,
+            "assessments": [
+                {
+                    "concept_id": concept_id,
+                    "scores": {"design_quality": 8, "brand_alignment": 8, "technical_quality": 7, "uniqueness": 7},
+                    "total_score": 30,
+                    "issues": [],
+                    "recommendation": "Approved"
+                }
+                for concept_id in concept_ids
+            ]
+        })
+    if "Condense" in system:
+        return "The client is Acme Observability and wants a minimal geometric blue logo."
+    return CHAT_REPLY
+
+
+def logo_png(seed: str, size: int = 256, blank: bool = False) -> bytes:
+    """A deterministic flat-colour logo: a coloured square mark on a white canvas"""
+    rng = random.Random(seed)
+    color = b"\xff\xff\xff" if blank else bytes(rng.randrange(256) for _ in range(3))
+    margin = size // 4
+    rows = []
+    for y in range(size):
+        row = bytearray(b"\x00")
+        inside_y = margin <= y < size - margin
+        for x in range(size):
+            row += color if inside_y and margin <= x < size - margin else b"\xff\xff\xff"
+        rows.append(bytes(row))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(b"".join(rows), 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+def iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class FakeProviders:
+    def __init__(
+        self,
+        chat_latency: float = 0.5,
+        image_latency: float = 2.0,
+        replicate_latency: float = 3.0,
+        jitter: float = 0.2,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+        token_delay: float = 0.0,
+        throttle_rate: float = 0.0,
+        blank_rate: float = 0.0,
+        model_latency: Optional[Dict[str, float]] = None
+    ):
+        self.chat_latency = chat_latency
+        self.image_latency = image_latency
+        self.replicate_latency = replicate_latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.token_delay = token_delay
+        self.throttle_rate = throttle_rate
+        self.blank_rate = blank_rate
+        self.model_latency = model_latency or {}
+        self.rng = random.Random(seed)
+        self.predictions = {}
+        self.counts = {"chat": 0, "images": 0, "predictions": 0, "polls": 0, "failures": 0, "throttled": 0, "blank": 0, "cancelled": 0}
+
+    def _latency(self, base: float) -> float:
+        return max(0.0, base * self.rng.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def _fail(self) -> Optional[web.Response]:
+        """An injected error response, or None to answer normally"""
+        roll = self.rng.random()
+        if roll < self.failure_rate:
+            self.counts["failures"] += 1
+            return web.json_response({"error": {"message": "fake upstream error"}}, status=500)
+        if roll < self.failure_rate + self.throttle_rate:
+            self.counts["throttled"] += 1
+            return web.json_response({"error": {"message": "fake rate limit"}}, status=429, headers={"Retry-After": "1"})
+        return None
+
+    async def chat(self, request: web.Request):
+        self.counts["chat"] += 1
+        body = await request.json()
+        model = body.get("model", "gpt-4")
+        await asyncio.sleep(self._latency(self.model_latency.get(model, self.chat_latency)))
+        if (failure := self._fail()) is not None:
+            return failure
+
+        content = reply_for(body.get("messages", []))
+        prompt_tokens = sum(len(json.dumps(m)) for m in body.get("messages", [])) // 4
+        completion_tokens = len(content) // 4
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+        if not body.get("stream"):
+            # Same generation time as the streamed reply, just delivered at once
+            await asyncio.sleep(self.token_delay * len(content.split(" ")))
+            return web.json_response({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+
+        def frame(choices, **extra):
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": choices,
+                **extra
+            }
+            return f"data: {json.dumps(payload)}\n\n".encode()
+
+        for word in content.split(" "):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            await response.write(frame([{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]))
+        await response.write(frame([{"index": 0, "delta": {}, "finish_reason": "stop"}]))
+        if (body.get("stream_options") or {}).get("include_usage"):
+            await response.write(frame([], usage=usage))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def images(self, request: web.Request):
+        self.counts["images"] += 1
+        await request.json()
+        await asyncio.sleep(self._latency(self.image_latency))
+        if (failure := self._fail()) is not None:
+            return failure
+        name = uuid.uuid4().hex
+        return web.json_response({
+            "created": int(time.time()),
+            "data": [{"url": f"{request.scheme}://{request.host}/images/{name}.png", "revised_prompt": "fake"}]
+        })
+
+    async def create_prediction(self, request: web.Request):
+        self.counts["predictions"] += 1
+        body = await request.json()
+        if (failure := self._fail()) is not None:
+            return failure
+        prediction_id = uuid.uuid4().hex
+        outputs = int((body.get("input") or {}).get("num_outputs", 1))
+        created = time.time()
+        self.predictions[prediction_id] = (created, self._latency(self.replicate_latency), outputs)
+        return web.json_response({"id": prediction_id, "status": "starting", "created_at": iso(created)}, status=201)
+
+    async def poll_prediction(self, request: web.Request):
+        self.counts["polls"] += 1
+        prediction_id = request.match_info["id"]
+        if prediction_id not in self.predictions:
+            return web.json_response({"detail": "not found"}, status=404)
+        created, latency, outputs = self.predictions[prediction_id]
+        if latency is None:
+            return web.json_response({"id": prediction_id, "status": "canceled", "created_at": iso(created)})
+        now = time.time()
+        # A fifth of the latency is spent queued, the rest running
+        started = created + latency * 0.2
+        if now - created < latency:
+            status = "processing" if now >= started else "starting"
+            return web.json_response({"id": prediction_id, "status": status, "created_at": iso(created)})
+        base = f"{request.scheme}://{request.host}/images"
+        return web.json_response({
+            "id": prediction_id,
+            "status": "succeeded",
+            "output": [f"{base}/{prediction_id}-{i}.png" for i in range(outputs)],
+            "created_at": iso(created),
+            "started_at": iso(started),
+            "completed_at": iso(created + latency),
+            "metrics": {"predict_time": latency * 0.8}
+        })
+
+    async def cancel_prediction(self, request: web.Request):
+        prediction_id = request.match_info["id"]
+        if prediction_id not in self.predictions:
+            return web.json_response({"detail": "not found"}, status=404)
+        self.counts["cancelled"] += 1
+        created, _, outputs = self.predictions[prediction_id]
+        self.predictions[prediction_id] = (created, None, outputs)
+        return web.json_response({"id": prediction_id, "status": "canceled", "created_at": iso(created)})
+
+    async def image_bytes(self, request: web.Request):
+        name = request.match_info["name"]
+        # Decided by name, so every download of one image agrees
+        blank = random.Random(name).random() < self.blank_rate
+        self.counts["blank"] += blank
+        return web.Response(body=logo_png(name, blank=blank), content_type="image/png")
+
+    async def stats(self, request: web.Request):
+        return web.json_response(self.counts)
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=16 * 2**20)
+        app.router.add_post("/v1/chat/completions", self.chat)
+        app.router.add_post("/v1/images/generations", self.images)
+        app.router.add_post("/v1/predictions", self.create_prediction)
+        app.router.add_get("/v1/predictions/{id}", self.poll_prediction)
+        app.router.add_post("/v1/predictions/{id}/cancel", self.cancel_prediction)
+        app.router.add_get("/images/{name}.png", self.image_bytes)
+        app.router.add_get("/_stats", self.stats)
+        return app
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--chat-latency", type=float, default=0.5)
+    parser.add_argument("--image-latency", type=float, default=2.0)
+    parser.add_argument("--replicate-latency", type=float, default=3.0)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds between streamed words")
+    parser.add_argument("--blank-rate", type=float, default=0.0, help="Share of generated images that are blank")
+    parser.add_argument(
+        "--model-latency", nargs="*", default=[], metavar="MODEL=SECONDS", help="Chat latency for specific models"
+    )
+
+
+def parse_model_latency(pairs) -> Dict[str, float]:
+    return {model: float(seconds) for model, _, seconds in (pair.partition("=") for pair in pairs)}
+
+
+def serve(port: int, chat_latency: float, image_latency: float, replicate_latency: float,
+          jitter: float, failure_rate: float, seed: int, token_delay: float = 0.0, throttle_rate: float = 0.0,
+          blank_rate: float = 0.0, model_latency: Optional[Dict[str, float]] = None):
+    fakes = FakeProviders(
+        chat_latency, image_latency, replicate_latency, jitter, failure_rate, seed, token_delay, throttle_rate, blank_rate,
+        model_latency
+    )
+    web.run_app(fakes.app(), host="127.0.0.1", port=port, print=None, access_log=None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8900)
+    add_arguments(parser)
+    args = parser.parse_args()
+    serve(args.port, args.chat_latency, args.image_latency, args.replicate_latency,
+          args.jitter, args.failure_rate, args.seed, args.token_delay, args.throttle_rate, args.blank_rate,
+          parse_model_latency(args.model_latency))
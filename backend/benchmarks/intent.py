@@ -0,0 +1,133 @@
+"""Accuracy and latency of the local chat intent detector on a labelled set.
+
+Each sample is labelled with the route the turn should take: confirm,
+reject or small_talk when a local reply is right, or other when only the
+LLM can answer it (new requirements, questions, or a yes with changes).
+A detection below the confidence threshold counts as other. The lexicon
+was tuned on this set, so its scores are optimistic. tests/test_intent.py
+holds out a separate set and gates precision on it.
+
+Reports:
+  - accuracy over all samples
+  - precision of local answers (a wrong one skips the model when it was needed)
+  - coverage of the turns that could be answered locally
+  - detector latency
+
+Run from backend/:  python -m benchmarks.intent [--threshold 0.9]
+"""
+import argparse
+import time
+from collections import Counter
+from agents.tech_logo.intent import detect_intent, CONFIRM, REJECT, SMALL_TALK, OTHER
+
+SAMPLES = [
+    # Confirmations of a recap
+    ("yes", CONFIRM), ("Yes!", CONFIRM), ("yep", CONFIRM), ("yeah that's right", CONFIRM),
+    ("Yes, sounds good", CONFIRM), ("sounds good", CONFIRM), ("looks good to me", CONFIRM),
+    ("correct", CONFIRM), ("That's correct.", CONFIRM), ("exactly", CONFIRM), ("perfect, go ahead", CONFIRM),
+    ("ok", CONFIRM), ("okay let's do it", CONFIRM), ("sure", CONFIRM), ("yes please proceed", CONFIRM),
+    ("👍", CONFIRM), ("lgtm", CONFIRM), ("Absolutely, that's it", CONFIRM), ("spot on!", CONFIRM),
+    ("yes thank you", CONFIRM), ("Great, thanks!", CONFIRM), ("all good", CONFIRM), ("that's right", CONFIRM),
+    ("Yup, go for it", CONFIRM), ("yes, that captures it", CONFIRM), ("I love it", CONFIRM),
+    ("Yes that is accurate", CONFIRM), ("agreed", CONFIRM), ("confirmed", CONFIRM), ("works for me", CONFIRM),
+    ("yes exactly", CONFIRM), ("Ok great", CONFIRM), ("definitely", CONFIRM), ("cool, go ahead", CONFIRM),
+    ("Yes, it makes sense", CONFIRM), ("perfect", CONFIRM), ("✅", CONFIRM), ("yes yes", CONFIRM),
+    # Rejections of a recap
+    ("no", REJECT), ("nope", REJECT), ("No.", REJECT), ("not quite", REJECT), ("that's not right", REJECT),
+    ("no, that's wrong", REJECT), ("nah", REJECT), ("wait", REJECT), ("hold on", REJECT),
+    ("that's incorrect", REJECT), ("not really", REJECT), ("doesn't sound right", REJECT), ("👎", REJECT),
+    ("no that's not it", REJECT), ("not exactly", REJECT), ("wrong", REJECT), ("hang on a second", REJECT),
+    ("isn't right", REJECT), ("no, not correct", REJECT), ("nope, not accurate", REJECT),
+    # Small talk
+    ("hi", SMALL_TALK), ("Hello!", SMALL_TALK), ("hey there", SMALL_TALK), ("good morning", SMALL_TALK),
+    ("thanks", SMALL_TALK), ("thank you so much", SMALL_TALK), ("how are you?", SMALL_TALK),
+    ("hi alex", SMALL_TALK), ("cheers", SMALL_TALK), ("lol", SMALL_TALK), ("hey, how are you doing", SMALL_TALK),
+    ("thx", SMALL_TALK), ("👋", SMALL_TALK), ("good evening", SMALL_TALK), ("hello there", SMALL_TALK),
+    # Needs the model: new information, questions, or agreement with changes
+    ("We're Acme, a fintech startup for small businesses", OTHER),
+    ("Our audience is platform engineers", OTHER),
+    ("yes but make the blue darker", OTHER),
+    ("Yes, and add that we also serve healthcare", OTHER),
+    ("no, the company name is Acmi not Acme", OTHER),
+    ("Not quite, we prefer green over blue", OTHER),
+    ("Can you make it more playful?", OTHER),
+    ("What styles do you recommend?", OTHER),
+    ("ok?", OTHER),
+    ("is that everything you need?", OTHER),
+    ("sure, what else do you need to know?", OTHER),
+    ("Minimal, geometric, maybe a wordmark", OTHER),
+    ("We sell project management software to agencies", OTHER),
+    ("right now we use a text-only logo", OTHER),
+    ("good question, probably web and mobile", OTHER),
+    ("I don't like gradients", OTHER),
+    ("no gradients please", OTHER),
+    ("thanks, also we want it to work on dark backgrounds", OTHER),
+    ("hi, I need a logo for my bakery app", OTHER),
+    ("hello, we're a cybersecurity company called Shieldly", OTHER),
+    ("Our competitors are Datadog and Grafana", OTHER),
+    ("Bold and trustworthy", OTHER),
+    ("Deep blue with an orange accent", OTHER),
+    ("yes to the icon, no to the wordmark", OTHER),
+    ("perfect but change the font to a serif", OTHER),
+    ("no idea, what do you suggest?", OTHER),
+    ("The name is Yes Labs", OTHER),
+    ("It should scale down to a favicon", OTHER),
+    ("okay but our target audience is enterprise CTOs", OTHER),
+    ("Not sure yet", OTHER),
+    ("We want people to feel confident and in control", OTHER),
+    ("sounds good, but can we try purple?", OTHER),
+    ("correct except the industry is edtech", OTHER),
+    ("great, one more thing: avoid red", OTHER),
+    ("hmm, let me think about it", OTHER),
+]
+
+
+def route(message: str, threshold: float) -> str:
+    intent = detect_intent(message)
+    return intent.label if intent.confidence >= threshold else OTHER
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--repeat", type=int, default=200, help="Passes over the set when timing")
+    parser.add_argument("--verbose", action="store_true", help="List every misrouted sample")
+    args = parser.parse_args()
+
+    outcomes = Counter()
+    mistakes = []
+    for message, gold in SAMPLES:
+        predicted = route(message, args.threshold)
+        outcomes[(gold, predicted)] += 1
+        if predicted != gold:
+            mistakes.append((message, gold, predicted, detect_intent(message)))
+
+    local = [label for label in (CONFIRM, REJECT, SMALL_TALK)]
+    correct = sum(count for (gold, predicted), count in outcomes.items() if gold == predicted)
+    answered = sum(count for (_, predicted), count in outcomes.items() if predicted in local)
+    answered_right = sum(count for (gold, predicted), count in outcomes.items() if predicted in local and gold == predicted)
+    answerable = sum(count for (gold, _), count in outcomes.items() if gold in local)
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for message, _ in SAMPLES:
+            detect_intent(message)
+    per_call = (time.perf_counter() - started) / (args.repeat * len(SAMPLES))
+
+    print(f"{len(SAMPLES)} samples, threshold {args.threshold}")
+    print(f"accuracy:        {correct / len(SAMPLES):.1%}")
+    print(f"local precision: {answered_right / answered:.1%} ({answered_right}/{answered} answered without the LLM)")
+    print(f"local coverage:  {answered_right / answerable:.1%} of {answerable} turns that needed no LLM")
+    print(f"latency:         {per_call * 1e6:.1f}us per message")
+    print(f"\n{'gold':<12}" + "".join(f"{label:>12}" for label in (*local, OTHER)))
+    for gold in (*local, OTHER):
+        print(f"{gold:<12}" + "".join(f"{outcomes[(gold, predicted)]:>12}" for predicted in (*local, OTHER)))
+    if args.verbose or any(predicted in local for _, _, predicted, _ in mistakes):
+        print()
+        for message, gold, predicted, intent in mistakes:
+            if args.verbose or predicted in local:
+                print(f"  {message!r}: {gold} -> {predicted} ({intent.label} {intent.confidence})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""End-to-end load benchmark for the FastAPI app against local provider stand-ins.
+
+Starts benchmarks.fake_providers in a child process, points the OpenAI and
+Replicate clients at it, then drives concurrent sessions through
+GET /tech_logo, POST /chat (consultation turns plus the confirming "yes")
+and GET /jobs/{id} until each pipeline finishes. The app runs in-process
+so event-loop stalls can be measured directly.
+
+Run from backend/:
+  python -m benchmarks.load_test --sessions 50 --concurrency 20 --replicate-latency 1
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import tempfile
+import time
+from benchmarks.fake_providers import add_arguments, parse_model_latency, serve
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(values):
+    return {
+        "count": len(values),
+        "p50": percentile(values, 0.50),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+        "max": max(values) if values else None
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_port(port: int, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError(f"Fake providers did not come up on port {port}")
+
+
+class LoopMonitor:
+    """Measures how late a periodic timer fires: time the loop spent blocked"""
+
+    def __init__(self, interval: float = 0.01, threshold: float = 0.005):
+        self.interval = interval
+        self.threshold = threshold
+        self.lags = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    def report(self):
+        blocked = [lag for lag in self.lags if lag > self.threshold]
+        return {
+            "samples": len(self.lags),
+            "blocked_seconds": sum(blocked),
+            "stalls_over_threshold": len(blocked),
+            "max_lag_ms": max(self.lags) * 1000 if self.lags else 0.0,
+            "p99_lag_ms": (percentile(self.lags, 0.99) or 0.0) * 1000
+        }
+
+
+async def run_session(client, index: int, chat_turns: int, poll_interval: float, timings):
+    started = time.perf_counter()
+
+    t = time.perf_counter()
+    response = await client.get("/tech_logo")
+    timings["/tech_logo"].append(time.perf_counter() - t)
+    session_id = response.json()["session_id"]
+
+    messages = [f"We are company #{index}, a developer tools startup. Turn {turn}." for turn in range(chat_turns)]
+    messages.append("Yes, sounds good")
+    result = None
+    for message in messages:
+        t = confirmed = time.perf_counter()
+        response = await client.post("/chat", json={"session_id": session_id, "message": message})
+        timings["/chat"].append(time.perf_counter() - t)
+        result = response.json()
+
+    job = result.get("job")
+    if not job:
+        return {"status": "no_pipeline", "seconds": time.perf_counter() - started}
+
+    while True:
+        t = time.perf_counter()
+        status = (await client.get(f"/jobs/{job['job_id']}")).json()
+        timings["/jobs"].append(time.perf_counter() - t)
+        if status.get("status") not in ("queued", "running"):
+            break
+        await asyncio.sleep(poll_interval)
+
+    outcome = "completed" if status.get("current_step") == "complete" else "failed"
+    return {
+        "status": outcome,
+        "seconds": time.perf_counter() - started,
+        "after_confirm": time.perf_counter() - confirmed,
+        "error": status.get("error_message")
+    }
+
+
+async def run(args, port: int):
+    import httpx
+    import main
+    from observability.metrics import agent_node_seconds, provider_request_seconds
+
+    timings = {"/tech_logo": [], "/chat": [], "/jobs": []}
+    monitor = LoopMonitor()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(client, index):
+        async with semaphore:
+            return await run_session(client, index, args.chat_turns, args.job_poll_interval, timings)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            monitor.start()
+            started = time.perf_counter()
+            sessions = await asyncio.gather(*[bounded(client, i) for i in range(args.sessions)])
+            elapsed = time.perf_counter() - started
+            await monitor.stop()
+
+    completed = [s for s in sessions if s["status"] == "completed"]
+    requests = sum(len(v) for v in timings.values())
+    report = {
+        "config": vars(args),
+        "wall_seconds": elapsed,
+        "sessions": {
+            "total": len(sessions),
+            "completed": len(completed),
+            "failed": len(sessions) - len(completed),
+            "per_minute": len(completed) / elapsed * 60,
+            "end_to_end": summarize([s["seconds"] for s in completed]),
+            "after_confirm": summarize([s["after_confirm"] for s in completed]),
+            "errors": sorted({s.get("error") for s in sessions if s.get("error")})
+        },
+        "requests_per_second": requests / elapsed,
+        "endpoints": {name: summarize(values) for name, values in timings.items()},
+        "agents": {
+            labels["node"]: {
+                f"p{int(q * 100)}": agent_node_seconds.quantile(q, **labels) for q in (0.5, 0.95, 0.99)
+            }
+            for labels in agent_node_seconds.labelsets()
+        },
+        "providers": {
+            f"{labels['provider']}:{labels['operation']}": {
+                f"p{int(q * 100)}": provider_request_seconds.quantile(q, **labels) for q in (0.5, 0.95, 0.99)
+            }
+            for labels in provider_request_seconds.labelsets()
+        },
+        "event_loop": monitor.report()
+    }
+    return report
+
+
+def print_report(report):
+    def fmt(value):
+        return "-" if value is None else f"{value * 1000:8.1f}ms"
+
+    sessions = report["sessions"]
+    print(f"\nsessions: {sessions['completed']}/{sessions['total']} completed in {report['wall_seconds']:.1f}s "
+          f"({sessions['per_minute']:.1f}/min, {report['requests_per_second']:.1f} req/s)")
+    for error in sessions["errors"]:
+        print(f"  error: {error}")
+
+    print(f"\n{'latency':<22}{'p50':>10}{'p95':>10}{'p99':>10}")
+    rows = [("session end-to-end", sessions["end_to_end"]), ("confirm to package", sessions["after_confirm"])]
+    rows += [(f"GET/POST {name}", stats) for name, stats in report["endpoints"].items()]
+    rows += [(f"agent {node}", stats) for node, stats in report["agents"].items()]
+    rows += [(name, stats) for name, stats in report["providers"].items()]
+    for name, stats in rows:
+        print(f"{name:<22}{fmt(stats.get('p50')):>10}{fmt(stats.get('p95')):>10}{fmt(stats.get('p99')):>10}")
+
+    loop = report["event_loop"]
+    print(f"\nevent loop: blocked {loop['blocked_seconds'] * 1000:.1f}ms total over "
+          f"{loop['stalls_over_threshold']} stalls, max lag {loop['max_lag_ms']:.1f}ms, p99 {loop['p99_lag_ms']:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--chat-turns", type=int, default=2)
+    parser.add_argument("--pipeline-workers", type=int, default=4)
+    parser.add_argument("--poll-interval", type=float, default=0.2, help="Replicate poll interval")
+    parser.add_argument("--job-poll-interval", type=float, default=0.1)
+    parser.add_argument("--cache", action="store_true", help="Leave the LLM response and image caches on")
+    parser.add_argument("--no-speculation", action="store_true", help="Do not pre-compute the brief behind a recap")
+    parser.add_argument("--json", help="Also write the report to this file")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    port = free_port()
+    fakes = multiprocessing.Process(
+        target=serve,
+        args=(port, args.chat_latency, args.image_latency, args.replicate_latency,
+              args.jitter, args.failure_rate, args.seed, args.token_delay, args.throttle_rate, args.blank_rate,
+              parse_model_latency(args.model_latency)),
+        daemon=True
+    )
+    fakes.start()
+
+    # Must be set before the app (and its provider registry) is imported
+    os.environ.update({
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{port}/v1",
+        "REPLICATE_API_TOKEN": "bench",
+        "REPLICATE_BASE_URL": f"http://127.0.0.1:{port}/v1/predictions",
+        "REPLICATE_POLL_INTERVAL": str(args.poll_interval),
+        "PIPELINE_WORKERS": str(args.pipeline_workers),
+        "PIPELINE_QUEUE_SIZE": str(max(100, args.sessions)),
+        "SESSION_STORE": os.getenv("SESSION_STORE", "memory"),
+        "SESSION_DB_PATH": os.getenv("SESSION_DB_PATH") or os.path.join(tempfile.mkdtemp(prefix="bench-sessions-"), "sessions.db"),
+        "ASSET_DIR": os.getenv("ASSET_DIR") or tempfile.mkdtemp(prefix="bench-assets-"),
+        "PACKAGE_DIR": os.getenv("PACKAGE_DIR") or tempfile.mkdtemp(prefix="bench-packages-"),
+        "GENERATION_LEDGER_PATH": os.getenv("GENERATION_LEDGER_PATH") or os.path.join(tempfile.mkdtemp(prefix="bench-ledger-"), "generations.jsonl"),
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING")
+    })
+    if not args.cache:
+        os.environ["LLM_CACHE"] = "0"
+        os.environ["IMAGE_CACHE"] = "0"
+    if args.no_speculation:
+        os.environ["SPECULATIVE_BRIEF"] = "0"
+
+    try:
+        asyncio.run(wait_for_port(port))
+        report = asyncio.run(run(args, port))
+    finally:
+        fakes.terminate()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Chat turn latency and LLM spend with models pinned per node vs. routed by SLO and session budget.
+
+Runs --sessions concurrent consultations of --turns chat turns each
+against benchmarks.fake_providers. There, the primary chat model
+(gpt-4) answers in --primary-latency seconds and the fallback
+(gpt-4o-mini) in --fallback-latency. Every message carries new
+information, so each turn reaches the model. The passes are:
+  - pinned: MODEL_ROUTING=0, every call goes to gpt-4
+  - slo:    falls back once gpt-4's p95 goes over --chat-budget
+  - budget: also caps each session at --token-budget tokens
+Routing decisions are read back from each session's routing_log.
+
+Run from backend/:  python -m benchmarks.model_routing --sessions 20 --turns 8
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import Counter
+from benchmarks.fake_providers import serve
+from benchmarks.load_test import free_port, percentile, wait_for_port
+
+MESSAGES = (
+    "We're Acme {n}, a monitoring platform for platform engineers",
+    "Our audience is SRE teams at mid-size SaaS companies",
+    "We want to feel bold and trustworthy, but approachable",
+    "Minimal and geometric, maybe a monogram",
+    "Deep blue with a bright orange accent",
+    "It has to work as a favicon and on dark backgrounds",
+    "Our competitors are Datadog and Grafana",
+    "We differentiate on zero-config tracing",
+)
+
+PASSES = {
+    "pinned": {"MODEL_ROUTING": "0"},
+    "slo": {"MODEL_ROUTING": "1"},
+    "budget": {"MODEL_ROUTING": "1"},
+}
+
+
+async def run_pass(args, name: str):
+    from agents.tech_logo.workflow import LogoDesignOrchestrator
+
+    os.environ.update(PASSES[name])
+    os.environ["SESSION_TOKEN_BUDGET"] = str(args.token_budget) if name == "budget" else "0"
+    orchestrator = LogoDesignOrchestrator()
+    turn_seconds = []
+
+    async def consult(index: int):
+        session_id = f"{name}-{index}"
+        await orchestrator.start_session(session_id)
+        for turn in range(args.turns):
+            message = MESSAGES[turn % len(MESSAGES)].format(n=index)
+            started = time.perf_counter()
+            await orchestrator.process_user_message(session_id, message)
+            turn_seconds.append(time.perf_counter() - started)
+        return await orchestrator.session_store.get(session_id)
+
+    started = time.perf_counter()
+    states = await asyncio.gather(*(consult(i) for i in range(args.sessions)))
+    wall = time.perf_counter() - started
+    await orchestrator.close()
+
+    routes = Counter(
+        (entry["model"], entry["reason"]) for state in states for entry in state.get("routing_log") or []
+    )
+    return {
+        "pass": name,
+        "turns": len(turn_seconds),
+        "turn_p50": percentile(turn_seconds, 0.5),
+        "turn_p95": percentile(turn_seconds, 0.95),
+        "wall_seconds": wall,
+        "tokens": sum(state["llm_usage"]["tokens"] for state in states),
+        "cost_usd": sum(state["llm_usage"]["cost_usd"] for state in states),
+        "routes": {f"{model}/{reason}": count for (model, reason), count in sorted(routes.items())}
+    }
+
+
+async def run(args):
+    from llms.clients import provider_clients
+
+    rows = [await run_pass(args, name) for name in args.passes]
+    await provider_clients.aclose()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--primary-latency", type=float, default=1.5)
+    parser.add_argument("--fallback-latency", type=float, default=0.3)
+    parser.add_argument("--chat-budget", type=float, default=1.0, help="p95 budget of the chat node in seconds")
+    parser.add_argument("--token-budget", type=int, default=1500, help="Tokens per session in the budget pass")
+    parser.add_argument("--passes", nargs="+", default=list(PASSES), choices=list(PASSES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    port = free_port()
+    model_latency = {"gpt-4": args.primary_latency, "gpt-4o-mini": args.fallback_latency}
+    fakes = multiprocessing.Process(
+        target=serve,
+        args=(port, args.primary_latency, 0.2, 0.3, 0.2, 0.0, args.seed, 0.0, 0.0, 0.0, model_latency),
+        daemon=True
+    )
+    fakes.start()
+
+    os.environ.update({
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{port}/v1",
+        # Measure the models, not the client-side rate limiter
+        "OPENAI_RPS": "1000",
+        "SESSION_STORE": "memory",
+        "LLM_CACHE": "0",
+        "SPECULATIVE_BRIEF": "0",
+        "MODEL_ROUTES": json.dumps({"chat": {"p95_budget": args.chat_budget}}),
+        "MODEL_SLO_MIN_SAMPLES": "10",
+        "ASSET_DIR": os.getenv("ASSET_DIR") or tempfile.mkdtemp(prefix="bench-assets-"),
+        "PACKAGE_DIR": os.getenv("PACKAGE_DIR") or tempfile.mkdtemp(prefix="bench-packages-"),
+        "GENERATION_LEDGER_PATH": os.getenv("GENERATION_LEDGER_PATH") or os.path.join(tempfile.mkdtemp(prefix="bench-ledger-"), "generations.jsonl"),
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING")
+    })
+
+    try:
+        asyncio.run(wait_for_port(port))
+        rows = asyncio.run(run(args))
+    finally:
+        fakes.terminate()
+
+    print(f"\n{args.sessions} sessions x {args.turns} turns, gpt-4 {args.primary_latency}s, gpt-4o-mini {args.fallback_latency}s, "
+          f"chat p95 budget {args.chat_budget}s")
+    print(f"{'pass':<8}{'turn p50':>10}{'p95':>8}{'wall':>8}{'tokens':>9}{'cost':>10}  routes")
+    for row in rows:
+        routes = ", ".join(f"{route} {count}" for route, count in row["routes"].items())
+        print(
+            f"{row['pass']:<8}{row['turn_p50']:>9.2f}s{row['turn_p95']:>7.2f}s{row['wall_seconds']:>7.1f}s"
+            f"{row['tokens']:>9}{row['cost_usd']:>9.3f}$  {routes}"
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Time the final-package build and measure peak memory while streaming the ZIP.
+
+Builds --packages packages from one generated logo (--concurrency at a
+time), then streams each package's ZIP to nowhere. Peak RSS is reported
+for this process and, separately, for the process-pool workers.
+
+Run from backend/:  python -m benchmarks.package_build --packages 20 --size 1024
+"""
+import argparse
+import asyncio
+import io
+import resource
+import statistics
+import tempfile
+import time
+import zipfile
+from agents.tech_logo.assets import AssetStore
+from agents.tech_logo.packaging import PackageBuilder
+from benchmarks.fake_providers import logo_png
+
+
+def peak_rss_mib(who: int) -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+DETAILS = {
+    "company_name": "Acme Observability",
+    "color_palette": {"primary": "#0B3D91", "secondary": "#FFFFFF", "accent": "#FFB000"},
+    "brand_guidelines": {"spacing": "Minimum clear space requirements"},
+    "usage_guidelines": ["Always maintain minimum clear space around logo"]
+}
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--packages", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--size", type=int, default=1024, help="Source logo size in pixels")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = AssetStore(root=f"{tmp}/assets", workers=args.workers)
+        builder = PackageBuilder(store, root=f"{tmp}/packages")
+        asset = await store.add(logo_png("bench", args.size))
+        logo = {"concept_id": 1, "asset_digest": asset["digest"], "image_url": asset["primary"]}
+
+        rss_before = peak_rss_mib(resource.RUSAGE_SELF)
+        semaphore = asyncio.Semaphore(args.concurrency)
+        build_seconds = []
+
+        async def build(index: int):
+            async with semaphore:
+                started = time.perf_counter()
+                await builder.build(f"logo_package_bench_{index}", logo, DETAILS)
+                build_seconds.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[build(i) for i in range(args.packages)])
+        wall = time.perf_counter() - started
+
+        zip_seconds, zip_bytes, largest_chunk = [], 0, 0
+        for index in range(args.packages):
+            started = time.perf_counter()
+            for chunk in builder.iter_zip(f"logo_package_bench_{index}"):
+                zip_bytes += len(chunk)
+                largest_chunk = max(largest_chunk, len(chunk))
+            zip_seconds.append(time.perf_counter() - started)
+
+        # Sanity check: the streamed archive is a valid ZIP
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(builder.iter_zip("logo_package_bench_0"))))
+        files = archive.namelist()
+        assert archive.testzip() is None
+
+        store.shutdown(wait=True)
+
+    print(f"source        {args.size}px, {args.packages} packages, concurrency {args.concurrency}, workers {args.workers}")
+    print(f"build         p50 {statistics.median(build_seconds) * 1000:7.1f}ms  "
+          f"max {max(build_seconds) * 1000:7.1f}ms  {args.packages / wall:.1f} packages/s")
+    print(f"zip stream    p50 {statistics.median(zip_seconds) * 1000:7.1f}ms  "
+          f"avg size {zip_bytes / args.packages / 1024:.0f} KiB  largest chunk {largest_chunk / 1024:.0f} KiB")
+    print(f"files         {len(files)}: {', '.join(name.split('/', 1)[1] for name in files)}")
+    print(f"peak RSS      main {peak_rss_mib(resource.RUSAGE_SELF):.0f} MiB (was {rss_before:.0f} before builds), "
+          f"pool workers {peak_rss_mib(resource.RUSAGE_CHILDREN):.0f} MiB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
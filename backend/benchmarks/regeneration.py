@@ -0,0 +1,128 @@
+"""Prediction count and wall time per accepted logo, for different best-of-N settings.
+
+Runs --briefs structured briefs (no chat) against benchmarks.fake_providers.
+There, --blank-rate of the generated images are an empty canvas that the
+local ranking pre-filter rejects. A rejected concept is regenerated on its
+own, at most max_attempts times. Each --num-outputs value is a separate pass.
+
+Run from backend/:
+  python -m benchmarks.regeneration --briefs 12 --blank-rate 0.4 --num-outputs 1 2 4
+"""
+import argparse
+import asyncio
+import copy
+import multiprocessing
+import os
+import tempfile
+import time
+from benchmarks.fake_providers import CLIENT_REQUIREMENTS, serve
+from benchmarks.load_test import free_port, percentile, wait_for_port
+
+
+async def fake_stats(port: int):
+    import httpx
+    async with httpx.AsyncClient() as client:
+        return (await client.get(f"http://127.0.0.1:{port}/_stats")).json()
+
+
+async def run_pass(args, port: int, num_outputs: int):
+    from agents.tech_logo.workflow import LogoDesignOrchestrator
+
+    os.environ["IMAGE_NUM_OUTPUTS"] = str(num_outputs)
+    orchestrator = LogoDesignOrchestrator()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def run_one(index: int):
+        requirements = copy.deepcopy(CLIENT_REQUIREMENTS)
+        requirements["company_details"]["name"] = f"Acme {index}"
+        async with semaphore:
+            started = time.perf_counter()
+            state = await orchestrator.run_brief(f"regen-{num_outputs}-{index}", requirements)
+            return state, time.perf_counter() - started
+
+    before = await fake_stats(port)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(run_one(i) for i in range(args.briefs)))
+    wall = time.perf_counter() - started
+    after = await fake_stats(port)
+    await orchestrator.close()
+
+    accepted = sum(
+        1 for state, _ in results
+        for assessment in (state.get("ranking_results") or {}).get("assessments") or []
+        if assessment.get("passed")
+    )
+    concepts = sum(len(state.get("design_concepts") or []) for state, _ in results)
+    predictions = after["predictions"] - before["predictions"]
+    seconds = [elapsed for _, elapsed in results]
+    return {
+        "num_outputs": num_outputs,
+        "predictions": predictions,
+        "images": predictions * num_outputs,
+        "accepted": accepted,
+        "concepts": concepts,
+        "predictions_per_accepted": predictions / accepted if accepted else None,
+        "brief_p50": percentile(seconds, 0.5),
+        "brief_p95": percentile(seconds, 0.95),
+        "wall_seconds": wall
+    }
+
+
+async def run(args, port: int):
+    from llms.clients import provider_clients
+
+    rows = [await run_pass(args, port, n) for n in args.num_outputs]
+    await provider_clients.aclose()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--briefs", type=int, default=12)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--blank-rate", type=float, default=0.4, help="Share of generated images that are blank")
+    parser.add_argument("--num-outputs", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--replicate-latency", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    port = free_port()
+    fakes = multiprocessing.Process(
+        target=serve,
+        args=(port, 0.1, 0.2, args.replicate_latency, 0.2, 0.0, args.seed, 0.0, 0.0, args.blank_rate),
+        daemon=True
+    )
+    fakes.start()
+
+    os.environ.update({
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{port}/v1",
+        "REPLICATE_API_TOKEN": "bench",
+        "REPLICATE_BASE_URL": f"http://127.0.0.1:{port}/v1/predictions",
+        "REPLICATE_POLL_INTERVAL": "0.05",
+        "LLM_CACHE": "0",
+        "IMAGE_CACHE": "0",
+        "ASSET_DIR": os.getenv("ASSET_DIR") or tempfile.mkdtemp(prefix="bench-assets-"),
+        "PACKAGE_DIR": os.getenv("PACKAGE_DIR") or tempfile.mkdtemp(prefix="bench-packages-"),
+        "GENERATION_LEDGER_PATH": os.getenv("GENERATION_LEDGER_PATH") or os.path.join(tempfile.mkdtemp(prefix="bench-ledger-"), "generations.jsonl"),
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING")
+    })
+
+    try:
+        asyncio.run(wait_for_port(port))
+        rows = asyncio.run(run(args, port))
+    finally:
+        fakes.terminate()
+
+    print(f"\n{args.briefs} briefs, {args.blank_rate:.0%} blank images")
+    print(f"{'outputs':>8}{'predictions':>13}{'images':>8}{'accepted':>10}{'pred/accepted':>15}{'brief p50':>11}{'p95':>8}")
+    for row in rows:
+        per = "-" if row["predictions_per_accepted"] is None else f"{row['predictions_per_accepted']:.2f}"
+        print(
+            f"{row['num_outputs']:>8}{row['predictions']:>13}{row['images']:>8}"
+            f"{row['accepted']:>6}/{row['concepts']:<3}{per:>15}{row['brief_p50']:>10.2f}s{row['brief_p95']:>7.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Persistence cost and memory of long sessions: whole-state SQLite rows vs. the event log.
+
+Drives --sessions sessions through --turns chat turns each. A turn is a
+get, a user and assistant message appended to the history, updated token
+counts, and a set. Halfway through, every session also gets design
+concepts, logos and a ranking, as a finished pipeline would leave them.
+The report shows bytes written and set latency for early and late turns,
+plus heap per session once every session has been written. The event
+store runs twice: with a view cached for every session, and with only
+--view-cache views cached, so the rest are rebuilt from disk each turn.
+
+Run from backend/:  python -m benchmarks.session_events --sessions 200 --turns 200
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from agents.tech_logo.session_store import (
+    EventSourcedSessionStore,
+    InMemorySessionStore,
+    SQLiteSessionStore,
+    session_write_bytes
+)
+from agents.tech_logo.workflow import LogoDesignOrchestrator
+from benchmarks.fake_providers import CLIENT_REQUIREMENTS, design_concepts
+from benchmarks.load_test import percentile
+
+
+def pipeline_result(index: int):
+    concepts = design_concepts()["concepts"]
+    return {
+        "client_requirements": CLIENT_REQUIREMENTS,
+        "chat_summary": f"Brief for session {index}",
+        "design_concepts": concepts,
+        "generated_logos": [
+            {
+                "concept_id": c["concept_id"],
+                "concept_name": c["name"],
+                "image_url": f"/assets/{index:064x}.png",
+                "variations": {v: f"/assets/{index:064x}-{v}.png" for v in ("horizontal", "icon", "favicon")},
+                "generation_metadata": {"prompt_used": c["midjourney_prompt"], "model": "replicate:logo-diffusion"}
+            }
+            for c in concepts
+        ],
+        "ranking_results": {"overall_quality": "pass", "best_concept_id": 1, "assessments": []},
+        "current_step": "user_review"
+    }
+
+
+async def run_turn(store, session_id: str, index: int, turn: int, halfway: int):
+    state = await store.get(session_id)
+    user = f"Turn {turn} of session {index}: a few more words about what we want from the logo."
+    state["user_input"] = user
+    state["conversation_history"].append({"role": "user", "content": user})
+    state["conversation_history"].append({"role": "assistant", "content": f"Noted, thanks. {user} " * 3})
+    state["history_token_counts"] = state["history_token_counts"] + [24, 70]
+    if turn == halfway:
+        state.update(pipeline_result(index))
+    await store.set(session_id, state)
+
+
+async def bench(label: str, store, backend: str, args):
+    ids = [f"session-{i}" for i in range(args.sessions)]
+    for session_id in ids:
+        await store.set(session_id, LogoDesignOrchestrator.new_state())
+
+    tracemalloc.start()
+    window = max(1, args.turns // 10)
+    early, late = [], []
+    early_bytes = late_bytes = 0.0
+    for turn in range(args.turns):
+        written = sum(session_write_bytes.value(backend=backend, kind=k) for k in ("state", "event", "snapshot"))
+        for index, session_id in enumerate(ids):
+            started = time.perf_counter()
+            await run_turn(store, session_id, index, turn, args.turns // 2)
+            elapsed = (time.perf_counter() - started) * 1e6
+            if turn < window:
+                early.append(elapsed)
+            elif turn >= args.turns - window:
+                late.append(elapsed)
+        delta = sum(session_write_bytes.value(backend=backend, kind=k) for k in ("state", "event", "snapshot")) - written
+        if turn < window:
+            early_bytes += delta
+        elif turn >= args.turns - window:
+            late_bytes += delta
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    turns = args.sessions * window
+    size = os.path.getsize(store.path) + os.path.getsize(store.path + "-wal") if hasattr(store, "path") else 0
+    print(
+        f"{label:<10} bytes/turn early {early_bytes / turns:>8.0f}  late {late_bytes / turns:>8.0f}  "
+        f"turn p50 early {percentile(early, 0.5):>7.0f}us  late {percentile(late, 0.5):>7.0f}us  "
+        f"heap/session {current / args.sessions / 1024:>7.1f} KiB"
+        + (f"  disk {size / 2**20:.1f} MiB" if size else "")
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--snapshot-every", type=int, default=50)
+    parser.add_argument("--view-cache", type=int, default=20, help="Materialized views the event store keeps")
+    args = parser.parse_args()
+
+    print(f"{args.sessions} sessions x {args.turns} turns")
+    await bench("memory", InMemorySessionStore(max_sessions=args.sessions), "memory", args)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteSessionStore(path=os.path.join(tmp, "sessions.db"))
+        await bench("sqlite", store, "sqlite", args)
+        await store.close()
+
+        for label, cache_size in (("events", args.sessions), (f"events/{args.view_cache}", args.view_cache)):
+            store = EventSourcedSessionStore(
+                path=os.path.join(tmp, f"{cache_size}.db"), snapshot_every=args.snapshot_every, cache_size=cache_size
+            )
+            await bench(label, store, "events", args)
+            await store.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
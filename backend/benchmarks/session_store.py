@@ -0,0 +1,83 @@
+"""Memory usage and lookup latency of the session store backends at 100k sessions.
+
+Run from backend/:  python -m benchmarks.session_store [--sessions 100000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from agents.tech_logo.session_store import InMemorySessionStore, SQLiteSessionStore
+
+
+def make_state(index: int):
+    """A mid-consultation session: a few turns of history, no concepts yet"""
+    return {
+        "user_input": "",
+        "conversation_history": [
+            {"role": "assistant" if turn % 2 else "user", "content": f"turn {turn} of session {index} " * 8}
+            for turn in range(6)
+        ],
+        "user_feedback": None,
+        "iteration_count": 0,
+        "chat_summary": None,
+        "design_concepts": None,
+        "generated_logos": None,
+        "ranking_results": None,
+        "final_package": None,
+        "generation_attempts": 0,
+        "current_step": "chat",
+        "needs_regeneration": False,
+        "user_approved": False,
+        "error_message": None,
+        "client_requirements": None,
+        "max_attempts": 3
+    }
+
+
+async def bench(label, store, sessions: int, lookups: int):
+    ids = [f"session-{i}" for i in range(sessions)]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i, session_id in enumerate(ids):
+        await store.set(session_id, make_state(i))
+    fill_seconds = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = []
+    for session_id in random.choices(ids, k=lookups):
+        t = time.perf_counter()
+        await store.get(session_id)
+        latencies.append((time.perf_counter() - t) * 1e6)
+    latencies.sort()
+
+    print(
+        f"{label:<8} fill {sessions / fill_seconds:>9.0f} sets/s  "
+        f"heap {current / 2**20:>7.1f} MiB  "
+        f"get p50 {statistics.median(latencies):>7.1f}us  "
+        f"p99 {latencies[int(len(latencies) * 0.99)]:>7.1f}us"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    args = parser.parse_args()
+
+    await bench("memory", InMemorySessionStore(max_sessions=args.sessions), args.sessions, args.lookups)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteSessionStore(path=os.path.join(tmp, "sessions.db"))
+        await bench("sqlite", store, args.sessions, args.lookups)
+        print(f"sqlite   file {os.path.getsize(store.path) / 2**20:.1f} MiB")
+        await store.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+"""Cold-start profile: import cost per package and time until the app serves.
+
+Runs `python -X importtime -c "import main"` and totals the self time of
+each top-level package. Then starts a fresh process that imports the app,
+enters its lifespan and requests `/` and `/tech_logo`. Times are measured
+from the moment that process was launched, as is the moment `/ready`
+first answers 200. While the warm-up runs, a LoopMonitor records how long
+the event loop was blocked. The run exits non-zero if either request is
+served later than --budget seconds.
+
+Run from backend/:  python -m benchmarks.startup --budget 1.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+# Modules that should only load on first use or during warm-up
+HEAVY = ("langgraph", "langchain_core", "langchain_openai", "openai", "aiohttp", "httpx", "numpy", "PIL", "tiktoken")
+
+
+def child_env() -> dict:
+    return {
+        **os.environ,
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "bench"),
+        "SESSION_STORE": "memory",
+        "ASSET_DIR": os.getenv("ASSET_DIR") or tempfile.mkdtemp(prefix="bench-assets-"),
+        "PACKAGE_DIR": os.getenv("PACKAGE_DIR") or tempfile.mkdtemp(prefix="bench-packages-"),
+        "GENERATION_LEDGER_PATH": os.getenv("GENERATION_LEDGER_PATH") or os.path.join(tempfile.mkdtemp(prefix="bench-ledger-"), "generations.jsonl"),
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING")
+    }
+
+
+def import_profile(top: int):
+    """(package, self seconds) for the heaviest packages imported by `import main`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True, text=True, env=child_env(), check=True
+    )
+    totals = defaultdict(int)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        totals[name.strip().split(".")[0]] += int(self_us)
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    return [(name, micros / 1e6) for name, micros in ranked[:top]], sum(totals.values()) / 1e6
+
+
+async def serve_once(launched: float, warm_up: bool):
+    """Child side: import the app, enter its lifespan and time the first requests"""
+    marks = {}
+    import main
+    marks["import"] = time.time() - launched
+    marks["heavy_after_import"] = [m for m in HEAVY if m in sys.modules]
+    import httpx
+    from benchmarks.load_test import LoopMonitor
+
+    transport = httpx.ASGITransport(app=main.app)
+    monitor = LoopMonitor()
+    async with main.app.router.lifespan_context(main.app):
+        monitor.start()
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for path in ("/", "/tech_logo"):
+                response = await client.get(path)
+                response.raise_for_status()
+                marks[path] = time.time() - launched
+            if warm_up and main.app.state.warm_up is not None:
+                while (await client.get("/ready")).status_code != 200:
+                    await asyncio.sleep(0.01)
+                marks["ready"] = time.time() - launched
+                await main.app.state.warm_up
+                marks["warm_up"] = time.time() - launched
+        await monitor.stop()
+    marks["loop"] = monitor.report()
+    print(json.dumps(marks))
+
+
+def measure(warm_up: bool) -> dict:
+    env = child_env()
+    env["WARMUP"] = "1" if warm_up else "0"
+    launched = time.time()
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child", str(launched)] + (["--warm-up"] if warm_up else []),
+        capture_output=True, text=True, env=env, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=float, default=1.5, help="Seconds from launch to serving / and /tech_logo")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--child", type=float, help=argparse.SUPPRESS)
+    parser.add_argument("--warm-up", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        asyncio.run(serve_once(args.child, args.warm_up))
+        return
+
+    packages, total = import_profile(args.top)
+    print(f"\nimport main: {total * 1000:.0f}ms of module execution")
+    print(f"{'package':<24}{'self':>10}")
+    for name, seconds in packages:
+        print(f"{name:<24}{seconds * 1000:8.1f}ms")
+
+    runs = [measure(warm_up=True) for _ in range(args.runs)]
+    print(f"\n{'since launch (median of ' + str(args.runs) + ')':<32}{'seconds':>10}")
+    for mark in ("import", "/", "/tech_logo", "ready", "warm_up"):
+        values = sorted(run[mark] for run in runs if mark in run)
+        if values:
+            print(f"{mark:<32}{values[len(values) // 2]:10.3f}")
+    lags = sorted(run["loop"]["max_lag_ms"] for run in runs)
+    p99s = sorted(run["loop"]["p99_lag_ms"] for run in runs)
+    print(f"loop lag until warm-up finished: max {lags[len(runs) // 2]:.1f}ms, p99 {p99s[len(runs) // 2]:.1f}ms")
+    heavy = sorted({m for run in runs for m in run["heavy_after_import"]})
+    print(f"\nheavy modules loaded by import main: {', '.join(heavy) or 'none'}")
+
+    served = sorted(max(run["/"], run["/tech_logo"]) for run in runs)[len(runs) // 2]
+    verdict = "within" if served <= args.budget else "OVER"
+    print(f"served in {served:.3f}s, {verdict} the {args.budget:.2f}s budget")
+    if served > args.budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Requests per second and bytes on the wire for `/` and `/static`: the old setup vs. the in-memory bundle.
+
+"disk" rebuilds the previous handlers: `/` reads and decodes
+static/index.html per request, and `/static` is Starlette's StaticFiles.
+"bundle" is the app's StaticBundle. Each path is requested in three
+ways. A first visit sends `Accept-Encoding: gzip, deflate, br`, a gzip
+visit a client without brotli (`gzip, deflate`), and a repeat visit also
+sends back the ETag from the first response. The encoding column is the
+variant that was served. Requests go in-process through
+httpx.ASGITransport, so rps is the serving overhead alone.
+
+Run from backend/:  python -m benchmarks.static_serving --requests 2000
+"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse
+from fastapi.staticfiles import StaticFiles
+from web.static import StaticBundle
+
+BROWSER = {"accept-encoding": "gzip, deflate, br"}
+NO_BROTLI = {"accept-encoding": "gzip, deflate"}
+
+
+def disk_app() -> FastAPI:
+    app = FastAPI()
+    app.mount("/static", StaticFiles(directory="static"), name="static")
+
+    @app.get("/", response_class=HTMLResponse)
+    async def serve_index():
+        return HTMLResponse(content=Path("static/index.html").read_text(encoding="utf-8"))
+    return app
+
+
+def bundle_app() -> FastAPI:
+    app = FastAPI()
+    bundle = StaticBundle("static")
+    app.mount("/static", bundle, name="static")
+
+    @app.get("/", response_class=HTMLResponse)
+    async def serve_index(request: Request):
+        return bundle.response("index.html", request)
+    return app
+
+
+def wire_bytes(response: httpx.Response) -> int:
+    status_line = len(f"HTTP/1.1 {response.status_code} {response.reason_phrase}\r\n")
+    headers = sum(len(k) + len(v) + 4 for k, v in response.headers.raw) + 2
+    return status_line + headers + response.num_bytes_downloaded
+
+
+async def measure(client: httpx.AsyncClient, path: str, headers, requests: int):
+    total = 0
+    response = None
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(path, headers=headers)
+        total += wire_bytes(response)
+    elapsed = time.perf_counter() - started
+    encoding = response.headers.get("content-encoding", "identity") if response.status_code == 200 else "-"
+    return requests / elapsed, total / requests, response.status_code, encoding
+
+
+async def run(args):
+    print(f"{'setup':<8}{'path':<20}{'visit':<8}{'status':>7}{'encoding':>10}{'req/s':>10}{'bytes/req':>11}")
+    for label, app in (("disk", disk_app()), ("bundle", bundle_app())):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for path in ("/", "/static/index.html"):
+                etag = (await client.get(path, headers=BROWSER)).headers.get("etag")
+                visits = [("first", BROWSER), ("gzip", NO_BROTLI)]
+                visits.append(("repeat", {**BROWSER, "if-none-match": etag}) if etag else ("repeat", BROWSER))
+                for visit, headers in visits:
+                    rps, size, status, encoding = await measure(client, path, headers, args.requests)
+                    print(f"{label:<8}{path:<20}{visit:<8}{status:>7}{encoding:>10}{rps:>10.0f}{size:>11.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per path and visit type")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, Iterable, Tuple, TYPE_CHECKING
+
+# langchain_core is imported when the first chat client is built, not at app import
+if TYPE_CHECKING:
+    from langchain_core.caches import RETURN_VAL_TYPE
+
+# Name of the agent node making the current LLM call; set by the orchestrator
+_scope: ContextVar[Optional[str]] = ContextVar("llm_cache_scope", default=None)
+
+
+@contextmanager
+def cache_scope(name: str):
+    """Attribute LLM calls made inside this block to agent `name`"""
+    token = _scope.set(name)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def current_scope() -> Optional[str]:
+    return _scope.get()
+
+
+def _dumps(generations: "RETURN_VAL_TYPE") -> str:
+    from langchain_core.messages import message_to_dict
+
+    return json.dumps([message_to_dict(g.message) for g in generations])
+
+
+def _loads(value: str) -> "RETURN_VAL_TYPE":
+    from langchain_core.messages import messages_from_dict
+    from langchain_core.outputs import ChatGeneration
+
+    messages = messages_from_dict(json.loads(value))
+    for message in messages:
+        # A cache hit spends no tokens; don't let replayed usage reach the metrics
+        if getattr(message, "usage_metadata", None) is not None:
+            message.usage_metadata = None
+    # Marked so the metrics callback can leave replayed answers out of the latency figures
+    return [ChatGeneration(message=m, generation_info={"cache_hit": True}) for m in messages]
+
+
+def is_cache_hit(response) -> bool:
+    """Whether an LLMResult was replayed from the response cache"""
+    return any(
+        (generation.generation_info or {}).get("cache_hit")
+        for generations in response.generations for generation in generations
+    )
+
+
+class _DiskTier:
+    """SQLite-backed second tier, evicting least recently read entries past max_bytes"""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses(accessed_at)")
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return row[0] if row else None
+
+    def put(self, key: str, value: str):
+        size = len(value)
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time())
+            )
+            self._size += size - (previous[0] if previous else 0)
+            while self._size > self.max_bytes:
+                row = self._conn.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed_at LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+                self._size -= row[1]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._size = 0
+
+
+class ResponseCache:
+    """Two-tier LLM response cache: in-memory LRU in front of an optional on-disk tier.
+
+    Plugged into the registry's temperature-0 ChatOpenAI clients as their
+    `cache` (see `langchain_cache`); sampled calls (the designer's concepts)
+    are never replayed.
+    Entries are keyed on the model/parameter string and the normalized
+    messages LangChain passes in. Only calls made under a `cache_scope`
+    listed in `enabled_agents` are cached.
+    """
+
+    def __init__(
+        self,
+        enabled_agents: Iterable[str] = ("summary", "feedback"),
+        max_memory_bytes: int = 32 * 2**20,
+        disk_path: Optional[str] = None,
+        max_disk_bytes: int = 512 * 2**20
+    ):
+        self.enabled_agents = set(enabled_agents)
+        self.max_memory_bytes = max_memory_bytes
+        # key -> (serialized generations, size); least recently used first
+        self._memory: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._memory_size = 0
+        self._disk = _DiskTier(disk_path, max_disk_bytes) if disk_path else None
+        self.counters: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        )
+
+    def enabled_for(self, agent: Optional[str]) -> bool:
+        return agent in self.enabled_agents
+
+    def set_enabled(self, agent: str, enabled: bool = True):
+        if enabled:
+            self.enabled_agents.add(agent)
+        else:
+            self.enabled_agents.discard(agent)
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        self._memory.move_to_end(key)
+        return entry[0]
+
+    def _memory_put(self, key: str, value: str):
+        size = len(value)
+        if size > self.max_memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= previous[1]
+        self._memory[key] = (value, size)
+        self._memory_size += size
+        while self._memory_size > self.max_memory_bytes:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_size -= evicted_size
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional["RETURN_VAL_TYPE"]:
+        agent = current_scope()
+        if not self.enabled_for(agent):
+            return None
+        key = self._key(prompt, llm_string)
+
+        value = self._memory_get(key)
+        if value is not None:
+            self.counters[agent]["memory_hits"] += 1
+            return _loads(value)
+
+        if self._disk is not None:
+            value = self._disk.get(key)
+            if value is not None:
+                self.counters[agent]["disk_hits"] += 1
+                self._memory_put(key, value)
+                return _loads(value)
+
+        self.counters[agent]["misses"] += 1
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: "RETURN_VAL_TYPE") -> None:
+        if not self.enabled_for(current_scope()):
+            return
+        key = self._key(prompt, llm_string)
+        value = _dumps(return_val)
+        self._memory_put(key, value)
+        if self._disk is not None:
+            self._disk.put(key, value)
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional["RETURN_VAL_TYPE"]:
+        # Memory hits and disabled scopes stay on the loop; only disk reads go to a thread
+        agent = current_scope()
+        if not self.enabled_for(agent):
+            return None
+        key = self._key(prompt, llm_string)
+        value = self._memory_get(key)
+        if value is not None:
+            self.counters[agent]["memory_hits"] += 1
+            return _loads(value)
+        if self._disk is None:
+            self.counters[agent]["misses"] += 1
+            return None
+        return await asyncio.to_thread(self.lookup, prompt, llm_string)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: "RETURN_VAL_TYPE") -> None:
+        if self._disk is None:
+            self.update(prompt, llm_string, return_val)
+        else:
+            await asyncio.to_thread(self.update, prompt, llm_string, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        self._memory.clear()
+        self._memory_size = 0
+        if self._disk is not None:
+            self._disk.clear()
+
+    def metric_samples(self):
+        """(name, type, help, labels, value) samples for the /metrics registry"""
+        for agent, counts in list(self.counters.items()):
+            for result, value in counts.items():
+                yield (
+                    "llm_cache_lookups_total", "counter", "LLM response cache lookups by agent and outcome",
+                    {"agent": agent, "result": result}, value
+                )
+        yield ("llm_cache_memory_bytes", "gauge", "Bytes held by the in-memory cache tier", {}, self._memory_size)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled_agents": sorted(self.enabled_agents),
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_size,
+            "disk_bytes": self._disk._size if self._disk else None,
+            "agents": {agent: dict(counts) for agent, counts in self.counters.items()}
+        }
+
+
+def create_response_cache() -> Optional[ResponseCache]:
+    """Build the cache from LLM_CACHE* settings; LLM_CACHE=0 turns it off"""
+    if os.getenv("LLM_CACHE", "1") == "0":
+        return None
+    agents = os.getenv("LLM_CACHE_AGENTS", "summary,feedback")
+    return ResponseCache(
+        enabled_agents=[a.strip() for a in agents.split(",") if a.strip()],
+        max_memory_bytes=int(os.getenv("LLM_CACHE_MEMORY_BYTES", str(32 * 2**20))),
+        disk_path=os.getenv("LLM_CACHE_PATH") or None,
+        max_disk_bytes=int(os.getenv("LLM_CACHE_DISK_BYTES", str(512 * 2**20)))
+    )
+
+
+response_cache = create_response_cache()
+
+
+def langchain_cache() -> Optional[ResponseCache]:
+    """`response_cache`, registered as a LangChain BaseCache so ChatOpenAI accepts it"""
+    from langchain_core.caches import BaseCache
+
+    BaseCache.register(ResponseCache)
+    return response_cache
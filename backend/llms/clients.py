@@ -0,0 +1,138 @@
+import os
+from typing import Dict, Any, Optional, Tuple, TYPE_CHECKING
+
+# The client libraries (and langchain_core with them) are imported when a client is first built, not at app import
+if TYPE_CHECKING:
+    import aiohttp
+    import httpx
+    from langchain_openai import ChatOpenAI
+
+
+class ProviderClients:
+    """Process-wide registry of pooled, keep-alive clients shared by all providers"""
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_connections_per_host: int = 20,
+        keepalive_timeout: float = 30.0,
+        timeout: float = 120.0
+    ):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        # Lets the OpenAI traffic be pointed at a proxy or a local stand-in
+        self.openai_base_url = os.getenv("OPENAI_BASE_URL") or None
+
+        self._aiohttp_session: Optional["aiohttp.ClientSession"] = None
+        self._httpx_client: Optional["httpx.AsyncClient"] = None
+        self._openai_clients: Dict[str, Any] = {}
+        self._chat_clients: Dict[Tuple[str, str, float], "ChatOpenAI"] = {}
+
+    def http_session(self) -> "aiohttp.ClientSession":
+        """Shared aiohttp session (Replicate) with a bounded per-host pool"""
+        if self._aiohttp_session is None or self._aiohttp_session.closed:
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self._aiohttp_session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._aiohttp_session
+
+    def httpx_client(self) -> "httpx.AsyncClient":
+        """Shared httpx pool used underneath the OpenAI SDK and ChatOpenAI.
+
+        Every request goes through the "openai" limiter, which owns rate
+        limiting and retries for chat, image and vision calls alike.
+        """
+        if self._httpx_client is None or self._httpx_client.is_closed:
+            import httpx
+            from llms.scheduler import ScheduledTransport, scheduler
+
+            # All OpenAI traffic goes to a single host, so the pool size is the per-host limit
+            transport = httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections_per_host,
+                    max_keepalive_connections=self.max_connections_per_host,
+                    keepalive_expiry=self.keepalive_timeout
+                )
+            )
+            self._httpx_client = httpx.AsyncClient(
+                transport=ScheduledTransport(transport, scheduler["openai"]),
+                timeout=self.timeout
+            )
+        return self._httpx_client
+
+    def openai_client(self, api_key: Optional[str]):
+        """Shared AsyncOpenAI client per API key"""
+        import openai
+
+        key = api_key or ""
+        client = self._openai_clients.get(key)
+        if client is None:
+            client = openai.AsyncOpenAI(
+                api_key=api_key,
+                base_url=self.openai_base_url,
+                http_client=self.httpx_client(),
+                max_retries=0
+            )
+            self._openai_clients[key] = client
+        return client
+
+    def chat_client(self, api_key: Optional[str], model: str, temperature: float = 0.7) -> "ChatOpenAI":
+        """Shared ChatOpenAI per (key, model, temperature), all on one connection pool.
+
+        Only temperature-0 clients get the response cache: a sampled answer
+        is meant to differ between calls, so replaying it would be wrong.
+        """
+        key = (api_key or "", model, temperature)
+        client = self._chat_clients.get(key)
+        if client is None:
+            from langchain_openai import ChatOpenAI
+            from llms.cache import langchain_cache
+            from observability.callbacks import LLMMetricsCallback
+
+            client = ChatOpenAI(
+                openai_api_key=api_key,
+                openai_api_base=self.openai_base_url,
+                model=model,
+                temperature=temperature,
+                http_async_client=self.httpx_client(),
+                cache=langchain_cache() if temperature == 0 else False,
+                callbacks=[LLMMetricsCallback(model)],
+                stream_usage=True,
+                max_retries=0
+            )
+            self._chat_clients[key] = client
+        return client
+
+    def warm_up(self):
+        """Build the shared pools now; must run on the event loop"""
+        self.http_session()
+        self.httpx_client()
+
+    async def aclose(self):
+        """Close every pooled connection; clients are rebuilt lazily on next use"""
+        if self._aiohttp_session is not None and not self._aiohttp_session.closed:
+            await self._aiohttp_session.close()
+        if self._httpx_client is not None and not self._httpx_client.is_closed:
+            await self._httpx_client.aclose()
+
+        self._aiohttp_session = None
+        self._httpx_client = None
+        self._openai_clients.clear()
+        self._chat_clients.clear()
+
+
+provider_clients = ProviderClients(
+    max_connections=int(os.getenv("PROVIDER_MAX_CONNECTIONS", "100")),
+    max_connections_per_host=int(os.getenv("PROVIDER_MAX_CONNECTIONS_PER_HOST", "20"))
+)
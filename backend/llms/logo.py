@@ -1,15 +1,36 @@
 import asyncio
 import aiohttp
+import contextlib
 import os
+import time
+from datetime import datetime
 from typing import List, Dict, Any, Optional
+from llms.clients import provider_clients
+from llms.scheduler import RETRY_STATUSES, RetryableError, parse_retry_after, scheduler
+from observability.metrics import (
+    provider_request_seconds,
+    provider_errors,
+    replicate_queue_seconds,
+    replicate_run_seconds
+)
 
 
 class ReplicateProvider:
     """Replicate-based image generation provider using logo-diffusion"""
 
-    def __init__(self, api_token: Optional[str] = None):
+    def __init__(
+        self,
+        api_token: Optional[str] = None,
+        base_url: Optional[str] = None,
+        poll_interval: Optional[float] = None,
+        timeout: float = 300.0,
+        cancel_timeout: float = 2.0
+    ):
         self.api_token = api_token or os.getenv("REPLICATE_API_TOKEN")
-        self.base_url = "https://api.replicate.com/v1/predictions"
+        self.base_url = base_url or os.getenv("REPLICATE_BASE_URL", "https://api.replicate.com/v1/predictions")
+        self.poll_interval = poll_interval or float(os.getenv("REPLICATE_POLL_INTERVAL", "5"))
+        self.timeout = timeout
+        self.cancel_timeout = cancel_timeout
         self.model_version = "fofr/logo-diffusion"  # You can switch to any other model
 
     async def generate_text(self, messages: List[Dict[str, str]], **kwargs) -> str:
@@ -18,6 +39,32 @@ class ReplicateProvider:
 
     async def generate_image(self, prompt: str, **kwargs) -> Dict[str, Any]:
         """Trigger image generation on Replicate"""
+        started = time.perf_counter()
+        try:
+            result = await self._predict(prompt, **kwargs)
+        except Exception:
+            provider_errors.inc(provider="replicate", operation="image", model=self.model_version)
+            raise
+        provider_request_seconds.observe(
+            time.perf_counter() - started, provider="replicate", operation="image", model=self.model_version
+        )
+        return result
+
+    def _record_timings(self, prediction: Dict[str, Any]):
+        """Split a finished prediction into queue time and run time"""
+        try:
+            created = datetime.fromisoformat(prediction["created_at"].replace("Z", "+00:00"))
+            started = datetime.fromisoformat(prediction["started_at"].replace("Z", "+00:00"))
+            completed = datetime.fromisoformat(prediction["completed_at"].replace("Z", "+00:00"))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return
+        replicate_queue_seconds.observe((started - created).total_seconds(), model=self.model_version)
+        run_seconds = (prediction.get("metrics") or {}).get("predict_time")
+        if run_seconds is None:
+            run_seconds = (completed - started).total_seconds()
+        replicate_run_seconds.observe(run_seconds, model=self.model_version)
+
+    async def _predict(self, prompt: str, **kwargs) -> Dict[str, Any]:
         headers = {
             "Authorization": f"Token {self.api_token}",
             "Content-Type": "application/json"
@@ -33,22 +80,37 @@ class ReplicateProvider:
             }
         }
 
-        async with aiohttp.ClientSession() as session:
-            # Submit prediction
-            async with session.post(self.base_url, headers=headers, json=payload) as resp:
+        session = provider_clients.http_session()
+        limiter = scheduler["replicate"]
+        poller = scheduler["replicate_poll"]
+
+        async def submit() -> Dict[str, Any]:
+            async with _retryable_errors(idempotent=False), session.post(self.base_url, headers=headers, json=payload) as resp:
+                _raise_for_retry(resp)
                 if resp.status != 201:
                     raise Exception(f"Failed to start prediction: {await resp.text()}")
-                result = await resp.json()
-                prediction_id = result["id"]
+                return await resp.json()
+
+        async def poll() -> Dict[str, Any]:
+            async with _retryable_errors(), session.get(poll_url, headers=headers) as poll_resp:
+                _raise_for_retry(poll_resp)
+                return await poll_resp.json()
+
+        # One in-flight slot per prediction, held from submission until it settles
+        async with limiter.in_flight:
+            result = await limiter.call(submit)
+            prediction_id = result["id"]
 
             # Poll for result
             poll_url = f"{self.base_url}/{prediction_id}"
-            for _ in range(60):  # Poll for up to 5 minutes
-                async with session.get(poll_url, headers=headers) as poll_resp:
-                    poll_data = await poll_resp.json()
+            try:
+                for _ in range(max(1, int(self.timeout / self.poll_interval))):
+                    poll_data = await poller.call(poll)
 
                     if poll_data["status"] == "succeeded":
+                        self._record_timings(poll_data)
                         return {
+                            "image_url": poll_data["output"][0],
                             "image_urls": poll_data["output"],
                             "model": "replicate:logo-diffusion",
                             "prompt": prompt
@@ -56,6 +118,42 @@ class ReplicateProvider:
                     elif poll_data["status"] == "failed":
                         raise Exception(f"Generation failed: {poll_data.get('error', 'Unknown error')}")
 
-                await asyncio.sleep(5)
+                    await asyncio.sleep(self.poll_interval)
+            except asyncio.CancelledError:
+                # E.g. the losing side of a hedge: the prediction would otherwise run, and bill, to the end
+                await self._cancel(prediction_id, headers)
+                raise
+
+        raise Exception("Image generation timed out after polling")
+
+    async def _cancel(self, prediction_id: str, headers: Dict[str, str]):
+        """Best-effort: stop a prediction nobody will read, so it stops billing"""
+        session = provider_clients.http_session()
+        try:
+            async with session.post(
+                f"{self.base_url}/{prediction_id}/cancel",
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=self.cancel_timeout)
+            ) as resp:
+                await resp.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+
+
+def _raise_for_retry(resp: aiohttp.ClientResponse):
+    if resp.status in RETRY_STATUSES:
+        raise RetryableError(f"HTTP {resp.status}", status=resp.status, retry_after=parse_retry_after(resp.headers))
+
+
+@contextlib.asynccontextmanager
+async def _retryable_errors(idempotent: bool = True):
+    """Treat dropped connections and timeouts as retryable.
 
-            raise Exception("Image generation timed out after polling")
\ No newline at end of file
+    A non-idempotent request is only retried if it never reached the
+    server, so a retry cannot start a second prediction.
+    """
+    retryable = (aiohttp.ClientConnectionError, asyncio.TimeoutError) if idempotent else aiohttp.ClientConnectorError
+    try:
+        yield
+    except retryable as e:
+        raise RetryableError(f"{type(e).__name__}: {e}") from e
@@ -3,6 +3,8 @@ from langchain_openai import ChatOpenAI
 import os
 from typing import TypedDict, List, Dict, Any, Optional, Protocol
 from langchain_core.messages import HumanMessage, SystemMessage
+from llms.clients import provider_clients
+from observability.metrics import provider_request_seconds, provider_errors
 
 class OpenAIProvider:
     """OpenAI LLM Provider"""
@@ -10,14 +12,14 @@ class OpenAIProvider:
     def __init__(self, api_key: str = None, model: str = "gpt-4"):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.model = model
-        self.client = ChatOpenAI(
-            openai_api_key=self.api_key,
-            model=self.model,
-            temperature=0.7
-        )
+
+    @property
+    def client(self) -> ChatOpenAI:
+        """Pooled ChatOpenAI client from the shared registry"""
+        return provider_clients.chat_client(self.api_key, self.model)
         
-    async def generate_text(self, messages: List[Dict[str, str]], **kwargs) -> str:
-        """Generate text using OpenAI"""
+    async def generate_text(self, messages: List[Dict[str, str]], callbacks: Optional[list] = None, **kwargs) -> str:
+        """Generate text using OpenAI; extra kwargs (e.g. stream, response_format) go to the API call"""
         formatted_messages = []
         for msg in messages:
             if msg["role"] == "system":
@@ -25,22 +27,26 @@ class OpenAIProvider:
             elif msg["role"] == "user":
                 formatted_messages.append(HumanMessage(content=msg["content"]))
         
-        response = self.client.invoke(formatted_messages)
+        config = {"callbacks": callbacks} if callbacks else None
+        response = await self.client.ainvoke(formatted_messages, config=config, **kwargs)
         return response.content
     
     async def generate_image(self, prompt: str, **kwargs) -> Dict[str, Any]:
         """Generate image using DALL-E 3"""
-        import openai
-        
-        client = openai.OpenAI(api_key=self.api_key)
+        client = provider_clients.openai_client(self.api_key)
         
-        response = client.images.generate(
-            model="dall-e-3",
-            prompt=prompt,
-            size=kwargs.get("size", "1024x1024"),
-            quality=kwargs.get("quality", "hd"),
-            n=1,
-        )
+        try:
+            with provider_request_seconds.time(provider="openai", operation="image", model="dall-e-3"):
+                response = await client.images.generate(
+                    model="dall-e-3",
+                    prompt=prompt,
+                    size=kwargs.get("size", "1024x1024"),
+                    quality=kwargs.get("quality", "hd"),
+                    n=1,
+                )
+        except Exception:
+            provider_errors.inc(provider="openai", operation="image", model="dall-e-3")
+            raise
         
         return {
             "image_url": response.data[0].url,
@@ -50,10 +56,7 @@ class OpenAIProvider:
     
     async def analyze_image(self, image_url: str, prompt: str, **kwargs) -> str:
         """Analyze image using GPT-4 Vision"""
-        vision_client = ChatOpenAI(
-            openai_api_key=self.api_key,
-            model="gpt-4-vision-preview"
-        )
+        vision_client = provider_clients.chat_client(self.api_key, "gpt-4-vision-preview")
         
         messages = [
             HumanMessage(content=[
@@ -62,5 +65,5 @@ class OpenAIProvider:
             ])
         ]
         
-        response = vision_client.invoke(messages)
+        response = await vision_client.ainvoke(messages)
         return response.content
\ No newline at end of file
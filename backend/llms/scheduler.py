@@ -0,0 +1,277 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, Callable, Awaitable, TypeVar
+import httpx
+from observability.metrics import provider_request_seconds, provider_retries, provider_hedges
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+class RetryableError(Exception):
+    """A provider answer worth retrying (rate limited, overloaded or unreachable)"""
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(headers) -> Optional[float]:
+    """Seconds to wait from retry-after-ms or Retry-After (delta-seconds or HTTP date)"""
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Requests-per-second limiter; callers reserve a token and sleep until it is theirs"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        now = time.monotonic()
+        self._refill(now)
+        # Reserving before sleeping keeps waiters in arrival order
+        self._tokens -= 1
+        wait = max(-self._tokens / self.rate if self._tokens < 0 else 0.0, self._paused_until - now)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold every caller back, e.g. for a 429's Retry-After"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class ProviderLimiter:
+    """Rate, concurrency and retry policy for one provider endpoint"""
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: Optional[float] = None,
+        max_in_flight: int = 32,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0
+    ):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst or max(1.0, rate))
+        self.in_flight = asyncio.Semaphore(max_in_flight)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than the server asked for"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn` under the rate limit, retrying RetryableError with backoff"""
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            try:
+                return await fn()
+            except RetryableError as e:
+                if attempt == self.max_retries:
+                    raise
+                if e.status == 429 and e.retry_after:
+                    self.bucket.pause(e.retry_after)
+                delay = self.backoff(attempt, e.retry_after)
+                provider_retries.inc(provider=self.name, reason=str(e.status or "connection"))
+                logger.info("%s: %s, retry %d in %.2fs", self.name, e, attempt + 1, delay)
+                await asyncio.sleep(delay)
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that frees the in-flight slot once it has been read or closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class ScheduledTransport(httpx.AsyncBaseTransport):
+    """httpx transport that puts every request through a ProviderLimiter.
+
+    The in-flight slot is held until the response body is closed, so a
+    streamed completion counts for as long as it is streaming.
+    """
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, limiter: ProviderLimiter):
+        self.inner = inner
+        self.limiter = limiter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        async def send() -> httpx.Response:
+            await self.limiter.in_flight.acquire()
+            released = False
+
+            def release():
+                nonlocal released
+                if not released:
+                    released = True
+                    self.limiter.in_flight.release()
+
+            try:
+                response = await self.inner.handle_async_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadTimeout, httpx.RemoteProtocolError) as e:
+                release()
+                raise RetryableError(f"{type(e).__name__}: {e}") from e
+            except BaseException:
+                release()
+                raise
+
+            if response.status_code in RETRY_STATUSES:
+                await response.aclose()
+                release()
+                raise RetryableError(
+                    f"HTTP {response.status_code}",
+                    status=response.status_code,
+                    retry_after=parse_retry_after(response.headers)
+                )
+            return httpx.Response(
+                status_code=response.status_code,
+                headers=response.headers,
+                stream=_ReleasingStream(response.stream, release),
+                extensions=response.extensions
+            )
+
+        try:
+            return await self.limiter.call(send)
+        except RetryableError as e:
+            if e.status is None:
+                raise httpx.ConnectError(str(e), request=request) from e
+            # Out of retries: hand the SDK a plain error response to raise its usual exception
+            return httpx.Response(e.status, headers={"retry-after": str(e.retry_after or 0)}, request=request)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+class ProviderScheduler:
+    """Shared limiters for every provider, looked up by name"""
+
+    def __init__(self, limiters: Dict[str, ProviderLimiter]):
+        self.limiters = limiters
+
+    def __getitem__(self, name: str) -> ProviderLimiter:
+        return self.limiters[name]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {"available_slots": limiter.in_flight._value, "tokens": round(limiter.bucket._tokens, 2)}
+            for name, limiter in self.limiters.items()
+        }
+
+
+def create_provider_scheduler() -> ProviderScheduler:
+    """Limits from env; defaults sit under OpenAI tier-1 and Replicate's published limits"""
+    retries = int(os.getenv("PROVIDER_MAX_RETRIES", "4"))
+    base = float(os.getenv("PROVIDER_BACKOFF_BASE", "0.5"))
+    cap = float(os.getenv("PROVIDER_BACKOFF_MAX", "30"))
+
+    def limiter(name: str, rate: str, in_flight: str) -> ProviderLimiter:
+        prefix = name.upper()
+        return ProviderLimiter(
+            name,
+            rate=float(os.getenv(f"{prefix}_RPS", rate)),
+            burst=float(os.getenv(f"{prefix}_BURST", "0")) or None,
+            max_in_flight=int(os.getenv(f"{prefix}_MAX_IN_FLIGHT", in_flight)),
+            max_retries=retries,
+            backoff_base=base,
+            backoff_max=cap
+        )
+
+    return ProviderScheduler({
+        "openai": limiter("openai", "8", "32"),
+        # Predictions: creation is limited to 600/min, in-flight bounds concurrent predictions
+        "replicate": limiter("replicate", "10", "16"),
+        "replicate_poll": limiter("replicate_poll", "50", "64")
+    })
+
+
+scheduler = create_provider_scheduler()
+
+
+def hedge_delay(provider: str, operation: str, model: str) -> Optional[float]:
+    """How long to wait on `provider` before hedging, or None when hedging is off (IMAGE_HEDGE=1 enables it).
+
+    The delay is the IMAGE_HEDGE_PERCENTILE latency observed so far, or
+    IMAGE_HEDGE_DEFAULT_DELAY until IMAGE_HEDGE_MIN_SAMPLES calls have finished.
+    """
+    if os.getenv("IMAGE_HEDGE", "0") != "1":
+        return None
+    default = float(os.getenv("IMAGE_HEDGE_DEFAULT_DELAY", "60"))
+    labels = {"provider": provider, "operation": operation, "model": model}
+    if provider_request_seconds.count(**labels) < int(os.getenv("IMAGE_HEDGE_MIN_SAMPLES", "20")):
+        return default
+    return provider_request_seconds.quantile(float(os.getenv("IMAGE_HEDGE_PERCENTILE", "0.95")), **labels) or default
+
+
+async def hedge(primary: Callable[[], Awaitable[T]], backup: Callable[[], Awaitable[T]], delay: float) -> T:
+    """Run `primary`; if it is still pending after `delay` (or fails), race `backup` and cancel the loser"""
+    first = asyncio.ensure_future(primary())
+    done, _ = await asyncio.wait({first}, timeout=delay)
+    if done and not first.exception():
+        return first.result()
+
+    provider_hedges.inc(outcome="started")
+    second = asyncio.ensure_future(backup())
+    pending = {second} if done else {first, second}
+    error: Optional[BaseException] = first.exception() if done else None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    provider_hedges.inc(outcome="backup_won" if task is second else "primary_won")
+                    return task.result()
+                error = error or task.exception()
+        raise error
+    finally:
+        for task in (first, second):
+            if not task.done():
+                task.cancel()
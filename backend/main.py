@@ -1,29 +1,76 @@
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import HTMLResponse, StreamingResponse, PlainTextResponse, FileResponse, Response
 from pydantic import BaseModel
-from pathlib import Path
+from contextlib import asynccontextmanager
+import asyncio
 import uuid
 import os
+import logging
 from agents.tech_logo.workflow import LogoDesignOrchestrator
+from llms.clients import provider_clients
+from agents.tech_logo.events import format_sse
+from llms.cache import response_cache
+from observability.metrics import registry
+from web.static import StaticBundle, etag_matches
 import dotenv
 dotenv.load_dotenv()
-app = FastAPI()
+
+# LOG_LEVEL=WARNING keeps per-step logging off the hot path
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger("main")
+
+
+async def warm_up():
+    """Load the agents and graph, start the image workers and open the provider pools"""
+    try:
+        await orchestrator.warm_up()
+        provider_clients.warm_up()
+    except Exception:
+        # Whatever did not warm up is built by the first request that needs it
+        logger.warning("Warm-up failed", exc_info=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs behind the first requests instead of delaying them; WARMUP=0 leaves it all lazy
+    warming = asyncio.create_task(warm_up()) if os.getenv("WARMUP", "1") != "0" else None
+    app.state.warm_up = warming
+    yield
+    if warming is not None and not warming.done():
+        warming.cancel()
+        await asyncio.gather(warming, return_exceptions=True)
+    # Stop the work that still uses the stores and provider clients before closing them:
+    # a cancelled pipeline job writes its session back on the way out
+    await orchestrator.jobs.shutdown()
+    await orchestrator.close()
+    await orchestrator.session_store.close()
+    # Drain the shared provider connection pools last
+    await provider_clients.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 orchestrator = LogoDesignOrchestrator()
 
+registry.add_collector(orchestrator.jobs.metric_samples)
+if response_cache is not None:
+    registry.add_collector(response_cache.metric_samples)
+
 # -------------------------
 # Serve Frontend Static HTML
 # -------------------------
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Loaded and precompressed once; answered from memory with ETags
+static_files = StaticBundle("static")
+app.mount("/static", static_files, name="static")
 
-print("--------------------------------------------------")
-print(os.getenv("OPENAI_API_KEY"))
-print("--------------------------------------------------")
+if not os.getenv("OPENAI_API_KEY"):
+    logger.warning("OPENAI_API_KEY is not set")
 
 @app.get("/", response_class=HTMLResponse)
-async def serve_index():
-    html_path = Path("static/index.html")
-    return HTMLResponse(content=html_path.read_text(encoding="utf-8"))
+async def serve_index(request: Request):
+    return static_files.response("index.html", request)
 
 # -------------------------
 # Session Start Endpoint
@@ -31,7 +78,7 @@ async def serve_index():
 @app.get("/tech_logo")
 async def start_session():
     session_id = str(uuid.uuid4())
-    result = orchestrator.start_session(session_id)
+    result = await orchestrator.start_session(session_id)
     return {
         "session_id": session_id,
         "message": result["message"]
@@ -50,4 +97,85 @@ async def chat(request: ChatRequest):
         session_id=request.session_id,
         user_message=request.message
     )
-    return result
\ No newline at end of file
+    return result
+
+# -------------------------
+# Streaming Message Endpoint (SSE)
+# -------------------------
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    async def event_stream():
+        async for event in orchestrator.stream_user_message(
+            session_id=request.session_id,
+            user_message=request.message
+        ):
+            yield format_sse(event)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# -------------------------
+# Pipeline Job Endpoints
+# -------------------------
+@app.get("/jobs/stats")
+async def job_stats():
+    return orchestrator.jobs.stats()
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    status = await orchestrator.get_job(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return status
+
+# -------------------------
+# Generated Logo Assets
+# -------------------------
+@app.get("/assets/{name}")
+async def asset(name: str, request: Request):
+    path = orchestrator.asset_store.path_for(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    orchestrator.asset_store.touch(name)
+    # Names are content hashes, so a given URL never changes
+    headers = {"Cache-Control": "public, max-age=31536000, immutable", "ETag": f'"{name}"'}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, headers=headers)
+
+# -------------------------
+# Final Package Download
+# -------------------------
+@app.get("/packages/{package_id}.zip")
+async def package_download(package_id: str):
+    builder = orchestrator.package_builder
+    if builder.directory_for(package_id) is None:
+        raise HTTPException(status_code=404, detail="Package not found")
+    # Sync generator: Starlette iterates it in a worker thread, so zipping stays off the loop
+    return StreamingResponse(
+        builder.iter_zip(package_id),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{package_id}.zip"'}
+    )
+
+# -------------------------
+# Prometheus Metrics
+# -------------------------
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+# -------------------------
+# Readiness
+# -------------------------
+@app.get("/ready")
+async def ready():
+    # Warm-up imports langchain_openai, whose class setup holds the GIL for ~100ms at a time;
+    # a load balancer that waits for this keeps traffic off the instance until that is over
+    warming = app.state.warm_up
+    if warming is not None and not warming.done():
+        raise HTTPException(status_code=503, detail="Warming up")
+    return {"status": "ready"}
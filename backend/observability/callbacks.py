@@ -0,0 +1,57 @@
+import time
+from typing import Dict, Any
+from langchain_core.callbacks import BaseCallbackHandler
+from llms.cache import current_scope, is_cache_hit
+from observability.metrics import provider_request_seconds, provider_errors, llm_tokens, current_usage
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """Records latency, token usage and errors of every ChatOpenAI call"""
+
+    # Run synchronously in the caller instead of hopping to an executor
+    run_inline = True
+
+    def __init__(self, model: str):
+        self.model = model
+        self._started: Dict[Any, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        started = self._started.pop(run_id, None)
+        cached = is_cache_hit(response)
+        # A replayed answer says nothing about the provider's latency
+        if started is not None and not cached:
+            provider_request_seconds.observe(
+                time.perf_counter() - started, provider="openai", operation="chat", model=self.model
+            )
+
+        agent = current_scope() or "none"
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = usage.get("prompt_tokens")
+        completion_tokens = usage.get("completion_tokens")
+        if prompt_tokens is None:
+            # Streaming responses carry usage on the message instead
+            for generations in response.generations:
+                for generation in generations:
+                    metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    prompt_tokens = (prompt_tokens or 0) + metadata.get("input_tokens", 0)
+                    completion_tokens = (completion_tokens or 0) + metadata.get("output_tokens", 0)
+        if prompt_tokens:
+            llm_tokens.inc(prompt_tokens, model=self.model, agent=agent, kind="prompt")
+        if completion_tokens:
+            llm_tokens.inc(completion_tokens, model=self.model, agent=agent, kind="completion")
+        tracked = current_usage()
+        if tracked is not None:
+            tracked["calls"] += 1
+            tracked["cached"] += cached
+            tracked["prompt"] += prompt_tokens or 0
+            tracked["completion"] += completion_tokens or 0
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._started.pop(run_id, None)
+        provider_errors.inc(provider="openai", operation="chat", model=self.model)
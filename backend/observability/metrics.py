@@ -0,0 +1,207 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Tuple, Callable, Iterable, Optional
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value: Any) -> str:
+    """A label value as the text exposition format needs it: backslash, quote and newline escaped"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with labels, rendered in Prometheus text format"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: Any):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        """Current total for these labels"""
+        return self._values.get(tuple(str(labels.get(n, "")) for n in self.labelnames), 0)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in self._values.items()]
+
+
+class Histogram:
+    """Fixed-bucket histogram with labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (per-bucket counts incl. +Inf, sum, count)
+        self._values: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels: Any):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: Any) -> int:
+        """Number of observations recorded for these labels"""
+        entry = self._values.get(tuple(str(labels.get(n, "")) for n in self.labelnames))
+        return entry[2] if entry else 0
+
+    def quantile(self, q: float, **labels: Any) -> Optional[float]:
+        """Estimate the q-th quantile by interpolating within buckets, like histogram_quantile()"""
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        entry = self._values.get(key)
+        if entry is None or entry[2] == 0:
+            return None
+        target = q * entry[2]
+        running = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, entry[0]):
+            if count and running + count >= target:
+                return lower + (bound - lower) * (target - running) / count
+            running += count
+            lower = bound
+        # Past the last finite bucket there is nothing to interpolate against
+        return self.buckets[-1]
+
+    def labelsets(self) -> List[Dict[str, str]]:
+        return [dict(zip(self.labelnames, key)) for key in list(self._values)]
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in self._values.items():
+            running = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                running += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labelnames, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {running}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    """Holds metrics plus collectors that produce gauge samples at scrape time"""
+
+    def __init__(self):
+        self._metrics: List[Any] = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Dict[str, Any], float]]]] = []
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, Dict[str, Any], float]]]):
+        """collector() yields (name, type, help, labels, value) tuples"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+
+        declared = set()
+        for collector in self._collectors:
+            for name, kind, help, labels, value in collector():
+                if name not in declared:
+                    lines.append(f"# HELP {name} {help}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    declared.add(name)
+                names = tuple(labels)
+                lines.append(f"{name}{_format_labels(names, tuple(labels[n] for n in names))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+agent_node_seconds = registry.histogram(
+    "agent_node_seconds", "Wall time of each agent node", ["node"]
+)
+agent_node_errors = registry.counter(
+    "agent_node_errors_total", "Agent nodes that raised or reported an error", ["node"]
+)
+provider_request_seconds = registry.histogram(
+    "provider_request_seconds", "Latency of provider API calls", ["provider", "operation", "model"]
+)
+provider_errors = registry.counter(
+    "provider_errors_total", "Failed provider API calls", ["provider", "operation", "model"]
+)
+llm_tokens = registry.counter(
+    "llm_tokens_total", "Tokens sent to and received from the LLM", ["model", "agent", "kind"]
+)
+provider_retries = registry.counter(
+    "provider_retries_total", "Provider calls retried after a rate limit or transient failure", ["provider", "reason"]
+)
+provider_hedges = registry.counter(
+    "provider_hedges_total", "Hedged image generations by outcome", ["outcome"]
+)
+replicate_queue_seconds = registry.histogram(
+    "replicate_queue_seconds", "Time a Replicate prediction waited before starting", ["model"]
+)
+replicate_run_seconds = registry.histogram(
+    "replicate_run_seconds", "Time a Replicate prediction spent running", ["model"]
+)
+
+# Call counts and token totals of the LLM calls made inside the innermost track_usage() block
+_usage: ContextVar[Optional[Dict[str, int]]] = ContextVar("llm_usage", default=None)
+
+
+@contextmanager
+def track_usage():
+    """Collect call counts and prompt and completion tokens of the LLM calls made inside this block"""
+    usage = {"calls": 0, "cached": 0, "prompt": 0, "completion": 0}
+    token = _usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage.reset(token)
+
+
+def current_usage() -> Optional[Dict[str, int]]:
+    """The totals of the innermost track_usage() block, or None outside one"""
+    return _usage.get()
@@ -0,0 +1,93 @@
+"""The app runs in-process against benchmarks.fake_providers, started once per test session.
+
+All tests share one event loop: the app's provider pools, locks and job
+engine are bound to the loop they were first used on.
+
+Run from backend/:  python -m pytest
+"""
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import httpx
+import pytest
+from benchmarks.fake_providers import serve
+from benchmarks.load_test import free_port, wait_for_port
+
+# Fake chat completion latency in seconds, without jitter
+CHAT_LATENCY = 0.5
+REPLICATE_LATENCY = 0.3
+
+PORT = free_port()
+
+# Must be set before the app (and its provider registry) is imported
+os.environ.update({
+    "OPENAI_API_KEY": "test",
+    "OPENAI_BASE_URL": f"http://127.0.0.1:{PORT}/v1",
+    # Measure the app, not the client-side rate limiter
+    "OPENAI_RPS": "1000",
+    "REPLICATE_API_TOKEN": "test",
+    "REPLICATE_BASE_URL": f"http://127.0.0.1:{PORT}/v1/predictions",
+    "REPLICATE_POLL_INTERVAL": "0.05",
+    "SESSION_STORE": "memory",
+    "LLM_CACHE": "0",
+    "IMAGE_CACHE": "0",
+    "WARMUP": "0",
+    "ASSET_DIR": tempfile.mkdtemp(prefix="test-assets-"),
+    "PACKAGE_DIR": tempfile.mkdtemp(prefix="test-packages-"),
+    "GENERATION_LEDGER_PATH": os.path.join(tempfile.mkdtemp(prefix="test-ledger-"), "generations.jsonl"),
+    "LOG_LEVEL": "WARNING"
+})
+
+
+@pytest.fixture(scope="session")
+def loop():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    pending = asyncio.all_tasks(loop)
+    for task in pending:
+        task.cancel()
+    loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+    loop.run_until_complete(loop.shutdown_asyncgens())
+    asyncio.set_event_loop(None)
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def fake_providers(loop):
+    process = multiprocessing.Process(
+        target=serve, args=(PORT, CHAT_LATENCY, 0.1, REPLICATE_LATENCY, 0.0, 0.0, 0), daemon=True
+    )
+    process.start()
+    loop.run_until_complete(wait_for_port(PORT))
+    yield PORT
+    process.terminate()
+    process.join()
+
+
+@pytest.fixture(scope="session")
+def app(loop, fake_providers):
+    """The `main` module with its lifespan entered"""
+    import main
+
+    lifespan = main.app.router.lifespan_context(main.app)
+    loop.run_until_complete(lifespan.__aenter__())
+    yield main
+    loop.run_until_complete(lifespan.__aexit__(None, None, None))
+
+
+@pytest.fixture
+def client(loop, app):
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app.app), base_url="http://test", timeout=None)
+    yield client
+    loop.run_until_complete(client.aclose())
+
+
+@pytest.fixture
+def provider_stats(fake_providers):
+    """Coroutine function returning the fake providers' request counts"""
+    async def stats() -> dict:
+        async with httpx.AsyncClient() as client:
+            return (await client.get(f"http://127.0.0.1:{fake_providers}/_stats")).json()
+    return stats
@@ -0,0 +1,33 @@
+import asyncio
+import time
+
+CONCURRENT_TURNS = 10
+MESSAGE = "We build deployment tooling for platform teams at mid-size companies"
+
+
+async def new_session(client) -> str:
+    return (await client.get("/tech_logo")).json()["session_id"]
+
+
+async def timed_turn(client, session_id: str) -> float:
+    started = time.perf_counter()
+    response = await client.post("/chat", json={"session_id": session_id, "message": MESSAGE})
+    assert response.status_code == 200
+    assert response.json()["conversation"][-1]["role"] == "assistant"
+    return time.perf_counter() - started
+
+
+def test_concurrent_chat_turns_take_about_one_turn(loop, client):
+    """N sessions chatting at once finish in about the time of one turn, not N turns"""
+    async def scenario():
+        sessions = [await new_session(client) for _ in range(CONCURRENT_TURNS + 2)]
+        # The first turn also opens the pools and loads the tokenizer
+        await timed_turn(client, sessions[0])
+        single = await timed_turn(client, sessions[1])
+        started = time.perf_counter()
+        await asyncio.gather(*(timed_turn(client, session_id) for session_id in sessions[2:]))
+        return single, time.perf_counter() - started
+
+    single, wall = loop.run_until_complete(scenario())
+    # Serialized, the batch would take CONCURRENT_TURNS times as long
+    assert wall < 2 * single, f"{CONCURRENT_TURNS} concurrent turns took {wall:.2f}s, one turn {single:.2f}s"
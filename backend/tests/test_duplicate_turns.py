@@ -0,0 +1,66 @@
+import asyncio
+import random
+from agents.tech_logo.turns import session_turns
+
+SESSIONS = 5
+DISTINCT = 3
+# Copies of the confirming message: the first COALESCED at the same instant, the rest spread over STAGGER seconds
+DUPLICATES = 6
+COALESCED = 3
+STAGGER = 0.5
+CONFIRM = "Yes, sounds good"
+
+
+async def run_session(client, index: int, rng: random.Random):
+    session_id = (await client.get("/tech_logo")).json()["session_id"]
+
+    async def send(message: str, delay: float = 0.0):
+        await asyncio.sleep(delay)
+        response = await client.post("/chat", json={"session_id": session_id, "message": message})
+        assert response.status_code == 200
+        return response.json()
+
+    messages = [f"Company #{index}, detail {n}: we build developer tools." for n in range(DISTINCT)]
+    await asyncio.gather(*(send(message) for message in messages))
+
+    delays = [0.0] * COALESCED + [rng.uniform(0, STAGGER) for _ in range(DUPLICATES - COALESCED)]
+    results = await asyncio.gather(*(send(CONFIRM, delay) for delay in delays))
+    job_ids = {result["job"]["job_id"] for result in results if result.get("job")}
+
+    for job_id in job_ids:
+        while (await client.get(f"/jobs/{job_id}")).json().get("status") in ("queued", "running"):
+            await asyncio.sleep(0.05)
+    return session_id, messages, job_ids
+
+
+def test_duplicate_and_concurrent_turns(loop, app, client, provider_stats):
+    """Concurrent turns on one session run one at a time; identical in-flight messages run once"""
+    rng = random.Random(0)
+    coalesced_before = session_turns.value(outcome="coalesced")
+    predictions_before = loop.run_until_complete(provider_stats())["predictions"]
+
+    async def scenario():
+        return await asyncio.gather(*(run_session(client, i, rng) for i in range(SESSIONS)))
+
+    sessions = loop.run_until_complete(scenario())
+
+    predictions = loop.run_until_complete(provider_stats())["predictions"] - predictions_before
+    needed = 0
+    for session_id, messages, job_ids in sessions:
+        state = loop.run_until_complete(app.orchestrator.session_store.get(session_id))
+        history = state["conversation_history"]
+        needed += sum((state.get("concept_attempts") or {}).values())
+
+        assert len(job_ids) == 1, f"{session_id} started {len(job_ids)} pipeline jobs"
+        assert state["current_step"] == "complete"
+        said = [m["content"] for m in history if m["role"] == "user"]
+        for message in messages:
+            assert said.count(message) == 1, f"{message!r} recorded {said.count(message)} times"
+            # Serialized: each consultation turn got its own reply before the next turn started
+            position = next(i for i, m in enumerate(history) if m["role"] == "user" and m["content"] == message)
+            assert history[position + 1]["role"] == "assistant"
+        # The simultaneous copies ran as a single turn
+        assert 1 <= said.count(CONFIRM) <= DUPLICATES - COALESCED + 1
+
+    assert session_turns.value(outcome="coalesced") - coalesced_before >= SESSIONS * (COALESCED - 1)
+    assert predictions == needed, f"{predictions} Replicate predictions for {needed} concept attempts"
@@ -0,0 +1,103 @@
+"""Held-out check of the chat fast path.
+
+None of these messages is in benchmarks/intent.py, the set the lexicon
+was tuned on. The gold label is the route the turn should take: confirm,
+reject or small_talk when a local reply is right, or other when only the
+LLM can answer it. A message answered locally that needed the model (or
+got the wrong local reply) is a false fast path: the user's words are
+dropped. Precision therefore has to stay at MIN_PRECISION, while coverage
+only has a floor.
+"""
+from agents.tech_logo.intent import detect_intent, fast_path_threshold, CONFIRM, REJECT, SMALL_TALK, OTHER
+
+MIN_PRECISION = 1.0
+MIN_COVERAGE = 0.6
+
+HELD_OUT = [
+    # Confirmations
+    ("yes that's all correct", CONFIRM), ("Yep, exactly right", CONFIRM), ("sure thing", CONFIRM),
+    ("that is right", CONFIRM), ("Yes.", CONFIRM), ("ok sounds great", CONFIRM), ("alright", CONFIRM),
+    ("fine by me", CONFIRM), ("yes, please go ahead", CONFIRM), ("Correct!", CONFIRM), ("looks right", CONFIRM),
+    ("yeah", CONFIRM), ("you got it", CONFIRM), ("100%", CONFIRM), ("yes absolutely", CONFIRM),
+    ("Perfect, thanks", CONFIRM), ("sounds perfect", CONFIRM), ("ok go", CONFIRM), ("yes, all accurate", CONFIRM),
+    ("👍👍", CONFIRM),
+    # Rejections
+    ("no that's wrong", REJECT), ("Nope, not right", REJECT), ("not correct", REJECT), ("no, wait", REJECT),
+    ("that's not accurate", REJECT), ("nah not really", REJECT), ("hold on, no", REJECT), ("No!", REJECT),
+    ("not at all", REJECT), ("that doesn't look right", REJECT),
+    # Small talk
+    ("hey!", SMALL_TALK), ("hi there", SMALL_TALK), ("good afternoon", SMALL_TALK), ("thanks!", SMALL_TALK),
+    ("thank you", SMALL_TALK), ("hello alex", SMALL_TALK), ("haha", SMALL_TALK), ("ty", SMALL_TALK),
+    # Needs the model
+    ("yes, but the name is spelled Acmee", OTHER),
+    ("yes and please avoid purple", OTHER),
+    ("no, we target hospitals, not banks", OTHER),
+    ("not quite, the audience is students", OTHER),
+    ("ok so what happens next?", OTHER),
+    ("can we change the colors?", OTHER),
+    ("sure, make it blue", OTHER),
+    ("right, but more modern", OTHER),
+    ("hello, our company is called Brightpath", OTHER),
+    ("thanks, and it should look friendly", OTHER),
+    ("I think red would be better", OTHER),
+    ("no red please", OTHER),
+    ("We're a small bakery in Lisbon", OTHER),
+    ("good, but the tagline is missing", OTHER),
+    ("perfect except for the font", OTHER),
+    ("ok, add a mascot", OTHER),
+    ("correct, though we also sell hardware", OTHER),
+    ("yes, and mention we are B2B", OTHER),
+    ("Great. Also, we need it in black and white.", OTHER),
+    ("not sure what style we want", OTHER),
+    ("maybe", OTHER),
+    ("what do you mean by brand personality?", OTHER),
+    ("The colors should be green and gold", OTHER),
+    ("yes to blue, no to gradients", OTHER),
+    ("hey, can you start over?", OTHER),
+    ("nope, we're in fintech", OTHER),
+    ("cool, but make it rounder", OTHER),
+    ("I love the idea but want a serif", OTHER),
+    ("wait, I forgot to mention our mascot", OTHER),
+    ("okay. our users are mostly teenagers", OTHER),
+]
+
+
+def route(message: str, threshold: float) -> str:
+    intent = detect_intent(message)
+    return intent.label if intent.confidence >= threshold else OTHER
+
+
+def test_fast_path_precision_on_held_out_set():
+    threshold = fast_path_threshold()
+    local = (CONFIRM, REJECT, SMALL_TALK)
+    routed = [(message, gold, route(message, threshold)) for message, gold in HELD_OUT]
+
+    answered = [(message, gold, predicted) for message, gold, predicted in routed if predicted in local]
+    false_fast_paths = [(message, gold, predicted) for message, gold, predicted in answered if predicted != gold]
+    precision = 1 - len(false_fast_paths) / len(answered)
+    assert precision >= MIN_PRECISION, f"answered locally but needed another route: {false_fast_paths}"
+
+    answerable = sum(gold in local for _, gold in HELD_OUT)
+    coverage = (len(answered) - len(false_fast_paths)) / answerable
+    assert coverage >= MIN_COVERAGE, f"coverage {coverage:.0%}"
+
+
+RECAPS = [
+    "To summarize: you are Acme, a devtools company. Does this accurately capture your brand?",
+    "Here’s what I understood: a bold fintech mark in green.",
+    "Let me recap: Brightpath, edtech, friendly and rounded.",
+    "In summary, a geometric monogram. Did I get that right?",
+]
+NOT_RECAPS = [
+    "Could you give me a short summary of your product?",
+    "Should the logo include a summary line or tagline?",
+    "Great, and who is your target audience?",
+]
+
+
+def test_recap_detection():
+    """Only a recap arms the confirm fast path and the speculative brief; "summary" alone does not"""
+    from agents.tech_logo.agents import LogoDesignAgents
+
+    assert [m for m in RECAPS if not LogoDesignAgents.offers_recap(m)] == []
+    assert [m for m in NOT_RECAPS if LogoDesignAgents.offers_recap(m)] == []
@@ -0,0 +1,11 @@
+from observability.metrics import Registry
+
+
+def test_label_values_are_escaped():
+    """Backslashes, quotes and newlines in a label value cannot break the exposition line"""
+    registry = Registry()
+    errors = registry.counter("test_errors_total", "Errors by message", ["message"])
+    errors.inc(message='bad "path" C:\\tmp\nsecond line')
+
+    lines = [line for line in registry.render().splitlines() if line.startswith("test_errors_total")]
+    assert lines == ['test_errors_total{message="bad \\"path\\" C:\\\\tmp\\nsecond line"} 1']
@@ -0,0 +1,116 @@
+import uuid
+from langgraph.checkpoint.memory import InMemorySaver
+from agents.tech_logo.workflow import LogoDesignOrchestrator
+
+BRIEF = [
+    {"role": "user", "content": "We build deployment tooling for platform teams"},
+    {"role": "assistant", "content": "Shall I go ahead with that brief?"},
+    {"role": "user", "content": "Yes"}
+]
+
+
+def pipeline_session(summary_agent):
+    """An orchestrator whose summary node is `summary_agent(orchestrator, original, state)`, and a session at summary"""
+    orchestrator = LogoDesignOrchestrator(checkpointer=InMemorySaver())
+    original = orchestrator.agent.summary_agent
+
+    async def summary(state):
+        return await summary_agent(orchestrator, original, state)
+
+    orchestrator.agent.summary_agent = summary
+    state = orchestrator.new_state()
+    state["conversation_history"] = [dict(message) for message in BRIEF]
+    state["current_step"] = "summary"
+    return orchestrator, str(uuid.uuid4()), state
+
+
+async def run_job(orchestrator, session_id: str, state) -> tuple:
+    job = orchestrator.jobs.submit(session_id, lambda: orchestrator._run_pipeline(session_id))
+    state["pipeline_job"] = {"job_id": job.job_id, "status": "queued"}
+    await orchestrator.session_store.set(session_id, state)
+    await orchestrator.jobs.wait(job.job_id)
+    return job, await orchestrator.session_store.get(session_id)
+
+
+def test_failed_step_is_retried_by_the_next_run(loop, app):
+    """A node that reports an error leaves the session on that node, and the next run resumes there"""
+    calls = []
+
+    async def flaky_summary(orchestrator, original, state):
+        calls.append(state["current_step"])
+        if len(calls) == 1:
+            return {**state, "error_message": "Failed to parse client requirements"}
+        return await original(state)
+
+    orchestrator, session_id, state = pipeline_session(flaky_summary)
+
+    job, failed = loop.run_until_complete(run_job(orchestrator, session_id, state))
+    assert job.result == "summary"
+    assert failed["pipeline_job"]["status"] == "failed"
+    assert failed["error_message"]
+
+    job, retried = loop.run_until_complete(run_job(orchestrator, session_id, failed))
+    assert calls == ["summary", "summary"]
+    assert job.result == "complete"
+    assert retried["pipeline_job"]["status"] == "completed"
+    assert not retried["error_message"]
+
+
+def test_turns_during_a_run_are_kept(loop, app):
+    """Messages sent while the pipeline runs stay in the session it writes back"""
+    late = "Also, we would like something in teal"
+
+    async def summary_with_a_turn(orchestrator, original, state):
+        await orchestrator.process_user_message(session_id, late)
+        return await original(state)
+
+    orchestrator, session_id, state = pipeline_session(summary_with_a_turn)
+
+    job, finished = loop.run_until_complete(run_job(orchestrator, session_id, state))
+    assert job.result == "complete"
+    history = finished["conversation_history"]
+    assert history[:len(BRIEF)] == BRIEF
+    assert history[len(BRIEF)] == {"role": "user", "content": late}
+    # Followed by what the pipeline added, e.g. the generated logos
+    assert len(history) > len(BRIEF) + 1
+
+
+def test_runs_leave_no_checkpoints(loop, app):
+    """Chat turns are not checkpointed, and a finished run, failed or not, deletes its thread"""
+    async def failing_summary(orchestrator, original, state):
+        return {**state, "error_message": "Failed to parse client requirements"}
+
+    orchestrator, session_id, state = pipeline_session(failing_summary)
+
+    async def chat_turns():
+        chat_id = str(uuid.uuid4())
+        await orchestrator.start_session(chat_id)
+        for message in ("Hi", "We build deployment tooling", "Mostly for platform teams"):
+            await orchestrator.process_user_message(chat_id, message)
+
+    loop.run_until_complete(chat_turns())
+    job, failed = loop.run_until_complete(run_job(orchestrator, session_id, state))
+    assert job.result == "summary"
+    assert list(orchestrator.checkpointer.list(None)) == []
+
+
+def test_failed_run_cancels_its_prefetches(loop, app):
+    """Images the designer prefetched are cancelled when the run fails before generate consumes them"""
+    async def summary(orchestrator, original, state):
+        return await original(state)
+
+    orchestrator, session_id, state = pipeline_session(summary)
+    prefetched = []
+
+    async def failing_generator(state):
+        prefetched.extend(orchestrator.agent._prefetched.get(session_id, {}).values())
+        raise RuntimeError("Image provider unavailable")
+
+    orchestrator.agent.generator_agent = failing_generator
+
+    job, failed = loop.run_until_complete(run_job(orchestrator, session_id, state))
+    assert failed["pipeline_job"]["status"] == "failed"
+    assert failed["current_step"] == "generate"
+    assert prefetched, "the designer should have prefetched the concepts' images"
+    assert all(task.cancelled() for task in prefetched)
+    assert orchestrator.agent._prefetched == {}
@@ -0,0 +1,18 @@
+import asyncio
+from llms.logo import ReplicateProvider
+
+
+def test_cancelled_generation_cancels_the_prediction(loop, app, provider_stats):
+    """A generation cancelled locally (e.g. a lost hedge) also cancels its prediction upstream"""
+    async def scenario():
+        before = (await provider_stats())["cancelled"]
+        task = asyncio.create_task(ReplicateProvider().generate_image("A teal fox"))
+        # Submitted and polling, well before the fake prediction finishes
+        await asyncio.sleep(0.15)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return task, (await provider_stats())["cancelled"] - before
+
+    task, cancelled = loop.run_until_complete(scenario())
+    assert task.cancelled()
+    assert cancelled == 1
@@ -0,0 +1,26 @@
+import copy
+from agents.tech_logo import session_log
+
+
+def test_nested_in_place_edits_are_persisted():
+    """A value edited in place below the top level still differs from the shadow"""
+    state = {
+        "pipeline_job": {"job_id": "j", "status": "queued"},
+        "generated_logos": [{"concept_id": 1, "image_url": "a"}],
+        "conversation_history": [{"role": "user", "content": "hi"}]
+    }
+    persisted = session_log.shadow(state)
+    replica = copy.deepcopy(state)
+
+    for turn in range(3):
+        state["generated_logos"][0]["image_url"] = f"b{turn}"
+        state["pipeline_job"]["status"] = "running"
+        state["conversation_history"].append({"role": "assistant", "content": f"reply {turn}"})
+        events = session_log.diff(persisted, state)
+        assert {"type": "append", "field": "conversation_history", "items": [state["conversation_history"][-1]]} in events
+        session_log.apply(replica, copy.deepcopy(events))
+        persisted = session_log.advance(persisted, events)
+        assert replica == state
+        assert persisted == state
+
+    assert session_log.diff(persisted, state) == []
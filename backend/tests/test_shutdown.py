@@ -0,0 +1,39 @@
+import asyncio
+import uuid
+from langgraph.checkpoint.memory import InMemorySaver
+from agents.tech_logo.workflow import LogoDesignOrchestrator
+
+
+def test_shutdown_stops_background_work_first(loop, app, monkeypatch):
+    """Leaving the lifespan cancels running jobs and speculations before the stores close, and leaves no task behind"""
+    orchestrator = LogoDesignOrchestrator(checkpointer=InMemorySaver())
+    monkeypatch.setattr(app, "orchestrator", orchestrator)
+    started = asyncio.Event()
+
+    async def stuck_summary(state):
+        started.set()
+        await asyncio.sleep(60)
+        return state
+
+    orchestrator.agent.summary_agent = stuck_summary
+    session_id = str(uuid.uuid4())
+
+    async def scenario():
+        before = asyncio.all_tasks()
+        async with app.lifespan(app.app):
+            state = orchestrator.new_state()
+            state["current_step"] = "summary"
+            job = orchestrator.jobs.submit(session_id, lambda: orchestrator._run_pipeline(session_id))
+            state["pipeline_job"] = {"job_id": job.job_id, "status": "queued"}
+            await orchestrator.session_store.set(session_id, state)
+            orchestrator.speculation.start("other-session", lambda: asyncio.sleep(60))
+            await started.wait()
+        left = asyncio.all_tasks() - before
+        return job, left, await orchestrator.session_store.get(session_id)
+
+    job, left, state = loop.run_until_complete(scenario())
+    assert job.status == "cancelled"
+    assert not left, f"tasks still running after shutdown: {left}"
+    # The cancelled job wrote its session back before the store closed
+    assert state["pipeline_job"]["job_id"] == job.job_id
+    assert state["pipeline_job"]["status"] == "running"
@@ -0,0 +1,30 @@
+import asyncio
+import json
+
+MESSAGE = "We make accounting software for small breweries"
+
+
+async def stream(client, session_id: str) -> list:
+    """(event, data) pairs of one /chat/stream response"""
+    response = await client.post("/chat/stream", json={"session_id": session_id, "message": MESSAGE})
+    assert response.status_code == 200
+    frames = [frame for frame in response.text.split("\n\n") if frame.strip()]
+    parsed = []
+    for frame in frames:
+        name, data = (line.split(": ", 1)[1] for line in frame.splitlines())
+        parsed.append((name, json.loads(data)))
+    return parsed
+
+
+def test_joined_stream_gets_the_turns_events(loop, client):
+    """A stream that joins an identical message in flight sees the same progress as the one that started it"""
+    async def scenario():
+        session_id = (await client.get("/tech_logo")).json()["session_id"]
+        return await asyncio.gather(stream(client, session_id), stream(client, session_id))
+
+    first, joined = loop.run_until_complete(scenario())
+    progress = [name for name, _ in first if name not in ("keepalive", "done")]
+    assert "token" in progress
+    assert [name for name, _ in joined if name not in ("keepalive", "done")] == progress
+    assert first[-1] == joined[-1]
+    assert first[-1][0] == "done"
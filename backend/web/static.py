@@ -0,0 +1,137 @@
+import os
+import gzip
+import hashlib
+import logging
+import mimetypes
+from typing import Dict, Optional, Tuple
+import brotli
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "application/xml", "image/svg+xml")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header names `etag` (weak comparison, as RFC 9110 asks for GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == bare for tag in if_none_match.split(","))
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """Content codings from an Accept-Encoding header with their q-values"""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.lower()] = q
+    return accepted
+
+
+class StaticFile:
+    """One file held in memory with its precompressed variants"""
+
+    def __init__(self, data: bytes, media_type: str, compress: bool):
+        self.media_type = media_type
+        self.etag = '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+        # encoding ("identity", "gzip", "br") -> body; a variant is kept only if it is smaller
+        self.bodies: Dict[str, bytes] = {"identity": data}
+        if compress:
+            variants = {
+                "gzip": gzip.compress(data, compresslevel=9, mtime=0),
+                "br": brotli.compress(data, quality=11)
+            }
+            for encoding, body in variants.items():
+                if len(body) < len(data):
+                    self.bodies[encoding] = body
+
+    def select(self, accept_encoding: Optional[str]) -> Tuple[str, bytes]:
+        """The smallest variant the client accepts"""
+        accepted = accepted_encodings(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        candidates = [
+            (encoding, body) for encoding, body in self.bodies.items()
+            if encoding == "identity" or accepted.get(encoding, wildcard) > 0
+        ]
+        return min(candidates, key=lambda candidate: len(candidate[1]))
+
+
+class StaticBundle:
+    """Serves a directory from memory: loaded and compressed once, answered with ETags and 304s.
+
+    Mount it as an ASGI app, or call `response()` from a route. Files are
+    read when the bundle is built, so changes on disk show up after a
+    restart. Responses carry `Cache-Control: no-cache` by default: browsers
+    keep their copy but revalidate it, which costs one 304 per file.
+    """
+
+    def __init__(self, directory: str, cache_control: str = "no-cache", min_compress_size: int = 256):
+        self.directory = directory
+        self.cache_control = cache_control
+        self.min_compress_size = min_compress_size
+        self.files: Dict[str, StaticFile] = {}
+        self.load()
+
+    def load(self):
+        files = {}
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                with open(path, "rb") as f:
+                    data = f.read()
+                media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                if media_type.startswith("text/") or media_type == "application/javascript":
+                    media_type += "; charset=utf-8"
+                compress = media_type.startswith(COMPRESSIBLE) and len(data) >= self.min_compress_size
+                files[relative] = StaticFile(data, media_type, compress)
+        self.files = files
+        logger.info(
+            "Loaded %d static files (%d bytes, %d compressed)",
+            len(files),
+            sum(len(f.bodies["identity"]) for f in files.values()),
+            sum(len(f.bodies) > 1 for f in files.values())
+        )
+
+    def response(self, path: str, request: Request) -> Optional[Response]:
+        """The response for `path` (relative to the directory), or None if there is no such file"""
+        static = self.files.get(path)
+        if static is None:
+            return None
+        headers = {"ETag": static.etag, "Cache-Control": self.cache_control}
+        if len(static.bodies) > 1:
+            headers["Vary"] = "Accept-Encoding"
+        if etag_matches(request.headers.get("if-none-match"), static.etag):
+            return Response(status_code=304, headers=headers)
+
+        encoding, body = static.select(request.headers.get("accept-encoding"))
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        if request.method == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            body = b""
+        return Response(body, media_type=static.media_type, headers=headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        request = Request(scope, receive)
+        if request.method not in ("GET", "HEAD"):
+            response = Response("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+        else:
+            path = scope["path"][len(scope.get("root_path", "")):] if scope.get("root_path") else scope["path"]
+            response = self.response(path.lstrip("/"), request) or Response("Not Found", status_code=404)
+        await response(scope, receive, send)